@@ -0,0 +1,58 @@
+import time
+import numpy as np
+import pandas as pd
+
+import pypeline.phased_array.bluebild.data_processor as bb_dp
+import pypeline.phased_array.bluebild.gram as bb_gr
+import pypeline.phased_array.data_gen.statistics as statistics
+
+# Compares the partial-spectrum solvers of IntensityFieldDataProcessorBlock against the exact one.
+# Visibilities come from a slowly-varying low-rank sky + noise, such that LOBPCG benefits from
+# warm starts as it would on consecutive timesteps of an observation.
+#
+# python test_eigensolver.py
+
+N_eig  = 8
+N_time = 20
+solvers = ["exact", "subset", "lobpcg"]
+tol     = None  # LOBPCG tolerance; default scales with N_beam
+
+
+class RandomDataGen():
+    def __init__(self, N_beam, N_src=2 * N_eig, seed=0):
+        self.rng = np.random.RandomState(seed)
+        self.N_beam = N_beam
+        self.beam_idx = pd.Index(range(N_beam), name="BEAM_ID")
+
+        A = self.rng.randn(N_beam, N_beam) + 1j * self.rng.randn(N_beam, N_beam)
+        self.G = A @ A.conj().T / N_beam + np.eye(N_beam)
+        self.sky = self.rng.randn(N_beam, N_src) + 1j * self.rng.randn(N_beam, N_src)
+        self.intensity = np.logspace(2, 0, N_src)
+
+    def getSG(self, t):
+        A = self.sky + 0.01 * t * self.rng.randn(*self.sky.shape)
+        S = (A * self.intensity) @ A.conj().T + np.eye(self.N_beam)
+        return (statistics.VisibilityMatrix(S, self.beam_idx),
+                bb_gr.GramMatrix(self.G, self.beam_idx))
+
+
+if __name__ == "__main__":
+    for N_beam in [24, 100, 300, 600]:
+        data = RandomDataGen(N_beam)
+        SG = [data.getSG(t) for t in range(N_time)]
+
+        results = {}
+        for solver in solvers:
+            I_dp = bb_dp.IntensityFieldDataProcessorBlock(N_eig, [0, 1], solver=solver, tol=tol)
+            t_start = time.perf_counter()
+            results[solver] = [I_dp(S, G)[0] for (S, G) in SG]
+            t_solve = (time.perf_counter() - t_start) / N_time
+            results[solver + " time"] = t_solve
+
+        print("N_beam = {0}".format(N_beam))
+        for solver in solvers:
+            D = np.array(results[solver])
+            D_ref = np.array(results["exact"])
+            err = np.max(np.abs(D - D_ref) / D_ref)
+            print("  {0:>6}: {1:.2e}s per snapshot, max relative eigenvalue error {2:.1e}".format(
+                solver, results[solver + " time"], err))
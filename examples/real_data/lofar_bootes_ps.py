@@ -70,7 +70,12 @@ N_eig, c_centroid = I_est.infer_parameters()
 I_dp = bb_dp.IntensityFieldDataProcessorBlock(N_eig, c_centroid)
 I_mfs = bb_fd.Fourier_IMFS_Block(wl, pix_colat, pix_lon, N_FS, T_kernel, R, N_level, N_bits)
 for t, f, S in ProgressBar(
-    ms.visibilities(channel_id=[channel_id], time_id=slice(None, None, 1), column="DATA_SIMULATED")
+    ms.visibilities(
+        channel_id=[channel_id],
+        time_id=slice(None, None, 1),
+        column="DATA_SIMULATED",
+        prefetch_depth=4,  # read next time samples while imaging the current one
+    )
 ):
     wl = constants.speed_of_light / f.to_value(u.Hz)
     XYZ = ms.instrument(t)
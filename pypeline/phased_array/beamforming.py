@@ -71,11 +71,14 @@ def _as_BeamWeights(df):
         .loc[:, ["ROW_ID", "COL_ID", "W"]]
     )
 
+    # If every antenna feeds a single beam, W is block-diagonal (up to a column permutation) and
+    # products with W reduce to per-station sums: keep it sparse irrespective of N_beam.
+    station_grouped = len(data) == N_antenna
     sparsity_ratio = len(data) / (N_antenna * N_beam)
     max_sparsity_ratio = pypeline.config.getfloat(
         "phased_array.beamforming", "bw_max_sparsity_ratio"
     )
-    if sparsity_ratio <= max_sparsity_ratio:  # Use sparse matrix
+    if station_grouped or (sparsity_ratio <= max_sparsity_ratio):  # Use sparse matrix
         W = sparse.csr_matrix(
             (data.W.values, (data.ROW_ID.values, data.COL_ID.values)),
             shape=(N_antenna, N_beam),
@@ -11,12 +11,134 @@ Data processors.
 import imot_tools.math.linalg as pylinalg
 import imot_tools.util.argcheck as chk
 import numpy as np
+import scipy.linalg as linalg
+import scipy.sparse.linalg as splinalg
 
+import pypeline
 import pypeline.core as core
 import pypeline.phased_array.data_gen.statistics as vis
 import pypeline.phased_array.bluebild.gram as gram
 
 
+def _batched_eigh(S, G, N_eig):
+    """
+    Functional PCA of several (S, G) pairs at once.
+
+    Broken beams of each pair are masked out and all generalized eigenproblems ``S V = G V D`` are
+    solved together through stacked Cholesky factorizations and :py:func:`numpy.linalg.eigh`.
+    This is the batched equivalent of calling :py:func:`imot_tools.math.linalg.eigh` with
+    `tau=1, N=N_eig` on each pair after removing its broken beams.
+
+    Parameters
+    ----------
+    S : :py:class:`~numpy.ndarray`
+        (B, N_beam, N_beam) visibility matrices.
+    G : :py:class:`~numpy.ndarray`
+        (B, N_beam, N_beam) gram matrices.
+    N_eig : int
+        Number of eigenpairs to output.
+
+    Returns
+    -------
+    D : :py:class:`~numpy.ndarray`
+        (B, N_eig) positive eigenvalues in decreasing order, zero-padded.
+    V : :py:class:`~numpy.ndarray`
+        (B, N_beam, N_eig) eigenvectors, zero at broken beams.
+    """
+    B, N_beam, _ = S.shape
+
+    # Broken beams have equal row/column sums. They are decoupled from the rest of the problem by
+    # zeroing them in S and replacing them by identity in G: their eigenvalues are then 0.
+    working = ~np.isclose(np.sum(S, axis=1), np.sum(S, axis=2))  # (B, N_beam)
+    mask = working[:, :, np.newaxis] & working[:, np.newaxis, :]
+    S = np.where(mask, S, 0)
+    G = np.where(mask, G, np.eye(N_beam))
+    unusable = np.all(np.isclose(S, 0), axis=(1, 2))  # S is broken beyond use
+
+    # S: drop negative spectrum.
+    Ds, Vs = np.linalg.eigh(S)
+    S = (Vs * np.clip(Ds, 0, None)[:, np.newaxis, :]) @ Vs.conj().transpose(0, 2, 1)
+
+    # Reduction to standard form: S V = G V D <=> (L^{-1} S L^{-H}) U = U D, with V = L^{-H} U.
+    try:
+        L = np.linalg.cholesky(G)
+    except np.linalg.LinAlgError:
+        raise ValueError("Parameter[G] is not positive-definite.")
+    LiS = np.linalg.solve(L, S)
+    C = np.linalg.solve(L, LiS.conj().transpose(0, 2, 1))
+    C = 0.5 * (C + C.conj().transpose(0, 2, 1))
+    D, U = np.linalg.eigh(C)
+    V = np.linalg.solve(L.conj().transpose(0, 2, 1), U)
+
+    # Keep positive eigenpairs in decreasing order.
+    D, V = D[:, ::-1], V[:, :, ::-1]
+    positive = (D > 0) & ~unusable[:, np.newaxis]
+    D = np.where(positive, D, 0)
+    V = np.where(positive[:, np.newaxis, :] & working[:, :, np.newaxis], V, 0)
+
+    # Truncation / padding
+    D_out = np.zeros((B, N_eig))
+    V_out = np.zeros((B, N_beam, N_eig), dtype=complex)
+    K = min(N_eig, N_beam)
+    D_out[:, :K], V_out[:, :, :K] = D[:, :K], V[:, :, :K]
+    return D_out, V_out
+
+
+def _partial_eigh(S, G, N_eig, solver, X=None, tol=None):
+    """
+    Leading eigenpairs of the generalized eigenproblem ``S V = G V D``.
+
+    Contrary to :py:func:`imot_tools.math.linalg.eigh`, the negative spectrum of `S` is not removed
+    beforehand since doing so requires a full eigendecomposition of `S`.
+    Visibility matrices being (nearly) positive semi-definite, this only affects the leading
+    eigenpairs at the noise level.
+
+    Parameters
+    ----------
+    S : :py:class:`~numpy.ndarray`
+        (M, M) hermitian matrix.
+    G : :py:class:`~numpy.ndarray`
+        (M, M) positive-definite hermitian matrix.
+    N_eig : int
+        Number of eigenpairs to output.
+    solver : str
+        "subset" for LAPACK subset selection, "lobpcg" for LOBPCG iterations.
+    X : :py:class:`~numpy.ndarray`
+        (M, N_eig) initial eigenvector estimates for LOBPCG. (Default = random)
+    tol : float
+        LOBPCG convergence tolerance. (Default = SciPy's default)
+
+    Returns
+    -------
+    D : :py:class:`~numpy.ndarray`
+        (N_eig,) positive eigenvalues in decreasing order, zero-padded.
+    V : :py:class:`~numpy.ndarray`
+        (M, N_eig) eigenvectors, zero-padded.
+    """
+    M = len(S)
+    K = min(N_eig, M)
+
+    # LOBPCG is not worth it on small problems: SciPy falls back to a dense solver anyway.
+    if (solver == "subset") or (M < 5 * K):
+        D, V = linalg.eigh(S, G, subset_by_index=[M - K, M - 1])
+    else:
+        rng = np.random.RandomState(0)
+        X0 = rng.randn(M, K) + 1j * rng.randn(M, K)
+        if X is not None:  # warm start, except where previous eigenvectors were padding.
+            valid = np.linalg.norm(X, axis=0) > 0
+            X0[:, valid] = X[:, valid]
+        maxiter = pypeline.config.getint("phased_array.bluebild.data_processor", "lobpcg_maxiter")
+        D, V = splinalg.lobpcg(S, X0, B=G, largest=True, tol=tol, maxiter=maxiter)
+
+    idx = np.argsort(D)[::-1]
+    D, V = D[idx], V[:, idx]
+    positive = D > 0
+
+    D_out, V_out = np.zeros(N_eig), np.zeros((M, N_eig), dtype=complex)
+    D_out[:K], V_out[:, :K] = np.where(positive, D, 0), np.where(positive, V, 0)
+    return D_out, V_out
+
+
 class DataProcessorBlock(core.Block):
     """
     Top-level public interface of Bluebild data processors.
@@ -48,8 +170,15 @@ class IntensityFieldDataProcessorBlock(DataProcessorBlock):
     Data processor for computing intensity fields.
     """
 
-    @chk.check(dict(N_eig=chk.is_integer, cluster_centroids=chk.has_reals))
-    def __init__(self, N_eig, cluster_centroids):
+    @chk.check(
+        dict(
+            N_eig=chk.is_integer,
+            cluster_centroids=chk.has_reals,
+            solver=chk.is_instance(str),
+            tol=chk.allow_None(chk.is_real),
+        )
+    )
+    def __init__(self, N_eig, cluster_centroids, solver="exact", tol=None):
         """
         Parameters
         ----------
@@ -57,6 +186,21 @@ class IntensityFieldDataProcessorBlock(DataProcessorBlock):
             Number of eigenpairs to output after PCA decomposition.
         cluster_centroids : array-like(float)
             Intensity centroids for energy-level clustering.
+        solver : str
+            Generalized eigensolver:
+
+            * "exact" (default): full spectrum, then selection of the `N_eig` leading eigenpairs;
+            * "subset": only the `N_eig` leading eigenpairs are computed by LAPACK;
+            * "lobpcg": iterative LOBPCG solver, warm-started from the eigenvectors of the previous
+              call.
+
+            Partial solvers pay off when N_beam >> N_eig (ex: hundreds of stations).
+            Contrary to "exact", they do not remove the negative spectrum of visibility matrices
+            beforehand.
+        tol : float
+            Convergence tolerance of the "lobpcg" solver. (Default = SciPy's default)
+
+            At most `[phased_array.bluebild.data_processor]/lobpcg_maxiter` iterations are performed.
 
         Notes
         -----
@@ -68,11 +212,24 @@ class IntensityFieldDataProcessorBlock(DataProcessorBlock):
         if N_eig <= 0:
             raise ValueError("Parameter[N_eig] must be positive.")
 
+        if solver not in ("exact", "subset", "lobpcg"):
+            raise ValueError(f"Parameter[solver] must be one of 'exact', 'subset', 'lobpcg'.")
+        if (tol is not None) and (tol <= 0):
+            raise ValueError("Parameter[tol] must be positive.")
+
         super().__init__()
         self._N_eig = N_eig
         self._cluster_centroids = np.array(cluster_centroids, copy=False)
-
-    @chk.check(dict(S=chk.is_instance(vis.VisibilityMatrix), G=chk.is_instance(gram.GramMatrix)))
+        self._solver = solver
+        self._tol = tol
+        self._V_prev = None  # warm start of "lobpcg" solver
+
+    @chk.check(
+        dict(
+            S=chk.is_instance(vis.VisibilityMatrix, np.ndarray),
+            G=chk.is_instance(gram.GramMatrix, np.ndarray),
+        )
+    )
     def __call__(self, S, G):
         """
         fPCA decomposition and data formatting for
@@ -82,21 +239,27 @@ class IntensityFieldDataProcessorBlock(DataProcessorBlock):
 
         Parameters
         ----------
-        S : :py:class:`~pypeline.phased_array.data_gen.statistics.VisibilityMatrix`
-            (N_beam, N_beam) visibility matrix.
-        G : :py:class:`~pypeline.phased_array.bluebild.gram.GramMatrix`
-            (N_beam, N_beam) gram matrix.
+        S : :py:class:`~pypeline.phased_array.data_gen.statistics.VisibilityMatrix` or :py:class:`~numpy.ndarray`
+            (N_beam, N_beam) visibility matrix, or (B, N_beam, N_beam) stack of visibility matrices.
+        G : :py:class:`~pypeline.phased_array.bluebild.gram.GramMatrix` or :py:class:`~numpy.ndarray`
+            (N_beam, N_beam) gram matrix, or (B, N_beam, N_beam) stack of gram matrices.
+
+            Stacks are typically obtained from
+            :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet.visibilities` with
+            `stack=True` and :py:class:`~pypeline.phased_array.bluebild.gram.GramBlock` evaluated at
+            several wavelengths.
+            All eigenproblems of a stack are solved together with batched LAPACK calls.
 
         Returns
         -------
         D : :py:class:`~numpy.ndarray`
-            (N_eig,) positive eigenvalues.
+            (N_eig,) positive eigenvalues. ((B, N_eig) if stacks are given.)
 
         V : :py:class:`~numpy.ndarray`
-            (N_beam, N_eig) complex-valued eigenvectors.
+            (N_beam, N_eig) complex-valued eigenvectors. ((B, N_beam, N_eig) if stacks are given.)
 
         cluster_idx : :py:class:`~numpy.ndarray`
-            (N_eig,) cluster indices of each eigenpair.
+            (N_eig,) cluster indices of each eigenpair. ((B, N_eig) if stacks are given.)
 
         Examples
         --------
@@ -144,25 +307,64 @@ class IntensityFieldDataProcessorBlock(DataProcessorBlock):
            >>> cluster_idx  # useful for aggregation stage.
            array([0, 0])
         """
-        if not S.is_consistent_with(G, axes=[0, 0]):
-            raise ValueError("Parameters[S, G] are inconsistent.")
+        if isinstance(S, vis.VisibilityMatrix) and isinstance(G, gram.GramMatrix):
+            if not S.is_consistent_with(G, axes=[0, 0]):
+                raise ValueError("Parameters[S, G] are inconsistent.")
+            return self._decompose(S.data, G.data)
 
+        S, G = np.asarray(getattr(S, "data", S)), np.asarray(getattr(G, "data", G))
+        if (S.ndim != 3) or (S.shape != G.shape) or (S.shape[1] != S.shape[2]):
+            raise ValueError("Parameters[S, G] must be (B, N_beam, N_beam) stacks of equal shape.")
+
+        if self._solver != "exact":  # partial solvers work one eigenproblem at a time.
+            D, V, cluster_idx = zip(*[self._decompose(_S, _G) for (_S, _G) in zip(S, G)])
+            return np.stack(D, axis=0), np.stack(V, axis=0), np.stack(cluster_idx, axis=0)
+
+        D, V = _batched_eigh(S, G, self._N_eig)
+        cluster_dist = np.absolute(D[:, :, np.newaxis] - self._cluster_centroids.reshape(1, 1, -1))
+        cluster_idx = np.argmin(cluster_dist, axis=2)
+
+        return D, V, cluster_idx
+
+    def _decompose(self, S, G):
+        """
+        fPCA decomposition of a single (S, G) pair.
+
+        Parameters
+        ----------
+        S : :py:class:`~numpy.ndarray`
+            (N_beam, N_beam) visibility matrix.
+        G : :py:class:`~numpy.ndarray`
+            (N_beam, N_beam) gram matrix.
+
+        Returns
+        -------
+        D, V, cluster_idx
+            See :py:meth:`~pypeline.phased_array.bluebild.data_processor.IntensityFieldDataProcessorBlock.__call__`.
+        """
         # Remove broken BEAM_IDs
-        N_beam = len(G.data)
-        broken_row_id = np.flatnonzero(np.isclose(np.sum(S.data, axis=0), np.sum(S.data, axis=1)))
+        N_beam = len(G)
+        broken_row_id = np.flatnonzero(np.isclose(np.sum(S, axis=0), np.sum(S, axis=1)))
         working_row_id = list(set(np.arange(N_beam)) - set(broken_row_id))
         idx = np.ix_(working_row_id, working_row_id)
-        S, G = S.data[idx], G.data[idx]
+        S, G = S[idx], G[idx]
 
         # Functional PCA
-        if not np.allclose(S, 0):
-            D, V = pylinalg.eigh(S, G, tau=1, N=self._N_eig)
-        else:  # S is broken beyond use
+        if np.allclose(S, 0):  # S is broken beyond use
             D, V = np.zeros(self._N_eig), 0
+        elif self._solver == "exact":
+            D, V = pylinalg.eigh(S, G, tau=1, N=self._N_eig)
+        else:
+            X = None
+            if (self._V_prev is not None) and (len(self._V_prev) == N_beam):
+                X = self._V_prev[working_row_id]
+            D, V = _partial_eigh(S, G, self._N_eig, self._solver, X, self._tol)
 
         # Add broken BEAM_IDs
-        V_aligned = np.zeros((N_beam, self._N_eig), dtype=np.complex)
+        V_aligned = np.zeros((N_beam, self._N_eig), dtype=complex)
         V_aligned[working_row_id] = V
+        if self._solver == "lobpcg":
+            self._V_prev = V_aligned
 
         # Determine energy-level clustering
         cluster_dist = np.absolute(D.reshape(-1, 1) - self._cluster_centroids.reshape(1, -1))
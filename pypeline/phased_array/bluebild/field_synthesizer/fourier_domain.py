@@ -8,20 +8,97 @@
 Field synthesizers that work in Fourier Series domain.
 """
 
+import concurrent.futures as futures
+import pathlib
+import threading
+
 import imot_tools.math.func as func
 import imot_tools.math.linalg as pylinalg
 import imot_tools.math.sphere.transform as transform
 import imot_tools.util.argcheck as chk
 import numexpr as ne
 import numpy as np
-import cupy as cp
 import pyffs
 import scipy.fftpack as fftpack
 import scipy.linalg as linalg
 import scipy.sparse as sparse
 
+import pypeline
 import pypeline.phased_array.bluebild.field_synthesizer as synth
 import pypeline.phased_array.bluebild.field_synthesizer.spatial_domain as fsd
+import pypeline.phased_array.instrument as instrument
+import pypeline.util.cache as cache
+
+try:
+    import cupy as cp
+except ImportError:  # CPU-only hosts: FS statistics are computed with NumPy.
+    cp = None
+
+
+def _kernel_block_size(N_height, N_samples, dtype, N_thread=1):
+    """
+    Number of antennas to process per block when generating FS kernels.
+
+    The per-antenna working set of
+    :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock._regen_kernel`
+    is made of a real (N_height, N_samples) array of phases, its complex exponential and the FS
+    coefficients of the latter (plus FFS scratch space of the same size).
+    Blocks are sized such that the working sets of `N_thread` concurrent blocks fit in
+    `[phased_array.bluebild.field_synthesizer]/kernel_block_bytes`.
+
+    Parameters
+    ----------
+    N_height : int
+        Number of kernel colatitudes.
+    N_samples : int
+        Number of kernel samples per colatitude.
+    dtype : :py:class:`~numpy.dtype`
+        Complex type of the kernel.
+    N_thread : int
+        Number of threads generating blocks concurrently.
+
+    Returns
+    -------
+    N_block : int
+        Number of antennas per block. (At least 1.)
+    """
+    max_bytes = pypeline.config.getint("phased_array.bluebild.field_synthesizer", "kernel_block_bytes")
+    itemsize = np.dtype(dtype).itemsize
+    N_byte = N_height * N_samples * (np.dtype(np.float64).itemsize + 3 * itemsize)
+    return max(max_bytes // (N_byte * N_thread), 1)
+
+
+def _kernel_block(XYZ, pix_smpl, w_smpl, wl, T, T_c, N_FS, out):
+    """
+    FS coefficients of the kernel for a block of antennas.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_block, 3) Cartesian antenna coordinates (BFSF, centered on the instrument).
+    pix_smpl : :py:class:`~numpy.ndarray`
+        (3, N_height, N_samples) kernel sample directions.
+    w_smpl : :py:class:`~numpy.ndarray`
+        (N_samples,) window values at kernel samples.
+    wl : float
+        Wavelength [m] of observations.
+    T : float
+        Kernel periodicity [rad].
+    T_c : float
+        Kernel period mid-point [rad].
+    N_FS : int
+        Kernel bandwidth.
+    out : :py:class:`~numpy.ndarray`
+        (N_block, N_height, N_samples) complex array to write the FS coefficients to.
+    """
+    k_smpl = np.empty_like(out)
+    ne.evaluate(
+        "exp(A * B) * C",
+        dict(A=1j * 2 * np.pi / wl, B=np.tensordot(XYZ, pix_smpl, axes=1), C=w_smpl),
+        out=k_smpl,
+        casting="same_kind",
+    )  # Due to limitations of NumExpr2
+    out[:] = pyffs.ffs(k_smpl, T, T_c, N_FS, axis=2)
 
 
 class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
@@ -135,9 +212,24 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
             T=chk.is_real,
             R=chk.require_all(chk.has_shape([3, 3]), chk.has_reals),
             precision=chk.is_integer,
+            kernel_cache=chk.allow_None(chk.is_instance(str, pathlib.Path)),
+            N_thread=chk.is_integer,
+            shift_estimator=chk.is_instance(str),
         )
     )
-    def __init__(self, wl, grid_colat, grid_lon, N_FS, T, R, precision=64):
+    def __init__(
+        self,
+        wl,
+        grid_colat,
+        grid_lon,
+        N_FS,
+        T,
+        R,
+        precision=64,
+        kernel_cache=None,
+        N_thread=1,
+        shift_estimator="lstsq",
+    ):
         r"""
         Parameters
         ----------
@@ -157,6 +249,28 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
             Numerical accuracy of floating-point operations.
 
             Must be 32 or 64.
+        kernel_cache : str or :py:class:`~pathlib.Path`
+            Directory in which to persist FS kernels across runs. (Default = no persistence.)
+
+            Kernels are keyed on (BFSF instrument geometry, `wl`, `grid_colat`, kernel bandwidth and
+            periodicity, `precision`), such that re-imaging an observation skips kernel generation.
+            The cache's disk budget is `[phased_array.bluebild.field_synthesizer]/kernel_cache_size`.
+        N_thread : int
+            Number of CPU threads used to generate FS kernels. (Default = 1)
+
+            Kernels are generated by blocks of antennas: with several threads, the exponentiation of a
+            block overlaps with the FFS of others.
+        shift_estimator : str
+            Method used to estimate the instrument's rotation w.r.t. the kernel at every call.
+
+            * 'lstsq': least-squares fit of a planar transform on all antennas. (Default)
+            * 'reference': closed-form estimate from `[phased_array.bluebild.field_synthesizer]/shift_N_reference`
+              antennas chosen by :py:func:`~pypeline.phased_array.instrument.reference_antennas`.
+              Cost does not depend on the instrument size.
+
+            Both estimators agree for rigid rotations of the instrument. Since the 'lstsq' estimator
+            also absorbs non-rotational (ex: aberration) terms, fields computed with 'reference' can
+            differ slightly.
 
         Notes
         -----
@@ -166,6 +280,24 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         """
         super().__init__()
 
+        if kernel_cache is None:
+            self._kernel_cache = None
+        else:
+            max_bytes = pypeline.config.getint("phased_array.bluebild.field_synthesizer", "kernel_cache_size")
+            self._kernel_cache = cache.DiskCache(kernel_cache, max_bytes)
+
+        if shift_estimator not in ("reference", "lstsq"):
+            raise ValueError("Parameter[shift_estimator] must be 'reference' or 'lstsq'.")
+        self._shift_estimator = shift_estimator
+        self._shift_idx = None  # (XYZk, idx) reference antennas of the 'reference' estimator
+
+        if N_thread <= 0:
+            raise ValueError("Parameter[N_thread] must be positive.")
+        self._N_thread = N_thread
+        self._executor = None
+        if N_thread > 1:
+            self._executor = futures.ThreadPoolExecutor(max_workers=N_thread)
+
         if precision == 32:
             self._fp = np.float32
             self._cp = np.complex64
@@ -215,6 +347,12 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         self._FSk = None  # (N_antenna, N_height, N_FS+Q) FS coefficients
         self._XYZk = None  # (N_antenna, 3) BFSF coordinates
 
+        # Kernel schedule: see schedule_kernels().
+        self._schedule = None  # (N_epoch, N_antenna, 3) BFSF coordinates of kernel epochs
+        self._epoch = -1  # index of the current kernel in `_schedule`
+        self._pending = None  # (epoch, future, cancel event) kernel being built in the background
+        self._prefetcher = None
+
     @chk.check(
         dict(
             V=chk.has_complex,
@@ -250,9 +388,6 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         V = V.astype(self._cp, copy=False)
         XYZ = XYZ.astype(self._fp, copy=False)
         W = W.astype(self._cp, copy=False)
-        # need to convert array type to run on gpu
-        if isinstance(W, sparse.csr.csr_matrix) or isinstance(W, sparse.csc.csc_matrix):
-          W = W.toarray()
 
         self.unmark(self.timer_tag + "Synthesizer: astype casts")
 
@@ -270,8 +405,7 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
 
         if self._regen_required(phase_shift):
             self.mark(self.timer_tag + "Synthesizer: regenerate kernel")
-            self._regen_kernel(bfsf_XYZ)
-            phase_shift = 0
+            phase_shift = self._next_kernel(bfsf_XYZ)
             self.unmark(self.timer_tag + "Synthesizer: regenerate kernel")
 
         N_antenna, N_height, _2N1Q = self._FSk.shape
@@ -284,20 +418,26 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         #print("FSk shape:", N_antenna, N_height * _2N1Q)
         #print("PW_FS shape:", N_beam, N_height, _2N1Q)
 
-        self.mark(self.timer_tag + "Synthesizer: GPU array allocation")
-        WT_gpu = cp.asarray(W.T)
-        VT_gpu = cp.asarray(V.T) # buffer matrices on gpu to avoid slow allocation time, or directly compute on gpu
-        FSk_gpu = cp.asarray(self._FSk.reshape(N_antenna, N_height * _2N1Q))
-        self.unmark(self.timer_tag + "Synthesizer: GPU array allocation")
-
-        self.mark(self.timer_tag + "Synthesizer: GPU matmuls 2 & 3")
-        PW_FS = cp.matmul(WT_gpu, FSk_gpu)
-        E_FS = cp.matmul(VT_gpu, PW_FS)
-        
-        E_FS = E_FS.get()
-        print(E_FS.shape)
-        E_FS = E_FS.reshape(E_FS.shape[0], N_height, _2N1Q)
-        self.unmark(self.timer_tag + "Synthesizer: GPU matmuls 2 & 3")
+        if cp is None:
+            self.mark(self.timer_tag + "Synthesizer: CPU matmuls 2 & 3")
+            PW_FS = W.T @ self._FSk.reshape(N_antenna, N_height * _2N1Q)  # sparse W.T @ dense
+            E_FS = V.T @ PW_FS
+            E_FS = E_FS.reshape(E_FS.shape[0], N_height, _2N1Q)
+            self.unmark(self.timer_tag + "Synthesizer: CPU matmuls 2 & 3")
+        else:
+            self.mark(self.timer_tag + "Synthesizer: GPU array allocation")
+            WT_gpu = fsd._to_gpu(W.T)  # sparse W stays sparse: W.T @ FSk reduces over stations.
+            VT_gpu = cp.asarray(V.T) # buffer matrices on gpu to avoid slow allocation time, or directly compute on gpu
+            FSk_gpu = cp.asarray(self._FSk.reshape(N_antenna, N_height * _2N1Q))
+            self.unmark(self.timer_tag + "Synthesizer: GPU array allocation")
+
+            self.mark(self.timer_tag + "Synthesizer: GPU matmuls 2 & 3")
+            PW_FS = WT_gpu @ FSk_gpu
+            E_FS = cp.matmul(VT_gpu, PW_FS)
+
+            E_FS = E_FS.get()
+            E_FS = E_FS.reshape(E_FS.shape[0], N_height, _2N1Q)
+            self.unmark(self.timer_tag + "Synthesizer: GPU matmuls 2 & 3")
 
         self.mark(self.timer_tag + "Synthesizer: apply phase shift")
         mod_phase = -1j * 2 * np.pi * phase_shift / self._T
@@ -311,6 +451,176 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         self.unmark(self.timer_tag + "Synthesizer call")
         return I_Ny
 
+    @chk.check("XYZ", chk.has_reals)
+    def schedule_kernels(self, XYZ):
+        """
+        Plan kernel regenerations for an entire observation.
+
+        Earth rotation is deterministic, hence the timesteps at which
+        :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.__call__`
+        must regenerate the kernel are known in advance.
+        Once scheduled, the kernel of the next epoch is built in the background while the current
+        one is in use, such that :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.__call__`
+        does not block on kernel generation.
+
+        Parameters
+        ----------
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_time, N_antenna, 3) Cartesian instrument geometries of all timesteps to be imaged.
+
+            `XYZ` must be given in ICRS, and can be obtained by calling
+            :py:meth:`~pypeline.phased_array.instrument.EarthBoundInstrumentGeometryBlock.__call__`
+            with the observation's time axis.
+
+        Returns
+        -------
+        epoch_idx : :py:class:`~numpy.ndarray`
+            (N_epoch,) indices of the timesteps at which a new kernel is used.
+
+        Notes
+        -----
+        * Up to 2 kernels are held in memory at once: the current one and the next one.
+        * Timesteps can be skipped or imaged with slightly different geometries: scheduled kernels
+          are only used if they are valid for the geometry passed to
+          :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.__call__`,
+          otherwise the kernel is regenerated on the spot.
+        """
+        XYZ = np.array(XYZ, copy=False)
+        if not ((XYZ.ndim == 3) and (XYZ.shape[2] == 3) and (len(XYZ) > 0)):
+            raise ValueError("Parameter[XYZ] must have shape (N_time, N_antenna, 3).")
+        bfsf_XYZ = XYZ.astype(self._fp, copy=False) @ self._R.T
+
+        epoch_idx, XYZk = [0], bfsf_XYZ[0]
+        for i in range(1, len(bfsf_XYZ)):
+            shift = self._phase_shift(bfsf_XYZ[i], XYZk=XYZk)
+            if self._regen_required(shift):
+                epoch_idx.append(i)
+                XYZk = bfsf_XYZ[i]
+        epoch_idx = np.array(epoch_idx)
+
+        if self._prefetcher is None:
+            self._prefetcher = futures.ThreadPoolExecutor(max_workers=1)
+        self._schedule = bfsf_XYZ[epoch_idx]
+        self._sync_schedule()
+        return epoch_idx
+
+    def _sync_schedule(self):
+        """
+        Align the kernel schedule with the current kernel, and prefetch the next scheduled one.
+        """
+        if self._schedule is None:
+            return
+
+        self._cancel_prefetch()
+        self._epoch = -1
+        if self._XYZk is not None:
+            for epoch, XYZk in enumerate(self._schedule):
+                if np.array_equal(XYZk, self._XYZk):
+                    self._epoch = epoch
+                    break
+            else:  # off-schedule kernel: the next scheduled kernel is looked up when needed.
+                return
+        self._prefetch_kernel(self._epoch + 1)
+
+    def get_kernel(self):
+        """
+        Current FS kernel.
+
+        Returns
+        -------
+        FSk : :py:class:`~numpy.ndarray`
+            (N_antenna, N_height, N_FS+Q) FS coefficients, or :py:obj:`None` if no kernel was
+            computed yet.
+        XYZk : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) BFSF instrument geometry the kernel was computed at, or :py:obj:`None`.
+        """
+        return self._FSk, self._XYZk
+
+    def set_kernel(self, FSk, XYZk):
+        """
+        Replace the current FS kernel, ex: to restore a kernel obtained with
+        :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.get_kernel`.
+
+        If kernel regenerations are scheduled (see
+        :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.schedule_kernels`),
+        the schedule resumes from the epoch of the new kernel.
+
+        Parameters
+        ----------
+        FSk : :py:class:`~numpy.ndarray`
+            (N_antenna, N_height, N_FS+Q) FS coefficients.
+        XYZk : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) BFSF instrument geometry the kernel was computed at.
+        """
+        FSk = np.array(FSk, dtype=self._cp)
+        XYZk = np.array(XYZk, dtype=self._fp)
+        N_samples = fftpack.next_fast_len(self._NFS)
+        if not ((XYZk.ndim == 2) and (XYZk.shape[1] == 3)):
+            raise ValueError("Parameter[XYZk] must have shape (N_antenna, 3).")
+        if FSk.shape != (len(XYZk), len(self._grid_colat), N_samples):
+            raise ValueError("Parameters[FSk, XYZk] do not match the kernel's dimensions.")
+
+        self._FSk, self._XYZk = FSk, XYZk
+        self._sync_schedule()
+
+    def _prefetch_kernel(self, epoch):
+        """
+        Start building the kernel of a scheduled epoch in the background.
+        """
+        self._cancel_prefetch()
+        if epoch < len(self._schedule):
+            cancel = threading.Event()
+            future = self._prefetcher.submit(self._build_kernel, self._schedule[epoch], cancel)
+            self._pending = (epoch, future, cancel)
+
+    def _cancel_prefetch(self):
+        """
+        Abort the kernel being built in the background (if any), such that the prefetch worker is
+        free for the next one.
+        """
+        if self._pending is not None:
+            _, future, cancel = self._pending
+            cancel.set()
+            future.cancel()
+            self._pending = None
+
+    def _next_kernel(self, XYZ):
+        """
+        Switch to the scheduled kernel valid for `XYZ`, or regenerate the kernel at `XYZ` if none is.
+
+        Parameters
+        ----------
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) Cartesian instrument geometry.
+
+            `XYZ` must be given in BFSF.
+
+        Returns
+        -------
+        phase_shift : float
+            Angular shift [rad] of `XYZ` w.r.t. the new kernel.
+        """
+        if self._schedule is not None:
+            for epoch in range(self._epoch + 1, len(self._schedule)):
+                XYZk = self._schedule[epoch]
+                if XYZk.shape != XYZ.shape:
+                    break
+
+                shift = 0 if np.array_equal(XYZ, XYZk) else self._phase_shift(XYZ, XYZk=XYZk)
+                if not self._regen_required(shift):
+                    if (self._pending is not None) and (self._pending[0] == epoch):
+                        FSk = self._pending[1].result()
+                        self._pending = None
+                    else:  # schedule skipped ahead: the pending kernel is stale.
+                        self._cancel_prefetch()
+                        FSk = self._build_kernel(XYZk)
+                    self._FSk, self._XYZk, self._epoch = FSk, XYZk, epoch
+                    self._prefetch_kernel(epoch + 1)
+                    return shift
+
+        self._regen_kernel(XYZ)
+        return 0
+
     @chk.check("stat", chk.has_reals)
     def synthesize(self, stat):
         """
@@ -349,8 +659,8 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         )
         return field
 
-    def _phase_shift(self, XYZ):
-        """
+    def _phase_shift(self, XYZ, XYZk=None):
+        r"""
         Angular shift w.r.t kernel antenna coordinates.
 
         Parameters
@@ -359,17 +669,38 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
             (N_antenna, 3) Cartesian instrument geometry.
 
             `XYZ` must be given in BFSF.
+        XYZk : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) BFSF kernel antenna coordinates. (Default = `_XYZk`)
 
         Returns
         -------
         theta : float
-            Angular shift (radians) such that ``dot(_XYZk, R(theta).T) == XYZ``.
+            Angular shift (radians) such that ``dot(XYZk, R(theta).T) == XYZ``.
+
+        Notes
+        -----
+        With the 'reference' estimator, `theta` is the least-squares z-rotation angle between both
+        geometries restricted to a few reference antennas, which has the closed form
+        :math:`\theta = \arctan2\left(\sum_{i} x^{k}_{i} y_{i} - y^{k}_{i} x_{i}, \sum_{i} x^{k}_{i} x_{i} + y^{k}_{i} y_{i}\right)`.
+        Reference antennas are chosen once per kernel layout `XYZk`.
         """
-        R_T, *_ = linalg.lstsq(self._XYZk[:, :2], XYZ[:, :2])
+        XYZk = self._XYZk if (XYZk is None) else XYZk
+
+        if self._shift_estimator == "lstsq":
+            R_T, *_ = linalg.lstsq(XYZk[:, :2], XYZ[:, :2])
+
+            R = np.eye(3)
+            R[:2, :2] = R_T.T
+            theta = pylinalg.z_rot2angle(R)
+            return theta
 
-        R = np.eye(3)
-        R[:2, :2] = R_T.T
-        theta = pylinalg.z_rot2angle(R)
+        if (self._shift_idx is None) or (self._shift_idx[0] is not XYZk):
+            N_ref = pypeline.config.getint("phased_array.bluebild.field_synthesizer", "shift_N_reference")
+            self._shift_idx = (XYZk, instrument.reference_antennas(XYZk, N_ref))
+        idx = self._shift_idx[1]
+
+        (x_k, y_k), (x, y) = XYZk[idx, :2].T, XYZ[idx, :2].T
+        theta = np.arctan2(x_k @ y - y_k @ x, x_k @ x + y_k @ y)
         return theta
 
     def _regen_required(self, shift):
@@ -390,32 +721,82 @@ class FourierFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
 
             `XYZ` must be given in BFSF.
         """
+        self._FSk = self._build_kernel(XYZ)
+        self._XYZk = XYZ
 
+    def _build_kernel(self, XYZ, cancel=None):
+        """
+        Compute kernel without modifying the synthesizer's state. (Thread-safe.)
+
+        Parameters
+        ----------
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) Cartesian instrument geometry.
+
+            `XYZ` must be given in BFSF.
+        cancel : :py:class:`~threading.Event`
+            If set during generation, remaining antenna blocks are skipped. (Default = never)
+
+        Returns
+        -------
+        FSk : :py:class:`~numpy.ndarray`
+            (N_antenna, N_height, N_FS+Q) FS coefficients, or :py:obj:`None` if cancelled.
+        """
+        if self._kernel_cache is not None:
+            key = cache.digest(
+                "FSk", XYZ, self._wl, self._grid_colat, self._NFS,
+                self._T, self._Tc, self._alpha_window, np.dtype(self._cp).str,
+            )
+            FSk = self._kernel_cache.get(key)
+            if FSk is not None:
+                return FSk
 
         N_samples = fftpack.next_fast_len(self._NFS) # TODO: need to also cupy this (if possible)
-        lon_smpl = pyffs.ffs_sample(self._T, self._NFS, self._Tc, N_samples) # TODO: need to take first element instead of two
+        lon_smpl = pyffs.ffs_sample(self._T, self._NFS, self._Tc, N_samples)
+        if isinstance(lon_smpl, tuple):  # pyFFS >= 2 also returns sample indices.
+            lon_smpl = lon_smpl[0]
         pix_smpl = transform.pol2cart(1, self._grid_colat, lon_smpl.reshape(1, -1))
 
         N_antenna = len(XYZ)
         N_height = len(self._grid_colat)
 
-        # TODO: fix memory problems with DASK array => but can DASK work with gpu?
-        #       or break up by blocks of antenna stations?
-        #       
+        # Kernel rows only depend on their antenna: they are generated by blocks of antennas and
+        # written directly to the output (or cache file), such that intermediate buffers stay within
+        # the memory ceiling.
+        shape = (N_antenna, N_height, N_samples)
+        FSk = None
+        if self._kernel_cache is not None:
+            FSk = self._kernel_cache.allocate(key, shape, self._cp)
+        if FSk is None:
+            FSk = np.empty(shape, dtype=self._cp)
+        N_block = _kernel_block_size(N_height, N_samples, self._cp, self._N_thread)
+        N_block = min(N_block, -(-N_antenna // self._N_thread))  # keep all threads busy
+
         # `self._NFS` assumes imaging is performed with `XYZ` centered at the origin.
         XYZ_c = XYZ - XYZ.mean(axis=0)
         window = func.Tukey(self._T, self._Tc, self._alpha_window)
-        k_smpl = np.zeros((N_antenna, N_height, N_samples), dtype=self._cp) # allocate on gpu
-        ne.evaluate(
-            "exp(A * B) * C",
-            dict(
-                A=1j * 2 * np.pi / self._wl,
-                B=np.tensordot(XYZ_c, pix_smpl, axes=1),
-                C=window(lon_smpl),
-            ),
-            out=k_smpl,
-            casting="same_kind",
-        )  # Due to limitations of NumExpr2
-
-        self._FSk = pyffs.ffs(k_smpl, self._T, self._Tc, self._NFS, axis=2) #TODO:  convert to run on GPU
-        self._XYZk = XYZ
+        w_smpl = window(lon_smpl)
+
+        def work(start):  #TODO:  convert to run on GPU
+            if (cancel is not None) and cancel.is_set():
+                return
+            stop = min(start + N_block, N_antenna)
+            _kernel_block(
+                XYZ_c[start:stop], pix_smpl, w_smpl,
+                self._wl, self._T, self._Tc, self._NFS, out=FSk[start:stop],
+            )
+
+        blocks = range(0, N_antenna, N_block)
+        if self._executor is None:
+            for start in blocks:
+                work(start)
+        else:
+            list(self._executor.map(work, blocks))  # re-raises worker exceptions
+
+        if (cancel is not None) and cancel.is_set():
+            if isinstance(FSk, np.memmap):
+                self._kernel_cache.discard(FSk)
+            return None
+        if isinstance(FSk, np.memmap):
+            FSk = self._kernel_cache.commit(key, FSk)
+        return FSk
@@ -8,15 +8,25 @@
 Field synthesizers that work in the spatial domain.
 """
 
+import concurrent.futures as futures
+
 import numexpr as ne
 import numpy as np
-import cupy as cp
 import scipy.linalg as linalg
 import scipy.sparse as sparse
+import threadpoolctl
 
+import pypeline
 import pypeline.phased_array.bluebild.field_synthesizer as synth
 import imot_tools.util.argcheck as chk
 
+try:
+    import cupy as cp
+    import cupyx.scipy.sparse as cp_sparse
+except ImportError:  # CPU-only hosts: only the NumPy backend is available.
+    cp = None
+    cp_sparse = None
+
 
 def _have_matching_shapes(V, XYZ, W):
     if (V.ndim == 2) and (XYZ.ndim == 2) and (W.ndim == 2):
@@ -29,6 +39,350 @@ def _have_matching_shapes(V, XYZ, W):
     return False
 
 
+def _tile_size(N_antenna, N_beam, N_eig, N_px, itemsize, N_thread=1):
+    """
+    Number of pixels to process per tile in StandardSynthesis.
+
+    The per-pixel working set of :py:func:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain._synthesize_tile`
+    is made of one real and one complex column of height `N_antenna` (`XYZ @ grid` and its
+    exponential), a complex column of height `N_beam` (`W.T @ P`) and complex/real columns of height
+    `N_eig` (`V.T @ PW` and its squared magnitude).
+    Tiles are sized such that their working set fits in the cache budget given by
+    `[phased_array.bluebild.field_synthesizer]` in the Pypeline configuration file: the private L2
+    cache plus each thread's share of the L3 cache.
+
+    Parameters
+    ----------
+    N_antenna : int
+        Number of antennas.
+    N_beam : int
+        Number of beams.
+    N_eig : int
+        Number of eigenpairs.
+    N_px : int
+        Total number of pixels.
+    itemsize : int
+        Size [bytes] of real-valued floats.
+    N_thread : int
+        Number of threads evaluating tiles concurrently.
+
+    Returns
+    -------
+    N_tile : int
+        Number of pixels per tile.
+    """
+    cache_size, N_tile_min = _cache_budget(N_thread)
+
+    px_size = itemsize * (3 * N_antenna + 2 * N_beam + 3 * N_eig)
+    N_tile = max(cache_size // px_size, N_tile_min)
+    return int(min(N_tile, N_px))
+
+
+def _batch_size(N_antenna, N_out, N_eig, N_time, itemsize, N_thread=1):
+    """
+    Number of snapshots to process together in
+    :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain.SpatialFieldSynthesizerBlock.accumulate_batch`.
+
+    Stacking snapshots multiplies the per-pixel working set of a tile.
+    Snapshots are hence processed in chunks small enough for a tile of `min_tile_size` pixels to fit
+    in the cache budget of
+    :py:func:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain._tile_size`.
+
+    Parameters
+    ----------
+    N_antenna : int
+        Number of antennas per snapshot.
+    N_out : int
+        Number of combined statistics.
+    N_eig : int
+        Number of eigenpairs per snapshot.
+    N_time : int
+        Total number of snapshots.
+    itemsize : int
+        Size [bytes] of real-valued floats.
+    N_thread : int
+        Number of threads evaluating tiles concurrently.
+
+    Returns
+    -------
+    N_batch : int
+        Number of snapshots per chunk.
+    """
+    cache_size, N_tile_min = _cache_budget(N_thread)
+
+    px_size = itemsize * (3 * N_antenna + 3 * N_eig)  # per snapshot
+    N_batch = (cache_size // N_tile_min - itemsize * 2 * N_out) // px_size
+    return int(min(max(N_batch, 1), N_time))
+
+
+def _cache_budget(N_thread=1):
+    """
+    Returns
+    -------
+    cache_size : int
+        Cache budget [bytes] of one thread: the private L2 cache plus its share of the L3 cache.
+    N_tile_min : int
+        Minimum number of pixels per tile.
+    """
+    section = "phased_array.bluebild.field_synthesizer"
+    cache_size = pypeline.config.getint(section, "l2_cache_size") + (
+        pypeline.config.getint(section, "l3_cache_size") // N_thread
+    )
+    N_tile_min = pypeline.config.getint(section, "min_tile_size")
+    return cache_size, N_tile_min
+
+
+def _contraction_plan(N_antenna, N_beam, N_eig, nnz):
+    """
+    Choose the order in which StandardSynthesis contracts beamweights and eigenvectors.
+
+    Two plans are available:
+
+    * 'PW': ``V.T @ (W.T @ P)``, costing ``nnz + N_eig * N_beam`` operations per pixel;
+    * 'VW': ``(V.T @ W.T) @ P``, costing ``N_eig * N_antenna`` operations per pixel once the
+      (N_eig, N_antenna) product is formed.
+
+    Parameters
+    ----------
+    N_antenna : int
+        Number of antennas.
+    N_beam : int
+        Number of beams.
+    N_eig : int
+        Number of eigenpairs.
+    nnz : int
+        Number of non-zero synthesis beamweights.
+
+    Returns
+    -------
+    plan : str
+        'PW' or 'VW', whichever requires fewer operations per pixel.
+    """
+    cost_PW = nnz + N_eig * N_beam
+    cost_VW = N_eig * N_antenna
+    return "VW" if (cost_VW < cost_PW) else "PW"
+
+
+def _contraction_ops(V, W, plan):
+    """
+    Matrices to apply in sequence to the exponential tensor.
+
+    Parameters
+    ----------
+    V : :py:class:`~numpy.ndarray`
+        (N_beam, N_eig) eigenvectors.
+    W : :py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.spmatrix`
+        (N_antenna, N_beam) synthesis beamweights.
+    plan : str
+        Contraction plan from :py:func:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain._contraction_plan`.
+
+    Returns
+    -------
+    ops : tuple
+        (W.T, V.T) if `plan` is 'PW', ((W @ V).T,) if `plan` is 'VW'.
+    """
+    if plan == "VW":
+        return (np.ascontiguousarray((W @ V).T),)
+
+    WT = W.T
+    if not sparse.issparse(WT):
+        WT = np.ascontiguousarray(WT)
+    return (WT, V.T)
+
+
+def _to_gpu(A):
+    """
+    Transfer a (possibly sparse) matrix to the GPU, preserving sparsity.
+
+    Station-grouped beamweights have a single non-zero per antenna: keeping them in CSR form turns
+    products with `W` into per-station sums instead of dense (N_antenna, N_beam) GEMMs.
+
+    Parameters
+    ----------
+    A : :py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.spmatrix`
+        (M, N) matrix.
+
+    Returns
+    -------
+    A_gpu : :py:class:`~cupy.ndarray` or :py:class:`~cupyx.scipy.sparse.csr_matrix`
+        (M, N) matrix on the GPU.
+    """
+    if sparse.issparse(A):
+        return cp_sparse.csr_matrix(A.tocsr())
+    return cp.asarray(A)
+
+
+def _synthesize_tile(XYZ, ops, a, pix, P, I, threaded=False):
+    """
+    StandardSynthesis on a tile of pixels.
+
+    The full chain ``|ops[-1] @ ... @ ops[0] @ exp(a * XYZ @ pix)|^2`` is evaluated on `pix` only,
+    such that all intermediate arrays remain cache-sized.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) centered Cartesian instrument geometry.
+    ops : tuple
+        Matrices (dense or sparse) applied in sequence to the exponential tensor, as given by
+        :py:func:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain._contraction_ops`.
+        The first has N_antenna columns, the last has N_eig rows.
+    a : complex
+        Exponential scale factor.
+    pix : :py:class:`~numpy.ndarray`
+        (3, N_tile) pixel vectors.
+    P : :py:class:`~numpy.ndarray`
+        (N_antenna * N_tile_max,) complex-valued scratch buffer, with N_tile_max >= N_tile.
+    I : :py:class:`~numpy.ndarray`
+        (N_eig, N_tile) real-valued buffer to which field statistics are written.
+    threaded : bool
+        If :py:obj:`True`, the exponential is evaluated with single-threaded NumPy ufuncs instead of
+        NumExpr, whose thread pool would otherwise compete with concurrent tiles.
+    """
+    N_antenna, N_tile = len(XYZ), pix.shape[1]
+    P = P[: N_antenna * N_tile].reshape(N_antenna, N_tile)
+
+    B = XYZ @ pix
+    if threaded:  # a is purely imaginary
+        B *= a.imag
+        np.cos(B, out=P.real)
+        np.sin(B, out=P.imag)
+    else:
+        ne.evaluate(
+            "exp(A * B)", dict(A=a, B=B), out=P, casting="same_kind"
+        )  # Due to limitations of NumExpr2
+    E = P
+    for op in ops:
+        E = op @ E
+    np.multiply(E.real, E.real, out=I)
+    I += E.imag ** 2
+
+
+def _map_tiles(work, N_px, N_tile, executor=None, N_thread=1):
+    """
+    Apply a tile kernel to all tiles of a pixel grid.
+
+    Parameters
+    ----------
+    work : callable
+        Function ``work(tile_set, threaded)`` processing a list of pixel slices in sequence.
+    N_px : int
+        Total number of pixels.
+    N_tile : int
+        Number of pixels per tile.
+    executor : :py:class:`~concurrent.futures.Executor`
+        Thread pool used to process tiles concurrently. (Default = serial evaluation)
+    N_thread : int
+        Number of threads in `executor`.
+
+    Notes
+    -----
+    In threaded mode, the pixel grid is split into `N_thread` disjoint (interleaved) sets of tiles,
+    each of which is processed by a single worker with its own scratch buffer.
+    BLAS is restricted to one thread per worker for the duration of the call.
+    """
+    tiles = [slice(start, min(start + N_tile, N_px)) for start in range(0, N_px, N_tile)]
+
+    if (executor is None) or (N_thread == 1) or (len(tiles) == 1):
+        work(tiles, False)
+    else:
+        tile_sets = [tiles[i::N_thread] for i in range(N_thread)]
+        with threadpoolctl.threadpool_limits(limits=1, user_api="blas"):
+            jobs = [executor.submit(work, tile_set, True) for tile_set in tile_sets]
+            for job in jobs:
+                job.result()
+
+
+def _synthesize_grid(XYZ, ops, a, grid, N_tile, I, executor=None, N_thread=1, C=None):
+    """
+    StandardSynthesis over all tiles of a pixel grid.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) centered Cartesian instrument geometry.
+    ops : tuple
+        Matrices applied in sequence to the exponential tensor.
+        (See :py:func:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain._synthesize_tile`.)
+    a : complex
+        Exponential scale factor.
+    grid : :py:class:`~numpy.ndarray`
+        (3, N_px) pixel vectors.
+    N_tile : int
+        Number of pixels per tile.
+    I : :py:class:`~numpy.ndarray`
+        (N_eig, N_px) preallocated real-valued buffer to which field statistics are written.
+
+        If `C` is provided, (N_out, N_px) buffer to which ``C @ stat`` is added instead.
+    executor : :py:class:`~concurrent.futures.Executor`
+        Thread pool used to process tiles concurrently. (Default = serial evaluation)
+    N_thread : int
+        Number of threads in `executor`.
+    C : :py:class:`~numpy.ndarray`
+        (N_out, N_eig) real-valued combination weights. (Default = no combination)
+    """
+    N_antenna, N_px = len(XYZ), grid.shape[1]
+
+    def work(tile_set, threaded):
+        P = np.empty((N_antenna * N_tile,), dtype=np.result_type(I.dtype, 1j))
+        if C is None:
+            for tile in tile_set:
+                _synthesize_tile(XYZ, ops, a, grid[:, tile], P, I[:, tile], threaded)
+        else:
+            I_tile = np.empty((C.shape[1], N_tile), dtype=I.dtype)
+            for tile in tile_set:
+                I_t = I_tile[:, : (tile.stop - tile.start)]
+                _synthesize_tile(XYZ, ops, a, grid[:, tile], P, I_t, threaded)
+                I[:, tile] += C @ I_t
+
+    _map_tiles(work, N_px, N_tile, executor, N_thread)
+
+
+def _accumulate_batch_tile(XYZ, VW, a, pix, C, P, out, threaded=False):
+    """
+    Accumulate linear combinations of StandardSynthesis statistics over many snapshots on a tile of
+    pixels.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_time, N_antenna, 3) centered Cartesian instrument geometries.
+    VW : :py:class:`~numpy.ndarray`
+        (N_time, N_eig, N_antenna) projections ``V.T @ W.T`` of each snapshot.
+    a : complex
+        Exponential scale factor.
+    pix : :py:class:`~numpy.ndarray`
+        (3, N_tile) pixel vectors.
+    C : :py:class:`~numpy.ndarray`
+        (N_out, N_time * N_eig) real-valued combination weights.
+    P : :py:class:`~numpy.ndarray`
+        (N_time * N_antenna * N_tile_max,) complex-valued scratch buffer, with N_tile_max >= N_tile.
+    out : :py:class:`~numpy.ndarray`
+        (N_out, N_tile) real-valued buffer to which ``C @ stat`` is added.
+    threaded : bool
+        If :py:obj:`True`, evaluate the exponential with single-threaded NumPy ufuncs.
+    """
+    N_time, N_antenna, _ = XYZ.shape
+    N_tile = pix.shape[1]
+    P = P[: N_time * N_antenna * N_tile].reshape(N_time, N_antenna, N_tile)
+
+    B = XYZ @ pix
+    if threaded:  # a is purely imaginary
+        B *= a.imag
+        np.cos(B, out=P.real)
+        np.sin(B, out=P.imag)
+    else:
+        ne.evaluate(
+            "exp(A * B)", dict(A=a, B=B), out=P, casting="same_kind"
+        )  # Due to limitations of NumExpr2
+
+    # One batched product for all snapshots, then a single reduction GEMM over (time, eigenpair).
+    E = (VW @ P).reshape(-1, N_tile)
+    I = E.real ** 2
+    I += E.imag ** 2
+    out += C @ I
+
+
 class SpatialFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
     """
     Field synthesizer based on StandardSynthesis.
@@ -126,19 +480,45 @@ class SpatialFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
     .. image:: _img/bluebild_SpatialFieldSynthesizer_snapshot_example.png
     """
 
-    @chk.check(dict(wl=chk.is_real, pix_grid=chk.has_reals, precision=chk.is_integer))
-    def __init__(self, wl, pix_grid, precision=64):
+    @chk.check(
+        dict(
+            wl=chk.is_real,
+            pix_grid=chk.has_reals,
+            precision=chk.is_integer,
+            backend=chk.allow_None(chk.is_instance(str)),
+            N_thread=chk.is_integer,
+            contraction=chk.allow_None(chk.is_instance(str)),
+        )
+    )
+    def __init__(self, wl, pix_grid, precision=64, backend=None, N_thread=1, contraction=None):
         """
         Parameters
         ----------
         wl : float
             Wavelength [m] of observations.
         pix_grid : :py:class:`~numpy.ndarray`
-            (3, N_px) pixel vectors.
+            (3, N_height, N_width) pixel vectors.
         precision : int
             Numerical accuracy of floating-point operations.
 
             Must be 32 or 64.
+        backend : str
+            Array backend used to evaluate field statistics. (Default = 'gpu' if CuPy is available, 'cpu' otherwise.)
+
+            * 'cpu': NumPy/NumExpr evaluation on cache-sized pixel tiles;
+            * 'gpu': CuPy evaluation, one grid column at a time.
+        N_thread : int
+            Number of CPU threads used to process pixel tiles concurrently. (Default = 1)
+
+            Only used by the 'cpu' backend.
+        contraction : str
+            Order in which beamweights and eigenvectors are applied to the exponential tensor.
+            (Default = cheapest plan given the shapes of `V` and `W`, chosen at every call.)
+
+            * 'PW': ``V.T @ (W.T @ P)``;
+            * 'VW': ``(V.T @ W.T) @ P``.
+
+            The plan used is reported through the timer.
         """
         super().__init__()
 
@@ -151,6 +531,25 @@ class SpatialFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         else:
             raise ValueError("Parameter[precision] must be 32 or 64.")
 
+        if backend is None:
+            backend = "cpu" if (cp is None) else "gpu"
+        if backend not in ("cpu", "gpu"):
+            raise ValueError("Parameter[backend] must be 'cpu' or 'gpu'.")
+        if (backend == "gpu") and (cp is None):
+            raise ValueError("Parameter[backend]='gpu' requires CuPy.")
+        self._backend = backend
+
+        if N_thread <= 0:
+            raise ValueError("Parameter[N_thread] must be positive.")
+        self._N_thread = N_thread
+        self._executor = None
+        if N_thread > 1:
+            self._executor = futures.ThreadPoolExecutor(max_workers=N_thread)
+
+        if contraction not in (None, "PW", "VW"):
+            raise ValueError("Parameter[contraction] must be 'PW' or 'VW'.")
+        self._contraction = contraction
+
         self._wl = wl
 
         if not ((pix_grid.ndim == 3) and (len(pix_grid) == 3)):
@@ -182,15 +581,69 @@ class SpatialFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         Returns
         -------
         stat : :py:class:`~numpy.ndarray`
-            (N_eig, N_px) field statistics.
+            (N_eig, N_height, N_width) field statistics.
 
             (Note: StandardSynthesis statistics correspond to the actual field values.)
         """
-
         self.mark(self.timer_tag + "Synthesizer call")
+        I = self._evaluate(V, XYZ, W)
+        self.unmark(self.timer_tag + "Synthesizer call")
+        return I
+
+    @chk.check(
+        dict(
+            V=chk.has_complex,
+            XYZ=chk.has_reals,
+            W=chk.is_instance(np.ndarray, sparse.csr_matrix, sparse.csc_matrix),
+            C=chk.has_reals,
+            out=chk.is_instance(np.ndarray),
+        )
+    )
+    def accumulate(self, V, XYZ, W, C, out):
+        """
+        Accumulate linear combinations of instantaneous field statistics.
 
-        
+        This is equivalent to ``out += np.tensordot(C, self(V, XYZ, W), axes=1)``, but statistics
+        are combined one pixel tile at a time, i.e. (N_eig, N_height, N_width) statistics are never
+        formed in full.
 
+        Parameters
+        ----------
+        V : :py:class:`~numpy.ndarray`
+            (N_beam, N_eig) complex-valued eigenvectors.
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_antenna, 3) Cartesian instrument geometry.
+        W : :py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.csr_matrix` or :py:class:`~scipy.sparse.csc_matrix`
+            (N_antenna, N_beam) synthesis beamweights.
+        C : :py:class:`~numpy.ndarray`
+            (N_out, N_eig) real-valued combination weights.
+        out : :py:class:`~numpy.ndarray`
+            (N_out, N_height, N_width) C-contiguous buffer to which combined statistics are added.
+
+        Returns
+        -------
+        out : :py:class:`~numpy.ndarray`
+            (N_out, N_height, N_width) combined field statistics.
+        """
+        C = np.asarray(C, dtype=self._fp)
+        if C.shape != (C.shape[0], V.shape[1]):
+            raise ValueError("Parameters[V, C] are inconsistent.")
+        if out.shape != (C.shape[0],) + self._grid.shape[1:]:
+            raise ValueError("Parameter[out] does not match the grid's dimensions.")
+        if not out.flags.c_contiguous:
+            raise ValueError("Parameter[out] must be C-contiguous.")
+
+        self.mark(self.timer_tag + "Synthesizer accumulate call")
+        self._evaluate(V, XYZ, W, C, out)
+        self.unmark(self.timer_tag + "Synthesizer accumulate call")
+        return out
+
+    def _evaluate(self, V, XYZ, W, C=None, out=None):
+        """
+        Shared implementation of
+        :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain.SpatialFieldSynthesizerBlock.__call__`
+        and :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain.SpatialFieldSynthesizerBlock.accumulate`.
+        """
         self.mark(self.timer_tag + "Synthesizer numpy/cupy formatting & array allocation")
         if not _have_matching_shapes(V, XYZ, W):
             raise ValueError("Parameters[V, XYZ, W] are inconsistent.")
@@ -198,40 +651,219 @@ class SpatialFieldSynthesizerBlock(synth.FieldSynthesizerBlock):
         XYZ = XYZ.astype(self._fp, copy=False)
         W = W.astype(self._cp, copy=False)
 
-        # need to convert array type to run on gpu
-        if isinstance(W, sparse.csr.csr_matrix) or isinstance(W, sparse.csc.csc_matrix):
-          W = W.toarray()
+        XYZ = XYZ - XYZ.mean(axis=0)
+        a = 1j * 2 * np.pi / self._wl
+        self.unmark(self.timer_tag + "Synthesizer numpy/cupy formatting & array allocation")
+
+        plan = self._plan(V, W)
+        self.mark(self.timer_tag + "Synthesizer matmuls")
+        self.mark(self.timer_tag + f"Synthesizer {plan} contraction")
+        if self._backend == "gpu":
+            I = self._synthesize_gpu(V, XYZ, W, a, plan)
+            if C is not None:
+                out += np.tensordot(C, I, axes=1)
+                I = out
+        else:
+            I = self._synthesize_cpu(V, XYZ, W, a, plan, C, out)
+        self.unmark(self.timer_tag + f"Synthesizer {plan} contraction")
+        self.unmark(self.timer_tag + "Synthesizer matmuls")
+        return I
+
+    def _plan(self, V, W):
+        """
+        Contraction plan used to synthesize statistics from (V, W).
+
+        Returns
+        -------
+        plan : str
+            'PW' or 'VW'.
+        """
+        if self._contraction is not None:
+            return self._contraction
+
+        N_antenna, N_beam = W.shape
+        N_eig = V.shape[1]
+        nnz = W.nnz if sparse.issparse(W) else W.size
+        return _contraction_plan(N_antenna, N_beam, N_eig, nnz)
+
+    def _synthesize_cpu(self, V, XYZ, W, a, plan, C=None, out=None):
+        """
+        StandardSynthesis on the CPU, one pixel tile at a time.
 
+        Peak memory is bounded by the tile size instead of the (N_antenna, N_height, N_width)
+        exponential tensor.
+        Tiles are distributed over `N_thread` workers.
+
+        If (N_out, N_eig) weights `C` are given, ``C @ I`` is added to `out` tile by tile instead.
+
+        Returns
+        -------
+        I : :py:class:`~numpy.ndarray`
+            (N_eig, N_height, N_width) field statistics, or `out`.
+        """
         N_antenna, N_beam = W.shape
         N_height, N_width = self._grid.shape[1:]
         N_eig = V.shape[1]
+        N_px = N_height * N_width
+
+        grid = self._grid.reshape(3, N_px).astype(self._fp, copy=False)
+        ops = _contraction_ops(V, W, plan)
+
+        N_out = 0 if (C is None) else len(C)
+        N_tile = _tile_size(
+            N_antenna,
+            (N_beam if (plan == "PW") else 0) + N_out,
+            N_eig,
+            N_px,
+            np.dtype(self._fp).itemsize,
+            self._N_thread,
+        )
+        if C is None:
+            I = np.empty((N_eig, N_px), dtype=self._fp)
+            _synthesize_grid(XYZ, ops, a, grid, N_tile, I, self._executor, self._N_thread)
+            return I.reshape(N_eig, N_height, N_width)
 
-        XYZ = XYZ - XYZ.mean(axis=0)
+        I = out.reshape(N_out, N_px)
+        _synthesize_grid(XYZ, ops, a, grid, N_tile, I, self._executor, self._N_thread, C)
+        return out
 
-        XYZ_gpu = cp.asarray(XYZ)
-        WT_gpu  = cp.asarray(W.T)
-        VT_gpu  = cp.asarray(V.T)
+    def _synthesize_gpu(self, V, XYZ, W, a, plan):
+        """
+        StandardSynthesis on the GPU, one grid column at a time.
 
-        a = 1j * 2 * np.pi / self._wl
-        E  = np.zeros((N_eig, N_height, N_width),  dtype=self._cp)
+        Returns
+        -------
+        I : :py:class:`~numpy.ndarray`
+            (N_eig, N_height, N_width) field statistics.
+        """
+        N_height, N_width = self._grid.shape[1:]
+        N_eig = V.shape[1]
 
-        self.unmark(self.timer_tag + "Synthesizer numpy/cupy formatting & array allocation")
+        XYZ_gpu = cp.asarray(XYZ)
+        ops_gpu = [_to_gpu(op) for op in _contraction_ops(V, W, plan)]
 
-        self.mark(self.timer_tag + "Synthesizer matmuls")
-        for i in range(N_width):        
-          pix_gpu = cp.asarray(self._grid[:,:,i])
-          B  = cp.matmul(XYZ_gpu, pix_gpu)
-          P  = cp.exp(B*a)        
-          PW = cp.matmul(WT_gpu,P)
-          E_part = cp.matmul(VT_gpu, PW)
-          E[:,:,i] = E_part.get()
+        E = np.zeros((N_eig, N_height, N_width), dtype=self._cp)
+        for i in range(N_width):
+            pix_gpu = cp.asarray(self._grid[:, :, i])
+            B = cp.matmul(XYZ_gpu, pix_gpu)
+            E_part = cp.exp(B * a)
+            for op_gpu in ops_gpu:
+                E_part = op_gpu @ E_part
+            E[:, :, i] = E_part.get()
 
         I = E.real ** 2 + E.imag ** 2
-        self.unmark(self.timer_tag + "Synthesizer matmuls")
+        return I
 
-        self.unmark(self.timer_tag + "Synthesizer call")
+    @chk.check(
+        dict(
+            V=chk.is_instance(list, tuple),
+            XYZ=chk.is_instance(list, tuple),
+            W=chk.is_instance(list, tuple),
+            C=chk.has_reals,
+        )
+    )
+    def accumulate_batch(self, V, XYZ, W, C, out=None):
+        """
+        Accumulate linear combinations of field statistics over many snapshots.
 
-        return I
+        Snapshots are processed together: ``V_t.T @ W_t.T`` is contracted once per snapshot, after
+        which each pixel tile requires one batched product against the stacked exponentials of all
+        snapshots, followed by one reduction through `C`.
+        Large batches are split in chunks of snapshots such that the stacked working set of a tile
+        stays within the cache budget.
+
+        Parameters
+        ----------
+        V : list(:py:class:`~numpy.ndarray`)
+            (N_time,) complex-valued eigenvectors, each of shape (N_beam, N_eig).
+        XYZ : list(:py:class:`~numpy.ndarray`)
+            (N_time,) Cartesian instrument geometries, each of shape (N_antenna, 3).
+        W : list(:py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.csr_matrix` or :py:class:`~scipy.sparse.csc_matrix`)
+            (N_time,) synthesis beamweights, each of shape (N_antenna, N_beam).
+        C : :py:class:`~numpy.ndarray`
+            (N_out, N_time * N_eig) real-valued weights applied to the (N_time * N_eig) field
+            statistics, ordered by snapshot first.
+        out : :py:class:`~numpy.ndarray`
+            (N_out, N_height, N_width) buffer to which the combined statistics are added.
+            (Default = new 0-initialized buffer)
+
+        Returns
+        -------
+        out : :py:class:`~numpy.ndarray`
+            (N_out, N_height, N_width) combined field statistics.
+        """
+        N_time = len(V)
+        if not (len(XYZ) == len(W) == N_time > 0):
+            raise ValueError("Parameters[V, XYZ, W] must have the same non-zero length.")
+        for V_t, XYZ_t, W_t in zip(V, XYZ, W):
+            if not _have_matching_shapes(V_t, XYZ_t, W_t):
+                raise ValueError("Parameters[V, XYZ, W] are inconsistent.")
+        if len(set(V_t.shape[1] for V_t in V)) != 1:
+            raise ValueError("Parameter[V] must have the same number of eigenpairs per snapshot.")
+        if len(set(len(XYZ_t) for XYZ_t in XYZ)) != 1:
+            raise ValueError("Parameter[XYZ] must have the same number of antennas per snapshot.")
+
+        N_antenna, N_eig = len(XYZ[0]), V[0].shape[1]
+        N_height, N_width = self._grid.shape[1:]
+        N_px = N_height * N_width
+
+        C = np.asarray(C, dtype=self._fp)
+        N_out = len(C)
+        if C.shape != (N_out, N_time * N_eig):
+            raise ValueError("Parameter[C] is incorrectly shaped.")
+
+        if out is None:
+            out = np.zeros((N_out, N_height, N_width), dtype=self._fp)
+        elif out.shape != (N_out, N_height, N_width):
+            raise ValueError("Parameter[out] does not match the grid's dimensions.")
+        elif not out.flags.c_contiguous:
+            raise ValueError("Parameter[out] must be C-contiguous.")
+
+        self.mark(self.timer_tag + "Synthesizer batch call")
+        a = 1j * 2 * np.pi / self._wl
+        if self._backend == "gpu":
+            for t in range(N_time):
+                stat = self.__call__(V[t], XYZ[t], W[t])
+                C_t = C[:, t * N_eig : (t + 1) * N_eig]
+                out += np.tensordot(C_t, stat, axes=1)
+        else:
+            itemsize = np.dtype(self._fp).itemsize
+            N_batch = _batch_size(N_antenna, N_out, N_eig, N_time, itemsize, self._N_thread)
+            grid = self._grid.reshape(3, N_px).astype(self._fp, copy=False)
+            out_flat = out.reshape(N_out, N_px)
+
+            for t_start in range(0, N_time, N_batch):
+                t_batch = slice(t_start, min(t_start + N_batch, N_time))
+                N_t = t_batch.stop - t_batch.start
+                C_t = C[:, t_batch.start * N_eig : t_batch.stop * N_eig]
+                XYZ_c = np.stack(
+                    [_.astype(self._fp) - _.mean(axis=0) for _ in XYZ[t_batch]], axis=0
+                )
+                VW = np.stack(
+                    [
+                        (W_t.astype(self._cp) @ V_t.astype(self._cp)).T
+                        for V_t, W_t in zip(V[t_batch], W[t_batch])
+                    ],
+                    axis=0,
+                )  # (N_t, N_eig, N_antenna)
+
+                # Per-pixel working set: exponential (real + complex) of the stacked geometries, the
+                # stacked (N_t * N_eig) statistics and the N_out combined statistics.
+                N_tile = _tile_size(
+                    N_t * N_antenna, N_out, N_t * N_eig, N_px, itemsize, self._N_thread
+                )
+
+                def work(tile_set, threaded):
+                    P = np.empty((N_t * N_antenna * N_tile,), dtype=self._cp)
+                    for tile in tile_set:
+                        _accumulate_batch_tile(
+                            XYZ_c, VW, a, grid[:, tile], C_t, P, out_flat[:, tile], threaded
+                        )
+
+                _map_tiles(work, N_px, N_tile, self._executor, self._N_thread)
+        self.unmark(self.timer_tag + "Synthesizer batch call")
+
+        return out
 
     @chk.check("stat", chk.has_reals)
     def synthesize(self, stat):
@@ -8,26 +8,17 @@
 Field synthesizers that work in the spatial domain.
 """
 
-import numexpr as ne
+import concurrent.futures as futures
+
 import numpy as np
 import scipy.linalg as linalg
 import scipy.sparse as sparse
 
 import pypeline.phased_array.bluebild.field_synthesizer as synth
+import pypeline.phased_array.bluebild.field_synthesizer.spatial_domain as ssd
 import imot_tools.util.argcheck as chk
 
 
-def _have_matching_shapes(V, XYZ, W):
-    if (V.ndim == 2) and (XYZ.ndim == 2) and (W.ndim == 2):
-        if V.shape[0] != W.shape[1]:  # N_beam
-            return False
-        if W.shape[0] != XYZ.shape[0]:  # N_antenna
-            return False
-        return True
-
-    return False
-
-
 class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
     """
     Field synthesizer based on StandardSynthesis, but with attempts at optimization
@@ -125,8 +116,16 @@ class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
     .. image:: _img/bluebild_SpatialFieldSynthesizer_snapshot_example.png
     """
 
-    @chk.check(dict(wl=chk.is_real, pix_grid=chk.has_reals, precision=chk.is_integer))
-    def __init__(self, wl, pix_grid, precision=64):
+    @chk.check(
+        dict(
+            wl=chk.is_real,
+            pix_grid=chk.has_reals,
+            precision=chk.is_integer,
+            N_thread=chk.is_integer,
+            contraction=chk.allow_None(chk.is_instance(str)),
+        )
+    )
+    def __init__(self, wl, pix_grid, precision=64, N_thread=1, contraction=None):
         """
         Parameters
         ----------
@@ -138,6 +137,16 @@ class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
             Numerical accuracy of floating-point operations.
 
             Must be 32 or 64.
+        N_thread : int
+            Number of threads used to process pixel tiles concurrently. (Default = 1)
+        contraction : str
+            Order in which beamweights and eigenvectors are applied to the exponential tensor.
+            (Default = cheapest plan given the shapes of `V` and `W`, chosen at every call.)
+
+            * 'PW': ``V.T @ (W.T @ P)``;
+            * 'VW': ``(V.T @ W.T) @ P``.
+
+            The plan used is reported through the timer.
         """
         super().__init__()
 
@@ -150,6 +159,17 @@ class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
         else:
             raise ValueError("Parameter[precision] must be 32 or 64.")
 
+        if N_thread <= 0:
+            raise ValueError("Parameter[N_thread] must be positive.")
+        self._N_thread = N_thread
+        self._executor = None
+        if N_thread > 1:
+            self._executor = futures.ThreadPoolExecutor(max_workers=N_thread)
+
+        if contraction not in (None, "PW", "VW"):
+            raise ValueError("Parameter[contraction] must be 'PW' or 'VW'.")
+        self._contraction = contraction
+
         self._wl = wl
 
         if not ((pix_grid.ndim == 3) and (len(pix_grid) == 3)):
@@ -186,11 +206,10 @@ class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
 
             (Note: StandardSynthesis statistics correspond to the actual field values.)
         """
-        self.timer.start_time(self.timer_tag + "Synthesizer call")
+        self.mark(self.timer_tag + "Synthesizer call")
 
-        self.timer.start_time(self.timer_tag + "Synthesizer numpy formatting")
-        if not _have_matching_shapes(V, XYZ, W):
-            print(V.shape, XYZ.shape, W.shape)
+        self.mark(self.timer_tag + "Synthesizer numpy formatting")
+        if not ssd._have_matching_shapes(V, XYZ, W):
             raise ValueError("Parameters[V, XYZ, W] are inconsistent.")
         V = V.astype(self._cp, copy=False)
         XYZ = XYZ.astype(self._fp, copy=False)
@@ -198,57 +217,46 @@ class SpatialFieldSynthesizerOptimizedBlock(synth.FieldSynthesizerBlock):
 
         N_antenna, N_beam = W.shape
         N_height, N_width = self._grid.shape[1:]
+        N_eig = V.shape[1]
+        N_px = N_height * N_width
 
         XYZ = XYZ - XYZ.mean(axis=0)
-        P = np.zeros((N_antenna, N_height, N_width), dtype=self._cp)
-
-        self.timer.end_time(self.timer_tag + "Synthesizer numpy formatting")
-
-        self.timer.start_time(self.timer_tag + "Synthesizer numpy tensordot 1")
+        grid = self._grid.reshape(3, N_px).astype(self._fp, copy=False)
         a = 1j * 2 * np.pi / self._wl
-        # tensordot with axes = 1 is equivalent to XYZ dot self_grid
-        # A = (550, 3) , B = (3, 248, 124) , out = (550, 248, 124)
-        # general case for 2D matrices: A = m x n, B = n x p, out = m x p with Nops = m*n*p
-        # more generally, each axis must be looped over to calculate the new entry in the output matrix
-        # https://numpy.org/doc/stable/reference/generated/numpy.tensordot.html
-        b = np.tensordot(XYZ, self._grid, axes=1)
-        self.timer.end_time(self.timer_tag + "Synthesizer numpy tensordot 1")
-        print("A =", XYZ.shape, ", B =", self._grid.shape, ", out =", b.shape)
-        nops =  XYZ.shape[0]*self._grid.shape[0]*self._grid.shape[1]*self._grid.shape[2]
-        #nops =  XYZ.shape[0]*self._grid.shape[0]*self._grid.shape[1]
-        self.timer.set_Nops(self.timer_tag + "Synthesizer numpy tensordot 1", nops)
-
-        self.timer.start_time(self.timer_tag + "Synthesizer numexpr exponential")
-        print(a,b.shape)
-        ne.evaluate(
-            "exp(A * B)",
-            dict(A=a, B=b),
-            out=P,
-            casting="same_kind",
-        )  # Due to limitations of NumExpr2
-        self.timer.end_time(self.timer_tag + "Synthesizer numexpr exponential")
-        nops =  b.shape[0]*b.shape[1]
-        self.timer.set_Nops(self.timer_tag + "Synthesizer numpy tensordot1", nops)
-
-        self.timer.start_time(self.timer_tag + "Synthesizer numpy reshaping")
-        PW = W.T @ P.reshape(N_antenna, N_height * N_width)
-        PW = PW.reshape(N_beam, N_height, N_width)
-        self.timer.end_time(self.timer_tag + "Synthesizer numpy reshaping")
-
-        self.timer.start_time(self.timer_tag + "Synthesizer numpy tensordot 2")
-        # tensordot with axes = 1 is equivalent to V.T dot PW
-        # A = (12, 24) , B = (24, 248, 124) , out = (12, 248, 124)
-        E = np.tensordot(V.T, PW, axes=1)
-        self.timer.end_time(self.timer_tag + "Synthesizer numpy tensordot 2")
-        nops = (V.T).shape[0]*PW.shape[0]*PW.shape[1]*PW.shape[2]
-        print("A =", (V.T).shape, ", B =", PW.shape, ", out =", E.shape)
-        #nops = (V.T).shape[0]*PW.shape[0]*PW.shape[1]
-        self.timer.set_Nops(self.timer_tag + "Synthesizer numpy tensordot 2", nops)
-        I = E.real ** 2 + E.imag ** 2
-
-        self.timer.end_time(self.timer_tag + "Synthesizer call")
-
-        return I
+
+        plan = self._contraction
+        if plan is None:
+            nnz = W.nnz if sparse.issparse(W) else W.size
+            plan = ssd._contraction_plan(N_antenna, N_beam, N_eig, nnz)
+        ops = ssd._contraction_ops(V, W, plan)
+
+        N_tile = ssd._tile_size(
+            N_antenna,
+            N_beam if (plan == "PW") else 0,
+            N_eig,
+            N_px,
+            np.dtype(self._fp).itemsize,
+            self._N_thread,
+        )
+        I = np.empty((N_eig, N_px), dtype=self._fp)
+        self.unmark(self.timer_tag + "Synthesizer numpy formatting")
+
+        # Each tile evaluates the tensordot, the exponential and both matrix products in one go,
+        # hence the stages are timed together.
+        tag = self.timer_tag + f"Synthesizer tiled evaluation ({plan} contraction)"
+        self.mark(tag)
+        ssd._synthesize_grid(XYZ, ops, a, grid, N_tile, I, self._executor, self._N_thread)
+        self.unmark(tag)
+        if self.timer:
+            if plan == "PW":
+                nops = N_px * (3 * N_antenna + N_beam * N_antenna + N_eig * N_beam)
+            else:
+                nops = N_px * (3 * N_antenna + N_eig * N_antenna)
+            self.timer.set_Nops(tag, nops)
+
+        self.unmark(self.timer_tag + "Synthesizer call")
+
+        return I.reshape(N_eig, N_height, N_width)
 
     @chk.check("stat", chk.has_reals)
     def synthesize(self, stat):
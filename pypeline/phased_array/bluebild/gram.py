@@ -11,13 +11,155 @@ Gram-related operations and tools.
 import imot_tools.util.argcheck as chk
 import numpy as np
 import scipy.linalg as linalg
+import scipy.sparse as sparse
 
+import pypeline
 import pypeline.core as core
 import pypeline.phased_array.beamforming as beamforming
 import pypeline.phased_array.instrument as instrument
 import pypeline.util.array as array
 
 
+def _sinc_kernel(XYZ_a, XYZ_b, wl):
+    """
+    Antenna-level Gram coefficients between two sets of antennas.
+
+    Parameters
+    ----------
+    XYZ_a : :py:class:`~numpy.ndarray`
+        (N_a, 3) Cartesian antenna coordinates.
+    XYZ_b : :py:class:`~numpy.ndarray`
+        (N_b, 3) Cartesian antenna coordinates.
+    wl : float or :py:class:`~numpy.ndarray`
+        Wavelength [m], or (N_wl,) wavelengths.
+
+    Returns
+    -------
+    G_1 : :py:class:`~numpy.ndarray`
+        (N_a, N_b) real-valued Gram coefficients ``4 * pi * sinc(2 / wl * |XYZ_a - XYZ_b|)``, or
+        (N_wl, N_a, N_b) coefficients if several wavelengths are given.
+    """
+    baseline = linalg.norm(XYZ_a[:, np.newaxis, :] - XYZ_b[np.newaxis, :, :], axis=-1)
+    scale = np.reshape(2 / np.asarray(wl), np.shape(wl) + (1, 1))
+    return (4 * np.pi) * np.sinc(scale * baseline)
+
+
+def _project_gram(XYZ, W, wl, N_tile):
+    """
+    Beam-level Gram matrix ``W^H G_1 W``, streamed over antenna-pair tiles.
+
+    `G_1` is never formed in full: (N_tile, N_tile) blocks are generated on the fly and projected
+    onto the beams of the antennas they involve.
+    Since `G_1` is real symmetric, only blocks on or above the diagonal are evaluated; the
+    contribution of their mirror image is the Hermitian transpose of the projected block.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) Cartesian antenna coordinates.
+    W : :py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.spmatrix`
+        (N_antenna, N_beam) synthesis beamweights.
+    wl : float or :py:class:`~numpy.ndarray`
+        Wavelength [m], or (N_wl,) wavelengths.
+
+        Baselines of a tile are computed once for all wavelengths.
+    N_tile : int
+        Number of antennas per tile.
+
+    Returns
+    -------
+    G_2 : :py:class:`~numpy.ndarray`
+        (N_beam, N_beam) Gram matrix, or (N_wl, N_beam, N_beam) Gram matrices if several wavelengths
+        are given.
+    """
+    N_antenna, N_beam = W.shape
+    N_wl = np.size(wl)
+    if sparse.issparse(W):
+        W = W.tocsr()  # cheap row slicing; products with W reduce over each station's antennas.
+
+    tiles = [slice(start, min(start + N_tile, N_antenna)) for start in range(0, N_antenna, N_tile)]
+    W_tiles = [W[tile] for tile in tiles]
+
+    G_2 = np.zeros((N_wl, N_beam, N_beam), dtype=complex)
+    for i, tile_i in enumerate(tiles):
+        WH_i = W_tiles[i].conj().T
+        for j in range(i, len(tiles)):
+            G_ij = _sinc_kernel(XYZ[tile_i], XYZ[tiles[j]], np.reshape(wl, N_wl))
+            for k in range(N_wl):
+                T_ij = WH_i @ (G_ij[k] @ W_tiles[j])
+                G_2[k] += T_ij
+                if j > i:
+                    G_2[k] += T_ij.conj().T
+    return G_2.reshape(np.shape(wl) + (N_beam, N_beam))
+
+
+def _gram_kernel(XYZ, wl, N_tile):
+    """
+    Antenna-level Gram matrix, evaluated in tiles.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) Cartesian antenna coordinates.
+    wl : float
+        Wavelength [m].
+    N_tile : int
+        Number of antennas per tile.
+
+    Returns
+    -------
+    G_1 : :py:class:`~numpy.ndarray`
+        (N_antenna, N_antenna) real-valued Gram coefficients.
+    """
+    N_antenna = len(XYZ)
+    tiles = [slice(start, min(start + N_tile, N_antenna)) for start in range(0, N_antenna, N_tile)]
+
+    G_1 = np.empty((N_antenna, N_antenna))
+    for i, tile_i in enumerate(tiles):
+        for tile_j in tiles[i:]:
+            G_1[tile_i, tile_j] = _sinc_kernel(XYZ[tile_i], XYZ[tile_j], wl)
+            G_1[tile_j, tile_i] = G_1[tile_i, tile_j].T
+    return G_1
+
+
+def _layout_signature(XYZ):
+    """
+    Rotation-invariant description of an instrument layout.
+
+    Antenna coordinates are expressed in a right-handed frame attached to 3 of its antennas:
+
+    * the origin is the antenna closest to the array centroid;
+    * the X-axis points to the antenna farthest from the origin;
+    * the XY-plane contains the antenna farthest from the X-axis.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) Cartesian antenna coordinates.
+
+    Returns
+    -------
+    sig : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) antenna coordinates [m] in the layout's frame.
+        Two layouts have equal signatures if and only if they differ by a rotation and translation.
+        (Layouts with near-equidistant anchor antennas may get different signatures under rigid
+        motions due to rounding, which is safe for caching.)
+    """
+    XYZ_c = XYZ - XYZ.mean(axis=0)
+    XYZ_c = XYZ_c - XYZ_c[np.argmin(linalg.norm(XYZ_c, axis=1))]
+
+    frame = np.zeros((3, 3))
+    norm = linalg.norm(XYZ_c, axis=1)
+    if np.max(norm) > 0:
+        frame[0] = XYZ_c[np.argmax(norm)] / np.max(norm)
+        XYZ_r = XYZ_c - np.outer(XYZ_c @ frame[0], frame[0])  # components orthogonal to the X-axis
+        norm = linalg.norm(XYZ_r, axis=1)
+        if np.max(norm) > 0:  # non-collinear layout
+            frame[1] = XYZ_r[np.argmax(norm)] / np.max(norm)
+            frame[2] = np.cross(frame[0], frame[1])
+    return XYZ_c @ frame.T
+
+
 class GramMatrix(array.LabeledMatrix):
     """
     Gram coefficients.
@@ -75,17 +217,35 @@ class GramBlock(core.Block):
     Compute Gram matrices.
     """
 
-    def __init__(self):
+    @chk.check("cache", chk.is_boolean)
+    def __init__(self, cache=False):
         """
-
+        Parameters
+        ----------
+        cache : bool
+            If :py:obj:`True`, keep antenna-level Gram matrices in memory across calls.
+            (Default = :py:obj:`False`)
+
+            Antenna-level Gram coefficients only depend on baseline lengths, which do not change as
+            the Earth rotates.
+            Matrices are keyed on (antenna index, rotation-invariant layout signature, wavelength),
+            such that only the beam projection ``W^H G_1 W`` is recomputed at each timestep.
+            Signatures must match up to `[phased_array.bluebild.gram]/cache_tolerance`, i.e. rounding
+            errors: the layout is assumed to move rigidly between calls.
+            At most `[phased_array.bluebild.gram]/cache_size` matrices are kept, least-recently used
+            ones being dropped first.
+
+            If :py:obj:`False`, the antenna-level Gram is streamed in tiles at every call, which
+            bounds memory use to O(tile_size^2 + N_beam^2).
         """
         super().__init__()
+        self._cache = [] if cache else None
 
     @chk.check(
         dict(
             XYZ=chk.is_instance(instrument.InstrumentGeometry),
             W=chk.is_instance(beamforming.BeamWeights),
-            wl=chk.is_real,
+            wl=chk.accept_any(chk.is_real, chk.has_reals),
         )
     )
     def __call__(self, XYZ, W, wl):
@@ -98,13 +258,28 @@ class GramBlock(core.Block):
             (N_antenna, 3) Cartesian antenna coordinates in any reference frame.
         W : :py:class:`~pypeline.phased_array.beamforming.BeamWeights`
             (N_antenna, N_beam) synthesis beamweights.
-        wl : float
-            Wavelength [m] at which to compute the Gram.
+        wl : float or array-like(float)
+            Wavelength [m] at which to compute the Gram, or (N_wl,) wavelengths.
 
         Returns
         -------
-        :py:class:`~pypeline.phased_array.gram.GramMatrix`
-            (N_beam, N_beam) Gram matrix.
+        :py:class:`~pypeline.phased_array.gram.GramMatrix` or :py:class:`~numpy.ndarray`
+            (N_beam, N_beam) Gram matrix, or (N_wl, N_beam, N_beam) Gram matrices if several
+            wavelengths are given.
+
+            The latter match stacks returned by
+            :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet.visibilities` with
+            `stack=True`.
+
+        Notes
+        -----
+        The (N_antenna, N_antenna) antenna-level Gram is evaluated in tiles of
+        `[phased_array.bluebild.gram]/tile_size` antennas, hence temporary buffers are
+        O(tile_size^2 + N_beam^2).
+        (See `cache` in :py:meth:`~pypeline.phased_array.bluebild.gram.GramBlock.__init__`.)
+
+        When evaluating several wavelengths with `cache=True`, `[phased_array.bluebild.gram]/cache_size`
+        should be at least N_wl for antenna-level matrices to be reused across calls.
 
         Examples
         --------
@@ -144,12 +319,60 @@ class GramBlock(core.Block):
         if not XYZ.is_consistent_with(W, axes=[0, 0]):
             raise ValueError("Parameters[XYZ, W] are inconsistent.")
 
-        N_antenna = XYZ.shape[0]
-        baseline = linalg.norm(
-            XYZ.data.reshape(N_antenna, 1, 3) - XYZ.data.reshape(1, N_antenna, 3), axis=-1
-        )
+        N_tile = pypeline.config.getint("phased_array.bluebild.gram", "tile_size")
+        wl = np.asarray(wl, dtype=float)
+        if wl.ndim > 1:
+            raise ValueError("Parameter[wl] must be a scalar or 1D.")
+
+        if self._cache is None:
+            G_2 = _project_gram(XYZ.data, W.data, wl, N_tile)
+        else:
+            G_2 = np.stack(
+                [
+                    W.data.conj().T @ (self._cached_kernel(XYZ, _wl, N_tile) @ W.data)
+                    for _wl in wl.reshape(-1)
+                ],
+                axis=0,
+            ).reshape(wl.shape + (W.shape[1],) * 2)
+
+        if wl.ndim == 1:
+            return G_2
+        return GramMatrix(data=G_2, beam_idx=W.index[1])
 
-        G_1 = (4 * np.pi) * np.sinc((2 / wl) * baseline)
-        G_2 = W.data.conj().T @ G_1 @ W.data
+    def _cached_kernel(self, XYZ, wl, N_tile):
+        """
+        Antenna-level Gram matrix, looked up in (or added to) the cache.
 
-        return GramMatrix(data=G_2, beam_idx=W.index[1])
+        Parameters
+        ----------
+        XYZ : :py:class:`~pypeline.phased_array.instrument.InstrumentGeometry`
+            (N_antenna, 3) Cartesian antenna coordinates in any reference frame.
+        wl : float
+            Wavelength [m].
+        N_tile : int
+            Number of antennas per tile if the matrix has to be computed.
+
+        Returns
+        -------
+        G_1 : :py:class:`~numpy.ndarray`
+            (N_antenna, N_antenna) real-valued Gram coefficients.
+        """
+        section = "phased_array.bluebild.gram"
+        ant_idx = XYZ.index[0]
+        sig = _layout_signature(XYZ.data)
+        atol = pypeline.config.getfloat(section, "cache_tolerance") * wl
+
+        for i, (c_wl, c_ant_idx, c_sig, G_1) in enumerate(self._cache):
+            if (
+                (c_wl == wl)
+                and c_ant_idx.equals(ant_idx)
+                and np.allclose(c_sig, sig, rtol=0, atol=atol)
+            ):
+                self._cache.append(self._cache.pop(i))  # most-recently used last
+                return G_1
+
+        G_1 = _gram_kernel(XYZ.data, wl, N_tile)
+        self._cache.append((wl, ant_idx, sig, G_1))
+        N_cache = pypeline.config.getint(section, "cache_size")
+        del self._cache[: max(len(self._cache) - N_cache, 0)]
+        return G_1
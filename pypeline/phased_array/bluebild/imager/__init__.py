@@ -15,13 +15,24 @@ Subclasses of :py:class:`~pypeline.phased_array.bluebild.imager.IntegratingMulti
 * re-weight energy levels to output both a least-squares estimate and a standardized estimate of the (integrated) field.
 
 Integrated images can then be directly output in viewable form by calling :py:meth:`~pypeline.phased_array.bluebild.imager.IntegratingMultiFieldSynthesizerBlock.as_image`.
+
+Long integrations can be checkpointed to disk with :py:meth:`~pypeline.phased_array.bluebild.imager.IntegratingMultiFieldSynthesizerBlock.set_checkpoint`, and restarted mid-observation with :py:meth:`~pypeline.phased_array.bluebild.imager.IntegratingMultiFieldSynthesizerBlock.resume`::
+
+    I_mfs.set_checkpoint(dir_name, N_step=100)
+    t_start = I_mfs.resume(dir_name)  # number of timesteps already integrated (0 on first run).
+    for t in t_img[t_start:]:
+        ...
+        I_mfs(D, V, XYZ.data, W.data, c_idx)
 """
 
+import pathlib
+
 import imot_tools.util.argcheck as chk
-import imot_tools.util.array as array
 import numpy as np
+import scipy.linalg as linalg
 
 import pypeline.core as core
+import pypeline.util.checkpoint as checkpoint
 
 class IntegratingMultiFieldSynthesizerBlock(core.Block):
     """
@@ -34,13 +45,121 @@ class IntegratingMultiFieldSynthesizerBlock(core.Block):
         """
         super().__init__()
         self._statistics = None
+        self._cursor = 0  # number of integrated timesteps
+
+        self._checkpoint = None
+        self._checkpoint_step = None
 
     def _update(self, stat):
         if self._statistics is None:
-            self._statistics = stat
+            self._statistics = stat.copy()
         else:
             self._statistics += stat
 
+    def _advance(self, N_time=1):
+        """
+        Move the timestep cursor after integrating `N_time` snapshots, and checkpoint if due.
+        """
+        self._cursor += N_time
+        if self._checkpoint is not None:
+            N_step = self._checkpoint_step
+            if (self._cursor // N_step) > ((self._cursor - N_time) // N_step):
+                self.checkpoint()
+
+    def _checkpoint_state(self):
+        """
+        Returns
+        -------
+        state : dict(str, :py:class:`~numpy.ndarray`)
+            Arrays needed to resume integration. `statistics` is modified in-place after the call.
+        """
+        return dict(statistics=self._statistics)
+
+    def _restore_state(self, state):
+        """
+        Parameters
+        ----------
+        state : dict(str, :py:class:`~numpy.ndarray`)
+            Arrays returned by :py:meth:`~pypeline.phased_array.bluebild.imager.IntegratingMultiFieldSynthesizerBlock._checkpoint_state`.
+        """
+        stat = state.get("statistics")
+        if stat is None:
+            return
+        if self._statistics is None:
+            self._statistics = np.array(stat)
+        elif self._statistics.shape == stat.shape:
+            self._statistics[...] = stat
+        else:
+            raise ValueError("Checkpointed statistics do not match the imager's dimensions.")
+
+    @chk.check(
+        dict(dir_name=chk.is_instance(str, pathlib.Path), N_step=chk.allow_None(chk.is_integer))
+    )
+    def set_checkpoint(self, dir_name, N_step=None):
+        """
+        Periodically save integrated statistics to disk.
+
+        Checkpoints hold the integrated statistics, the synthesizer's kernel state (if any) and the
+        number of integrated timesteps.
+        They are written asynchronously: integration proceeds while a checkpoint is being written.
+
+        Parameters
+        ----------
+        dir_name : str or :py:class:`~pathlib.Path`
+            Directory holding the checkpoint. (See :py:class:`~pypeline.util.checkpoint.Checkpoint`.)
+        N_step : int
+            Number of timesteps between checkpoints. (Default = only when calling
+            :py:meth:`~pypeline.phased_array.bluebild.imager.IntegratingMultiFieldSynthesizerBlock.checkpoint`.)
+        """
+        if (N_step is not None) and (N_step <= 0):
+            raise ValueError("Parameter[N_step] must be positive.")
+
+        if self._checkpoint is not None:
+            self._checkpoint.wait()
+        self._checkpoint = checkpoint.Checkpoint(dir_name)
+        self._checkpoint_step = np.inf if (N_step is None) else N_step
+
+    @chk.check("block", chk.is_boolean)
+    def checkpoint(self, block=False):
+        """
+        Save integrated statistics to disk now.
+
+        Parameters
+        ----------
+        block : bool
+            If :py:obj:`True`, wait for the checkpoint to be written. (Default = :py:obj:`False`)
+        """
+        if self._checkpoint is None:
+            raise ValueError("No checkpoint directory set: call set_checkpoint() first.")
+
+        self._checkpoint.save(
+            self._cursor, self._checkpoint_state(), volatile=("statistics",), block=block
+        )
+
+    @chk.check("dir_name", chk.is_instance(str, pathlib.Path))
+    def resume(self, dir_name):
+        """
+        Restore integrated statistics from a checkpoint.
+
+        Parameters
+        ----------
+        dir_name : str or :py:class:`~pathlib.Path`
+            Directory holding the checkpoint.
+
+        Returns
+        -------
+        cursor : int
+            Number of timesteps integrated in the checkpoint (0 if there is none), i.e. the index of
+            the next timestep to process.
+        """
+        if self._checkpoint is not None:
+            self._checkpoint.wait()
+
+        cursor, state = checkpoint.Checkpoint(dir_name).load()
+        self._restore_state(state)
+        self._cursor = cursor
+        return cursor
+
     def __call__(self, *args, **kwargs):
         """
         Compute integrated field statistics for least-squares and standardized estimates.
@@ -75,8 +194,17 @@ class IntegratingMultiFieldSynthesizerBlock(core.Block):
 
 
 
-@chk.check(dict(x=chk.is_array_like, idx=chk.has_integers, N=chk.is_integer, axis=chk.is_integer))
-def cluster_layers(x, idx, N, axis):
+@chk.check(
+    dict(
+        x=chk.is_array_like,
+        idx=chk.has_integers,
+        N=chk.is_integer,
+        axis=chk.is_integer,
+        weights=chk.allow_None(chk.has_reals),
+        out=chk.allow_None(chk.is_instance(np.ndarray)),
+    )
+)
+def cluster_layers(x, idx, N, axis, weights=None, out=None):
     """
     Additive tensor compression along an axis.
 
@@ -90,19 +218,51 @@ def cluster_layers(x, idx, N, axis):
         Total number of levels along compression axis.
     axis : int
         Dimension along which to compress.
+    weights : array-like(float)
+        (K,) weights applied to each layer before compression. (Default = 1)
+    out : :py:class:`~numpy.ndarray`
+        (..., N, ...) array to which the compressed tensor is added in-place.
+        (Default = new zero-initialized array.)
 
     Returns
     -------
     :py:class:`~numpy.ndarray`
-        (..., N, ...) array
+        (..., N, ...) array (`out` if provided).
+
+    Notes
+    -----
+    Compression amounts to multiplying `x` along `axis` by the (N, K) (weighted) cluster membership
+    matrix.
+    If `out` can be viewed as a matrix with `axis` first, the product is accumulated directly into
+    `out` by a single GEMM call, i.e. without temporaries of the output's size.
     """
     x = np.array(x, copy=False)
     idx = np.array(idx, copy=False)
+    K = x.shape[axis]
+    if idx.shape != (K,):
+        raise ValueError("Parameters[x, idx] are inconsistent.")
 
     y_shape = list(x.shape)
     y_shape[axis] = N
-    y = np.zeros(y_shape, dtype=x.dtype)
+    if out is None:
+        out = np.zeros(y_shape, dtype=x.dtype)
+    elif list(out.shape) != y_shape:
+        raise ValueError(f"Parameter[out] must have shape {tuple(y_shape)}.")
+
+    C = np.zeros((N, K), dtype=out.dtype)
+    C[idx, np.arange(K)] = 1 if (weights is None) else weights
+
+    # y_2d.T += x_2d.T @ C.T: Fortran-ordered views of C-contiguous (N, -1) / (K, -1) arrays.
+    y_2d = np.moveaxis(out, axis, 0)
+    x_2d = np.moveaxis(x, axis, 0).reshape(K, -1)
+    gemm = linalg.get_blas_funcs("gemm", (out, C))
+    try:
+        y_2d.shape = (N, -1)  # fails if a copy is required.
+        if not (y_2d.flags.c_contiguous and y_2d.flags.writeable and (gemm.dtype == out.dtype)):
+            raise AttributeError
+    except AttributeError:
+        out += np.moveaxis(np.tensordot(C, x, axes=[[1], [axis]]), 0, axis)
+        return out
 
-    for x_id, y_id in enumerate(idx):
-        y[array.index(y, axis, y_id)] += x[array.index(x, axis, x_id)]
-    return y
+    gemm(1, x_2d.T, C.T, beta=1, c=y_2d.T, overwrite_c=True)
+    return out
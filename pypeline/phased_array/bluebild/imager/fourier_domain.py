@@ -8,6 +8,8 @@
 High-level Bluebild interfaces that work in Fourier Series domain.
 """
 
+import pathlib
+
 import imot_tools.util.argcheck as chk
 import numpy as np
 import scipy.sparse as sparse
@@ -96,8 +98,8 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
        ...
        ...     D, V, c_idx = I_dp(S, G)
        ...
-       ...     # (2, N_eig, N_height, N_FS+Q) energy levels [integrated, clustered) (compact descriptor, not the same thing as [D, V]).
-       ...     field_stat = I_mfs(D, V, XYZ.data, W.data, c_idx)
+       ...     # Energy levels are clustered and integrated in-place. (Use `return_snapshot=True` to also get this snapshot's statistics.)
+       ...     I_mfs(D, V, XYZ.data, W.data, c_idx)
 
        >>> I_std, I_lsq = I_mfs.as_image()
 
@@ -139,9 +141,25 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             R=chk.require_all(chk.has_shape([3, 3]), chk.has_reals),
             N_level=chk.is_integer,
             precision=chk.is_integer,
+            kernel_cache=chk.allow_None(chk.is_instance(str, pathlib.Path)),
+            N_thread=chk.is_integer,
+            shift_estimator=chk.is_instance(str),
         )
     )
-    def __init__(self, wl, grid_colat, grid_lon, N_FS, T, R, N_level, precision=64):
+    def __init__(
+        self,
+        wl,
+        grid_colat,
+        grid_lon,
+        N_FS,
+        T,
+        R,
+        N_level,
+        precision=64,
+        kernel_cache=None,
+        N_thread=1,
+        shift_estimator="lstsq",
+    ):
         r"""
         Parameters
         ----------
@@ -163,6 +181,15 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             Numerical accuracy of floating-point operations.
 
             Must be 32 or 64.
+        kernel_cache : str or :py:class:`~pathlib.Path`
+            Directory in which to persist FS kernels across runs. (Default = no persistence.)
+
+            See :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.__init__`.
+        N_thread : int
+            Number of CPU threads used by the field synthesizer to generate FS kernels. (Default = 1)
+        shift_estimator : str
+            Instrument rotation estimator used by the field synthesizer: 'lstsq' or 'reference'.
+            (Default = 'lstsq')
 
         Notes
         -----
@@ -186,7 +213,7 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
         self._N_level = N_level
 
         self._synthesizer = psd.FourierFieldSynthesizerBlock(
-            wl, grid_colat, grid_lon, N_FS, T, R, precision
+            wl, grid_colat, grid_lon, N_FS, T, R, precision, kernel_cache, N_thread, shift_estimator
         )
 
     def set_timer(self, t):
@@ -200,9 +227,10 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             XYZ=chk.has_reals,
             W=chk.is_instance(np.ndarray, sparse.csr_matrix, sparse.csc_matrix),
             cluster_idx=chk.has_integers,
+            return_snapshot=chk.is_boolean,
         )
     )
-    def __call__(self, D, V, XYZ, W, cluster_idx):
+    def __call__(self, D, V, XYZ, W, cluster_idx, return_snapshot=False):
         """
         Compute (clustered) integrated field statistics for least-squares and standardized estimates.
 
@@ -220,22 +248,62 @@ class Fourier_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             (N_antenna, N_beam) synthesis beamweights.
         cluster_idx : :py:class:`~numpy.ndarray`
             (N_eig,) cluster indices of each eigenpair.
+        return_snapshot : bool
+            If :py:obj:`True`, also return the statistics of this snapshot. (Default = :py:obj:`False`)
+
+            Otherwise statistics are clustered directly into the integrated statistics.
+
+            Previous releases always returned the snapshot's statistics: callers using the return
+            value must now set `return_snapshot=True`.
 
         Returns
         -------
         stat : :py:class:`~numpy.ndarray`
-            (2, N_level, N_height, N_FS + Q) field statistics.
+            (2, N_level, N_height, N_FS + Q) field statistics if `return_snapshot` is :py:obj:`True`.
         """
         D = D.astype(self._fp, copy=False)
 
         stat_std = self._synthesizer(V, XYZ, W)
-        stat_lsq = stat_std * D.reshape(-1, 1, 1)
+        if self._statistics is None:  # shape only known once FS kernels are computed.
+            self._statistics = np.zeros((2, self._N_level) + stat_std.shape[1:], dtype=self._fp)
+
+        stat = np.zeros_like(self._statistics) if return_snapshot else self._statistics
+        bim.cluster_layers(stat_std, cluster_idx, N=self._N_level, axis=0, out=stat[0])
+        bim.cluster_layers(stat_std, cluster_idx, N=self._N_level, axis=0, weights=D, out=stat[1])
+
+        if return_snapshot:
+            self._update(stat)
+        self._advance()
+        return stat if return_snapshot else None
+
+    @chk.check("XYZ", chk.has_reals)
+    def schedule_kernels(self, XYZ):
+        """
+        Plan FS kernel regenerations for an entire observation, and build them in the background.
+
+        See :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock.schedule_kernels`.
+
+        Parameters
+        ----------
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_time, N_antenna, 3) ICRS instrument geometries of all timesteps to be imaged.
+
+        Returns
+        -------
+        epoch_idx : :py:class:`~numpy.ndarray`
+            (N_epoch,) indices of the timesteps at which a new kernel is used.
+        """
+        return self._synthesizer.schedule_kernels(XYZ)
 
-        stat = np.stack([stat_std, stat_lsq], axis=0)
-        stat = bim.cluster_layers(stat, cluster_idx, N=self._N_level, axis=1)
+    def _checkpoint_state(self):
+        state = super()._checkpoint_state()
+        state["FSk"], state["XYZk"] = self._synthesizer.get_kernel()
+        return state
 
-        self._update(stat)
-        return stat
+    def _restore_state(self, state):
+        super()._restore_state(state)
+        if "FSk" in state:  # kernel is re-used as long as the instrument has not rotated too much.
+            self._synthesizer.set_kernel(state["FSk"], state["XYZk"])
 
     def as_image(self):
         """
@@ -88,8 +88,8 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
        ...
        ...     D, V, c_idx = I_dp(S, G)
        ...
-       ...     # (2, N_level, N_px) energy levels [integrated, clustered] (compact descriptor, not the same thing as [D, V]).
-       ...     field_stat = I_mfs(D, V, XYZ.data, W.data, c_idx)
+       ...     # Energy levels are clustered and integrated in-place. (Use `return_snapshot=True` to also get this snapshot's statistics.)
+       ...     I_mfs(D, V, XYZ.data, W.data, c_idx)
 
        >>> I_std, I_lsq = I_mfs.as_image()
 
@@ -118,10 +118,18 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
 
     @chk.check(
         dict(
-            wl=chk.is_real, pix_grid=chk.has_reals, N_level=chk.is_integer, precision=chk.is_integer
+            wl=chk.is_real,
+            pix_grid=chk.has_reals,
+            N_level=chk.is_integer,
+            precision=chk.is_integer,
+            backend=chk.allow_None(chk.is_instance(str)),
+            N_thread=chk.is_integer,
+            contraction=chk.allow_None(chk.is_instance(str)),
         )
     )
-    def __init__(self, wl, pix_grid, N_level, precision=64):
+    def __init__(
+        self, wl, pix_grid, N_level, precision=64, backend=None, N_thread=1, contraction=None
+    ):
         """
         Parameters
         ----------
@@ -135,6 +143,12 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             Numerical accuracy of floating-point operations.
 
             Must be 32 or 64.
+        backend : str
+            Array backend used by the field synthesizer: 'cpu' or 'gpu'. (Default = 'gpu' if CuPy is available, 'cpu' otherwise.)
+        N_thread : int
+            Number of CPU threads used by the field synthesizer. (Default = 1)
+        contraction : str
+            Contraction plan used by the field synthesizer: 'PW' or 'VW'. (Default = cheapest plan.)
         """
         super().__init__()
 
@@ -151,9 +165,15 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             raise ValueError("Parameter[N_level] must be positive.")
         self._N_level = N_level
 
-        self._synthesizer = ssd.SpatialFieldSynthesizerBlock(wl, pix_grid, precision)
+        self._synthesizer = ssd.SpatialFieldSynthesizerBlock(
+            wl, pix_grid, precision, backend, N_thread, contraction
+        )
         self.timer = None
 
+        # (2, N_level, ...) integrated statistics: synthesized fields are accumulated in-place.
+        N_px = self._synthesizer._grid.shape[1:]
+        self._statistics = np.zeros((2, N_level) + N_px, dtype=self._fp)
+
     def set_timer(self, t):
         self.timer = t
         self._synthesizer.set_timer(self.timer)
@@ -169,9 +189,10 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             XYZ=chk.has_reals,
             W=chk.is_instance(np.ndarray, sparse.csr_matrix, sparse.csc_matrix),
             cluster_idx=chk.has_integers,
+            return_snapshot=chk.is_boolean,
         )
     )
-    def __call__(self, D, V, XYZ, W, cluster_idx):
+    def __call__(self, D, V, XYZ, W, cluster_idx, return_snapshot=False):
         """
         Compute (clustered) integrated field statistics for least-squares and standardized estimates.
 
@@ -189,30 +210,124 @@ class Spatial_IMFS_Block(bim.IntegratingMultiFieldSynthesizerBlock):
             (N_antenna, N_beam) synthesis beamweights.
         cluster_idx : :py:class:`~numpy.ndarray`
             (N_eig,) cluster indices of each eigenpair.
+        return_snapshot : bool
+            If :py:obj:`True`, also return the statistics of this snapshot. (Default = :py:obj:`False`)
+
+            Otherwise statistics are accumulated directly into the integrated statistics and nothing
+            grid-sized is allocated.
+
+            Previous releases always returned the snapshot's statistics: callers using the return
+            value must now set `return_snapshot=True`.
 
         Returns
         -------
         stat : :py:class:`~numpy.ndarray`
-            (2, N_level, N_px) field statistics.
+            (2, N_level, N_px) field statistics if `return_snapshot` is :py:obj:`True`.
         """
         self.mark("Imager call")
-        D = D.astype(self._fp, copy=False)
-
+        D = np.asarray(D, dtype=self._fp)
+        cluster_idx = np.asarray(cluster_idx)
+        N_eig = len(D)
+        if cluster_idx.shape != (N_eig,):
+            raise ValueError("Parameters[D, cluster_idx] are inconsistent.")
+
+        # (2, N_level, N_eig) weights that cluster eigenpairs: 1 for standardized estimates, D for
+        # least-squares estimates.
+        C = np.zeros((2, self._N_level, N_eig), dtype=self._fp)
+        C[0, cluster_idx, np.arange(N_eig)] = 1
+        C[1, cluster_idx, np.arange(N_eig)] = D
+        C = C.reshape(2 * self._N_level, N_eig)
+
+        stat = np.zeros_like(self._statistics) if return_snapshot else self._statistics
         self.mark("Image synthesis")
-        stat_std = self._synthesizer(V, XYZ, W)
+        self._synthesizer.accumulate(V, XYZ, W, C, stat.reshape((len(C),) + stat.shape[2:]))
         self.unmark("Image synthesis")
-        stat_lsq = stat_std * D.reshape(-1, 1, 1)
-        #stat_lsq = stat_std * D.reshape(-1, 1)
-
-        stat = np.stack([stat_std, stat_lsq], axis=0)
-        self.mark("Image cluster layers")
-        stat = bim.cluster_layers(stat, cluster_idx, N=self._N_level, axis=1)
-        self.unmark("Image cluster layers")
-        self.mark("Image update iteration")
-        self._update(stat)
-        self.unmark("Image update iteration")
+
+        if return_snapshot:
+            self.mark("Image update iteration")
+            self._update(stat)
+            self.unmark("Image update iteration")
+        self._advance()
         self.unmark("Imager call")
-        return stat
+        return stat if return_snapshot else None
+
+    @chk.check(
+        dict(
+            D=chk.is_instance(list, tuple),
+            V=chk.is_instance(list, tuple),
+            XYZ=chk.is_instance(list, tuple),
+            W=chk.is_instance(list, tuple),
+            cluster_idx=chk.is_instance(list, tuple),
+            return_snapshot=chk.is_boolean,
+        )
+    )
+    def process_batch(self, D, V, XYZ, W, cluster_idx, return_snapshot=False):
+        """
+        Compute (clustered) integrated field statistics of many snapshots at once.
+
+        This is equivalent to calling :py:meth:`~pypeline.phased_array.bluebild.imager.spatial_domain.Spatial_IMFS_Block.__call__`
+        once per snapshot, but the pixel kernel is evaluated for all snapshots together: see
+        :py:meth:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain.SpatialFieldSynthesizerBlock.accumulate_batch`.
+
+        Parameters
+        ----------
+        D : list(:py:class:`~numpy.ndarray`)
+            (N_time,) positive eigenvalues, each of shape (N_eig,).
+        V : list(:py:class:`~numpy.ndarray`)
+            (N_time,) complex-valued eigenvectors, each of shape (N_beam, N_eig).
+        XYZ : list(:py:class:`~numpy.ndarray`)
+            (N_time,) Cartesian instrument geometries, each of shape (N_antenna, 3).
+
+            `XYZ` must be defined in the same reference frame as `pix_grid` from :py:meth:`~pypeline.phased_array.bluebild.imager.Spatial_IMFS_Block.__init__`.
+        W : list(:py:class:`~numpy.ndarray` or :py:class:`~scipy.sparse.csr_matrix` or :py:class:`~scipy.sparse.csc_matrix`)
+            (N_time,) synthesis beamweights, each of shape (N_antenna, N_beam).
+        cluster_idx : list(:py:class:`~numpy.ndarray`)
+            (N_time,) cluster indices of each eigenpair, each of shape (N_eig,).
+        return_snapshot : bool
+            If :py:obj:`True`, also return the statistics of this batch. (Default = :py:obj:`False`)
+
+            Otherwise statistics are accumulated directly into the integrated statistics and nothing
+            grid-sized is allocated.
+
+        Returns
+        -------
+        stat : :py:class:`~numpy.ndarray`
+            (2, N_level, N_height, N_width) field statistics, integrated over the batch, if
+            `return_snapshot` is :py:obj:`True`.
+        """
+        N_time = len(D)
+        if not (len(V) == len(XYZ) == len(W) == len(cluster_idx) == N_time > 0):
+            raise ValueError("Parameters[D, V, XYZ, W, cluster_idx] must have the same non-zero length.")
+
+        self.mark("Imager batch call")
+        D = np.stack([np.asarray(_, dtype=self._fp) for _ in D], axis=0)
+        cluster_idx = np.stack([np.array(_, copy=False) for _ in cluster_idx], axis=0)
+        if not (chk.has_integers(cluster_idx) and (D.shape == cluster_idx.shape)):
+            raise ValueError("Parameters[D, cluster_idx] are inconsistent.")
+        N_eig = D.shape[1]
+
+        # (2, N_level, N_time * N_eig) weights that cluster eigenpairs: 1 for standardized
+        # estimates, D for least-squares estimates.
+        t_idx, e_idx = np.meshgrid(np.arange(N_time), np.arange(N_eig), indexing="ij")
+        C = np.zeros((2, self._N_level, N_time, N_eig), dtype=self._fp)
+        C[0, cluster_idx, t_idx, e_idx] = 1
+        C[1, cluster_idx, t_idx, e_idx] = D
+        C = C.reshape(2 * self._N_level, N_time * N_eig)
+
+        stat = np.zeros_like(self._statistics) if return_snapshot else self._statistics
+        self.mark("Image synthesis")
+        self._synthesizer.accumulate_batch(
+            list(V), list(XYZ), list(W), C, out=stat.reshape((len(C),) + stat.shape[2:])
+        )
+        self.unmark("Image synthesis")
+
+        if return_snapshot:
+            self.mark("Image update iteration")
+            self._update(stat)
+            self.unmark("Image update iteration")
+        self._advance(N_time)
+        self.unmark("Imager batch call")
+        return stat if return_snapshot else None
 
     def as_image(self):
         """
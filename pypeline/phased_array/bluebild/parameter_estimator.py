@@ -19,15 +19,129 @@ Subclasses of :py:class:`~pypeline.phased_array.bluebild.parameter_estimator.Par
 specifically tailored for such tasks.
 """
 
+import collections
+import concurrent.futures as futures
+
 import imot_tools.math.linalg as pylinalg
 import imot_tools.util.argcheck as chk
 import numpy as np
-import sklearn.cluster as skcl
 
+import pypeline
 import pypeline.phased_array.data_gen.statistics as vis
 import pypeline.phased_array.bluebild.gram as gr
 
 
+def _intensity_spectrum(S, G, sigma):
+    """
+    Energy levels of a (S, G) pair.
+
+    Parameters
+    ----------
+    S : :py:class:`~numpy.ndarray`
+        (N_beam, N_beam) visibility matrix.
+    G : :py:class:`~numpy.ndarray`
+        (N_beam, N_beam) gram matrix.
+    sigma : float
+        Normalized energy ratio for fPCA decomposition.
+
+    Returns
+    -------
+    D : :py:class:`~numpy.ndarray`
+        (N,) non-zero eigenvalues. (N = 0 if `S` is broken beyond use.)
+    """
+    # Remove broken BEAM_IDs
+    N_beam = len(S)
+    broken_row_id = np.flatnonzero(np.isclose(np.sum(S, axis=0), np.sum(S, axis=1)))
+    working_row_id = list(set(np.arange(N_beam)) - set(broken_row_id))
+    idx = np.ix_(working_row_id, working_row_id)
+    S, G = S[idx], G[idx]
+
+    # Functional PCA
+    if np.allclose(S, 0):
+        return np.zeros(0)
+    D, _ = pylinalg.eigh(S, G, tau=sigma)
+    return D[D.nonzero()]
+
+
+def _kmeans_1d(x, k):
+    """
+    Exact k-means clustering of 1D data.
+
+    Optimal clusters of sorted 1D data are contiguous, hence the clustering can be found by dynamic
+    programming over split points [Ckmeans.1d.dp].
+    Optimal split points are monotonic in the number of points considered, which lets each of the
+    `k` DP stages be solved by divide-and-conquer in O(n log(n)) operations.
+    Each recursion depth is evaluated in one vectorized pass.
+
+    Parameters
+    ----------
+    x : :py:class:`~numpy.ndarray`
+        (n,) real values.
+    k : int
+        Number of clusters.
+
+    Returns
+    -------
+    centroid : :py:class:`~numpy.ndarray`
+        (k,) cluster centroids in increasing order, minimizing the within-cluster sum of squares.
+    """
+    x = np.sort(np.asarray(x, dtype=float).reshape(-1))
+    n = len(x)
+    if not (1 <= k <= n):
+        raise ValueError("Parameter[k] must lie in [1, len(x)].")
+
+    # Within-cluster sum of squares of x[j:i+1], from prefix sums of centered data.
+    x_c = x - x.mean()
+    S1, S2 = np.r_[0, np.cumsum(x_c)], np.r_[0, np.cumsum(x_c ** 2)]
+
+    def cost(j, i):
+        s = S1[i + 1] - S1[j]
+        return (S2[i + 1] - S2[j]) - (s ** 2) / (i - j + 1)
+
+    # D[i] = min cost of clustering x[:i+1] into (m+1) clusters; opt[m, i] = start of last cluster.
+    D_prev = cost(np.zeros(n, dtype=int), np.arange(n))
+    opt = np.zeros((k, n), dtype=int)
+    for m in range(1, k):
+        D = np.full(n, np.inf)
+        # Pending sub-problems (i_lo, i_hi, j_lo, j_hi): solve D[i_lo:i_hi+1] knowing that optimal
+        # split points lie in [j_lo, j_hi].
+        problem = np.array([[m, n - 1, m, n - 1]])
+        while len(problem) > 0:
+            i_lo, i_hi, j_lo, j_hi = problem.T
+            i_mid = (i_lo + i_hi) // 2
+
+            # All candidate split points of all sub-problems, flattened.
+            N_cand = np.minimum(i_mid, j_hi) - j_lo + 1
+            seg = np.repeat(np.arange(len(problem)), N_cand)
+            seg_start = np.r_[0, np.cumsum(N_cand)[:-1]]
+            j = j_lo[seg] + (np.arange(len(seg)) - seg_start[seg])
+            c = D_prev[j - 1] + cost(j, i_mid[seg])
+
+            c_min = np.minimum.reduceat(c, seg_start)
+            hit = np.flatnonzero(c == c_min[seg])
+            first = np.r_[True, seg[hit[1:]] != seg[hit[:-1]]]
+            j_opt = j[hit[first]]
+            D[i_mid], opt[m, i_mid] = c_min, j_opt
+
+            problem = np.concatenate(
+                [
+                    np.stack([i_lo, i_mid - 1, j_lo, j_opt], axis=1),
+                    np.stack([i_mid + 1, i_hi, j_opt, j_hi], axis=1),
+                ],
+                axis=0,
+            )
+            problem = problem[problem[:, 0] <= problem[:, 1]]
+        D_prev = D
+
+    centroid = np.zeros(k)
+    i = n - 1
+    for m in range(k - 1, -1, -1):
+        j = opt[m, i]
+        centroid[m] = np.mean(x[j : i + 1])
+        i = j - 1
+    return centroid
+
+
 class ParameterEstimator:
     """
     Top-level public interface of Bluebild parameter estimators.
@@ -138,8 +252,15 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
        array([124.927,  65.09 ,  38.589,  23.256])
     """
 
-    @chk.check(dict(N_level=chk.is_integer, sigma=chk.is_real))
-    def __init__(self, N_level, sigma):
+    @chk.check(
+        dict(
+            N_level=chk.is_integer,
+            sigma=chk.is_real,
+            online=chk.is_boolean,
+            N_thread=chk.is_integer,
+        )
+    )
+    def __init__(self, N_level, sigma, online=False, N_thread=1):
         """
         Parameters
         ----------
@@ -147,6 +268,21 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
             Number of clustered energy levels to output.
         sigma : float
             Normalized energy ratio for fPCA decomposition.
+        online : bool
+            If :py:obj:`False` (default), (S, G) pairs are stored by
+            :py:meth:`~pypeline.phased_array.bluebild.parameter_estimator.IntensityFieldParameterEstimator.collect`
+            and decomposed by
+            :py:meth:`~pypeline.phased_array.bluebild.parameter_estimator.IntensityFieldParameterEstimator.infer_parameters`.
+
+            If :py:obj:`True`, pairs are decomposed as soon as they are collected and only their
+            energy levels are kept.
+            Energy levels are clustered on a uniform random sample (reservoir) of at most
+            `[phased_array.bluebild.parameter_estimator]/reservoir_size` values, hence memory use
+            does not grow with the number of collected pairs.
+        N_thread : int
+            Number of worker threads decomposing collected pairs in online mode. (Default = 1)
+
+            With `N_thread > 1`, at most `2 * N_thread` pairs are in flight at any time.
         """
         super().__init__()
 
@@ -158,10 +294,28 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
             raise ValueError("Parameter[sigma] must lie in (0,1].")
         self._sigma = sigma
 
+        if N_thread <= 0:
+            raise ValueError("Parameter[N_thread] must be positive.")
+        self._online = online
+        self._N_thread = N_thread
+        self._executor = None
+        if online and (N_thread > 1):
+            self._executor = futures.ThreadPoolExecutor(max_workers=N_thread)
+
         # Collected data.
         self._visibilities = []
         self._grams = []
 
+        # Online mode: running statistics + uniform sample of energy levels.
+        self._pending = collections.deque()  # in-flight eigenproblems
+        self._N_data = 0  # number of (S, G) pairs processed
+        self._N_level_total = 0  # number of energy levels seen
+        self._reservoir = None
+        if online:
+            section = "phased_array.bluebild.parameter_estimator"
+            self._reservoir = np.zeros(pypeline.config.getint(section, "reservoir_size"))
+        self._rng = np.random.RandomState(0)
+
     @chk.check(dict(S=chk.is_instance(vis.VisibilityMatrix), G=chk.is_instance(gr.GramMatrix)))
     def collect(self, S, G):
         """
@@ -177,8 +331,39 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
         if not S.is_consistent_with(G, axes=[0, 0]):
             raise ValueError("Parameters[S, G] are inconsistent.")
 
-        self._visibilities.append(S)
-        self._grams.append(G)
+        if not self._online:
+            self._visibilities.append(S)
+            self._grams.append(G)
+        elif self._executor is None:
+            self._ingest(_intensity_spectrum(S.data, G.data, self._sigma))
+        else:
+            job = self._executor.submit(_intensity_spectrum, S.data, G.data, self._sigma)
+            self._pending.append(job)
+            while len(self._pending) > 2 * self._N_thread:
+                self._ingest(self._pending.popleft().result())
+
+    def _ingest(self, D):
+        """
+        Add energy levels of one (S, G) pair to the running statistics.
+
+        Parameters
+        ----------
+        D : :py:class:`~numpy.ndarray`
+            (N,) non-zero eigenvalues.
+        """
+        N_res = len(self._reservoir)
+        N_seen = self._N_level_total + np.arange(len(D))  # index of each level in the stream
+
+        # Reservoir sampling (Algorithm R): the k-th level replaces a random entry with probability
+        # N_res / (k + 1).
+        fill = N_seen < N_res
+        self._reservoir[N_seen[fill]] = D[fill]
+        slot = self._rng.randint(0, N_seen[~fill] + 1)
+        keep = slot < N_res
+        self._reservoir[slot[keep]] = D[~fill][keep]
+
+        self._N_data += 1
+        self._N_level_total += len(D)
 
     def infer_parameters(self):
         """
@@ -192,26 +377,22 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
         cluster_centroid : :py:class:`~numpy.ndarray`
             (N_level,) intensity field cluster centroids.
         """
-        N_data = len(self._visibilities)
-        N_beam = N_eig_max = self._visibilities[0].shape[0]
-
-        D_all = np.zeros((N_data, N_eig_max))
-        for i, (S, G) in enumerate(zip(self._visibilities, self._grams)):
-            # Remove broken BEAM_IDs
-            broken_row_id = np.flatnonzero(
-                np.isclose(np.sum(S.data, axis=0), np.sum(S.data, axis=1))
+        if self._online:
+            while len(self._pending) > 0:
+                self._ingest(self._pending.popleft().result())
+            N_data, N_level_total = self._N_data, self._N_level_total
+            D_all = self._reservoir[: min(N_level_total, len(self._reservoir))]
+        else:
+            N_data = len(self._visibilities)
+            D_all = np.concatenate(
+                [
+                    _intensity_spectrum(S.data, G.data, self._sigma)
+                    for (S, G) in zip(self._visibilities, self._grams)
+                ]
             )
-            working_row_id = list(set(np.arange(N_beam)) - set(broken_row_id))
-            idx = np.ix_(working_row_id, working_row_id)
-            S, G = S.data[idx], G.data[idx]
+            N_level_total = len(D_all)
 
-            # Functional PCA
-            if not np.allclose(S, 0):
-                D, _ = pylinalg.eigh(S, G, tau=self._sigma)
-                D_all[i, : len(D)] = D
-
-        D_all = D_all[D_all.nonzero()]
-        kmeans = skcl.KMeans(n_clusters=self._N_level).fit(np.log(D_all).reshape(-1, 1))
+        log_centroid = _kmeans_1d(np.log(D_all), self._N_level)
 
         # For extremely small telescopes or datasets that are mostly 'broken', we can have (N_eig < N_level).
         # In this case we have two options: (N_level = N_eig) or (N_eig = N_level).
@@ -220,8 +401,8 @@ class IntensityFieldParameterEstimator(ParameterEstimator):
         # This has the disadvantage of increasing the computational load of Bluebild, but as the N_eig energy levels
         # are clustered together anyway, the trailing energy levels will be (close to) all-0 and can be discarded
         # on inspection.
-        N_eig = max(int(np.ceil(len(D_all) / N_data)), self._N_level)
-        cluster_centroid = np.sort(np.exp(kmeans.cluster_centers_)[:, 0])[::-1]
+        N_eig = max(int(np.ceil(N_level_total / N_data)), self._N_level)
+        cluster_centroid = np.exp(log_centroid)[::-1]
 
         return N_eig, cluster_centroid
 
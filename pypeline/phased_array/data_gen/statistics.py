@@ -14,6 +14,7 @@ Instead, signals from different antennas are correlated together to form *visibi
 import imot_tools.math.stat as stat
 import imot_tools.util.argcheck as chk
 import numpy as np
+import scipy.sparse as sparse
 
 import pypeline.core as core
 import pypeline.phased_array.beamforming as beamforming
@@ -176,10 +177,13 @@ class VisibilityGeneratorBlock(core.Block):
             raise ValueError("Parameters[XYZ, W] are inconsistent.")
 
         A = np.exp((1j * 2 * np.pi / wl) * (self._sky_model.xyz @ XYZ.data.T))
-        S_sky = (W.data.conj().T @ (A.conj().T * self._sky_model.intensity)) @ (A @ W.data)
+        AW = (W.data.T @ A.T).T  # sparse-aware: per-station sums if W is station-grouped.
+        S_sky = (AW.conj().T * self._sky_model.intensity) @ AW
 
         noise_var = np.sum(self._sky_model.intensity) / (2 * self._SNR)
         S_noise = W.data.conj().T @ (noise_var * W.data)
+        if sparse.issparse(S_noise):
+            S_noise = S_noise.toarray()
 
         wishart = stat.Wishart(V=S_sky + S_noise, n=self._N_sample)
         S = wishart()[0] / self._N_sample
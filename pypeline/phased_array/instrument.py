@@ -33,7 +33,9 @@ import pandas as pd
 import pkg_resources as pkg
 import plotly.graph_objs as go
 import scipy.linalg as linalg
+import scipy.spatial.transform as sp_transform
 
+import pypeline
 import pypeline.core as core
 import pypeline.util.array as array
 
@@ -64,6 +66,184 @@ def _as_InstrumentGeometry(df):
     return XYZ
 
 
+def _itrs2icrs(XYZ, time):
+    """
+    Transform ITRS antenna positions to ICRS.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) ITRS antenna positions.
+    time : :py:class:`~astropy.time.Time`
+        Scalar or (N_time,) moments at which the coordinates are wanted.
+
+    Returns
+    -------
+    icrs_XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) or (N_time, N_antenna, 3) ICRS antenna positions.
+        All epochs are evaluated with a single (broadcasted) coordinate transform.
+    """
+    r = linalg.norm(XYZ, axis=1)
+
+    itrs_layout = coord.CartesianRepresentation(XYZ.T)
+    obstime = time
+    if not time.isscalar:
+        itrs_layout = itrs_layout[np.newaxis, :]
+        obstime = time[:, np.newaxis]
+    itrs_position = coord.SkyCoord(itrs_layout, obstime=obstime, frame="itrs")
+    icrs_direction = np.asarray(itrs_position.transform_to("icrs").cartesian.xyz)
+    return np.moveaxis(r * icrs_direction, 0, -1)
+
+
+@chk.check(dict(XYZ=chk.has_reals, N_ref=chk.is_integer))
+def reference_antennas(XYZ, N_ref):
+    """
+    Select well-spread antennas by farthest-point sampling.
+
+    The selected antennas are enough to estimate rigid motions of the whole instrument (ex: Earth
+    rotation) at a cost which does not depend on the number of antennas.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_antenna, 3) antenna positions.
+    N_ref : int
+        Number of antennas to select.
+
+    Returns
+    -------
+    idx : :py:class:`~numpy.ndarray`
+        (min(N_ref, N_antenna),) indices of selected antennas, starting with the one closest to
+        the array centroid.
+
+    Examples
+    --------
+    .. testsetup::
+
+       import numpy as np
+       from pypeline.phased_array.instrument import reference_antennas
+
+    .. doctest::
+
+       >>> XYZ = np.array([[0, 0, 0], [1, 0, 0], [5, 0, 0], [-5, 0, 0], [0, 4, 0]])
+       >>> reference_antennas(XYZ, 3)
+       array([0, 2, 3])
+    """
+    XYZ = np.array(XYZ, copy=False)
+    if N_ref <= 0:
+        raise ValueError("Parameter[N_ref] must be positive.")
+
+    dist = linalg.norm(XYZ - XYZ.mean(axis=0), axis=1)
+    idx = [np.argmin(dist)]
+    dist = linalg.norm(XYZ - XYZ[idx[0]], axis=1)
+    for _ in range(min(N_ref, len(XYZ)) - 1):
+        idx.append(np.argmax(dist))
+        dist = np.minimum(dist, linalg.norm(XYZ - XYZ[idx[-1]], axis=1))
+    return np.array(idx)
+
+
+def _itrs2icrs_rot(time):
+    """
+    ITRS -> ICRS frame rotation.
+
+    Parameters
+    ----------
+    time : :py:class:`~astropy.time.Time`
+        (N_time,) moments at which the rotation is wanted.
+
+    Returns
+    -------
+    R : :py:class:`~numpy.ndarray`
+        (N_time, 3, 3) rotation matrices closest to the transform of the ITRS basis vectors.
+        (Aberration makes the transform slightly non-orthogonal.)
+    """
+    basis = _itrs2icrs(np.eye(3), time)  # (N_time, 3, 3): row i = image of i-th basis vector
+    U, _, Vh = np.linalg.svd(np.swapaxes(basis, 1, 2))
+    return U @ Vh
+
+
+class _EphemerisTable:
+    """
+    Interpolated ICRS antenna positions.
+
+    Positions are stored at knot epochs as ``XYZ_k = E_k @ R_k.T``, with `R_k` the ITRS -> ICRS frame
+    rotation and `E_k` a slowly-varying residual layout.
+    In between knots, rotations are interpolated spherically (SLERP) and residuals linearly.
+    """
+
+    def __init__(self, t_start, offset, R, E):
+        """
+        Parameters
+        ----------
+        t_start : :py:class:`~astropy.time.Time`
+            Reference epoch.
+        offset : :py:class:`~numpy.ndarray`
+            (N_knot,) knot epochs [s] relative to `t_start`, sorted in increasing order.
+        R : :py:class:`~numpy.ndarray`
+            (N_knot, 3, 3) ITRS -> ICRS rotations at each knot.
+        E : :py:class:`~numpy.ndarray`
+            (N_knot, N_antenna, 3) residual layouts at each knot.
+        """
+        self._t_start = t_start
+        self._offset = offset
+        self._R = R
+        self._E = E
+        self._slerp = sp_transform.Slerp(offset, sp_transform.Rotation.from_matrix(R))
+
+    def covers(self, time):
+        """
+        Return :py:obj:`True` if all epochs in `time` lie within the table.
+        """
+        offset = np.atleast_1d((time - self._t_start).sec)
+        return bool(np.all((self._offset[0] <= offset) & (offset <= self._offset[-1])))
+
+    def __call__(self, time, idx=slice(None)):
+        """
+        Parameters
+        ----------
+        time : :py:class:`~astropy.time.Time`
+            (N_time,) epochs within the table.
+        idx : slice or :py:class:`~numpy.ndarray`
+            Antennas to evaluate. (Default = all)
+
+        Returns
+        -------
+        XYZ : :py:class:`~numpy.ndarray`
+            (N_time, N_antenna, 3) ICRS antenna positions.
+        """
+        offset = (time - self._t_start).sec
+        k = np.clip(np.searchsorted(self._offset, offset, side="right") - 1, 0, len(self._offset) - 2)
+        f = (offset - self._offset[k]) / (self._offset[k + 1] - self._offset[k])
+        f = f.reshape(-1, 1, 1)
+
+        E = (1 - f) * self._E[k][:, idx] + f * self._E[k + 1][:, idx]
+        R = self._slerp(offset).as_matrix()
+        return E @ np.swapaxes(R, 1, 2)
+
+
+def _fit_affine(XYZ, icrs_XYZ):
+    """
+    Per-epoch affine maps between reference positions.
+
+    Parameters
+    ----------
+    XYZ : :py:class:`~numpy.ndarray`
+        (N_ref, 3) centered ITRS positions.
+    icrs_XYZ : :py:class:`~numpy.ndarray`
+        (N_time, N_ref, 3) ICRS positions of the same antennas.
+
+    Returns
+    -------
+    M : :py:class:`~numpy.ndarray`
+        (N_time, 4, 3) maps such that ``icrs_XYZ[t] ~ [XYZ, 1] @ M[t]``.
+    """
+    N_time, N_ref, _ = icrs_XYZ.shape
+    A = np.concatenate([XYZ, np.ones((N_ref, 1))], axis=-1)
+    b = np.moveaxis(icrs_XYZ, 0, 1).reshape(N_ref, N_time * 3)
+    M, *_ = linalg.lstsq(A, b)
+    return np.moveaxis(M.reshape(4, N_time, 3), 1, 0)
+
+
 class InstrumentGeometry(array.LabeledMatrix):
     """
     Position of antennas in a particular reference frame.
@@ -325,21 +505,35 @@ class EarthBoundInstrumentGeometryBlock(InstrumentGeometryBlock):
             when sorted by STATION_ID.
         """
         super().__init__(XYZ, N_station)
+        self._ephemeris = None
 
-    @chk.check("time", chk.is_instance(time.Time))
-    def __call__(self, time):
+    @chk.check(dict(time=chk.is_instance(time.Time), linearize=chk.is_boolean))
+    def __call__(self, time, linearize=False):
         """
         Determine instrument antenna positions in ICRS.
 
         Parameters
         ----------
         time : :py:class:`~astropy.time.Time`
-            Moment at which the coordinates are wanted.
+            Moment(s) at which the coordinates are wanted.
+
+            If `time` is an array, all epochs are evaluated with a single coordinate transform.
+        linearize : bool
+            If :py:obj:`True`, only `[phased_array.instrument]/linearize_N_reference` well-spread
+            antennas are transformed exactly.
+            The resulting per-epoch affine ITRS -> ICRS map (a rotation, up to aberration effects)
+            is then applied to the full layout with a batched matrix product.
+            Positions are accurate to the cm-level for LOFAR. (Default = False)
+
+            If neither `linearize` is set nor an ephemeris table covering `time` is available (see
+            :py:meth:`~pypeline.phased_array.instrument.EarthBoundInstrumentGeometryBlock.set_ephemeris`),
+            positions are computed exactly.
 
         Returns
         -------
-        :py:class:`~pypeline.phased_array.instrument.InstrumentGeometry`
-            (N_antenna, 3) ICRS instrument geometry.
+        :py:class:`~pypeline.phased_array.instrument.InstrumentGeometry` or :py:class:`~numpy.ndarray`
+            (N_antenna, 3) ICRS instrument geometry if `time` is a scalar, or
+            (N_time, N_antenna, 3) ICRS antenna positions if `time` is an array.
 
         Examples
         --------
@@ -370,17 +564,132 @@ class EarthBoundInstrumentGeometryBlock(InstrumentGeometryBlock):
                   [ 1620400.53, -3497583.69,  5064544.37],
                   [ 1620405.5 , -3497583.23,  5064543.11]])
         """
-        layout = self._layout.loc[:, ["X", "Y", "Z"]].values.T
-        r = linalg.norm(layout, axis=0)
+        layout = self._layout.loc[:, ["X", "Y", "Z"]].values
+
+        if linearize:
+            N_ref = pypeline.config.getint("phased_array.instrument", "linearize_N_reference")
+            ref_idx = reference_antennas(layout, N_ref)
+            icrs_ref = _itrs2icrs(layout[ref_idx], time.reshape(-1))
+
+            center = layout[ref_idx].mean(axis=0)
+            M = _fit_affine(layout[ref_idx] - center, icrs_ref)
+            icrs_position = (layout - center) @ M[:, :3] + M[:, 3:]
+            if time.isscalar:
+                icrs_position = icrs_position[0]
+        elif (self._ephemeris is not None) and self._ephemeris.covers(time):
+            icrs_position = self._ephemeris(time.reshape(-1))
+            if time.isscalar:
+                icrs_position = icrs_position[0]
+        else:
+            icrs_position = _itrs2icrs(layout, time)
+
+        if not time.isscalar:
+            return icrs_position
 
-        itrs_layout = coord.CartesianRepresentation(layout)
-        itrs_position = coord.SkyCoord(itrs_layout, obstime=time, frame="itrs")
-        icrs_position = r * (itrs_position.transform_to("icrs").cartesian.xyz)
         icrs_layout = pd.DataFrame(
-            data=icrs_position.T, index=self._layout.index, columns=("X", "Y", "Z")
+            data=icrs_position, index=self._layout.index, columns=("X", "Y", "Z")
         )
         return _as_InstrumentGeometry(icrs_layout)
 
+    @chk.check(
+        dict(
+            obs_start=chk.allow_None(chk.is_instance(time.Time)),
+            obs_end=chk.allow_None(chk.is_instance(time.Time)),
+            tol=chk.is_real,
+        )
+    )
+    def set_ephemeris(self, obs_start, obs_end, tol=1):
+        """
+        Enable/disable the ephemeris table mode.
+
+        The exact ITRS -> ICRS transform is evaluated on a coarse time grid of
+        `[phased_array.instrument]/ephemeris_step` seconds.
+        Intervals are then bisected until interpolated positions of reference antennas are within
+        `tol` of exact positions at interval midpoints.
+        Calls to :py:meth:`~pypeline.phased_array.instrument.EarthBoundInstrumentGeometryBlock.__call__`
+        with epochs in [`obs_start`, `obs_end`] are subsequently served from the table.
+
+        Parameters
+        ----------
+        obs_start : :py:class:`~astropy.time.Time`
+            Start of the observation period. (:py:obj:`None` to disable the table.)
+        obs_end : :py:class:`~astropy.time.Time`
+            End of the observation period. (:py:obj:`None` to disable the table.)
+        tol : float
+            Accuracy bound [m] on antenna positions. (Default = 1)
+        """
+        if (obs_start is None) or (obs_end is None):
+            self._ephemeris = None
+            return
+
+        if obs_start >= obs_end:
+            raise ValueError("Parameter[obs_start] must precede Parameter[obs_end].")
+        if tol <= 0:
+            raise ValueError("Parameter[tol] must be positive.")
+
+        section = "phased_array.instrument"
+        layout = self._layout.loc[:, ["X", "Y", "Z"]].values
+        N_ref = pypeline.config.getint(section, "linearize_N_reference")
+        ref_idx = reference_antennas(layout, N_ref)
+
+        def knots(offset):
+            t = obs_start + time.TimeDelta(offset, format="sec")
+            R = _itrs2icrs_rot(t)
+            return R, _itrs2icrs(layout, t) @ R
+
+        duration = (obs_end - obs_start).sec
+        step = pypeline.config.getfloat(section, "ephemeris_step")
+        offset = np.linspace(0, duration, int(np.ceil(duration / step)) + 1)
+        R, E = knots(offset)
+
+        min_step = pypeline.config.getfloat(section, "ephemeris_min_step")
+        while True:
+            table = _EphemerisTable(obs_start, offset, R, E)
+
+            mid = (offset[:-1] + offset[1:]) / 2
+            mid = mid[np.diff(offset) > 2 * min_step]
+            if len(mid) == 0:
+                break
+            t_mid = obs_start + time.TimeDelta(mid, format="sec")
+            exact = _itrs2icrs(layout[ref_idx], t_mid)
+            error = np.max(linalg.norm(table(t_mid, ref_idx) - exact, axis=-1), axis=-1)
+
+            mid = mid[error > tol]
+            if len(mid) == 0:
+                break
+            R_mid, E_mid = knots(mid)
+            order = np.argsort(np.r_[offset, mid])
+            offset = np.r_[offset, mid][order]
+            R = np.concatenate([R, R_mid], axis=0)[order]
+            E = np.concatenate([E, E_mid], axis=0)[order]
+
+        self._ephemeris = table
+
+    @chk.check("time", chk.is_instance(time.Time))
+    def validate_ephemeris(self, time):
+        """
+        Deviation of the ephemeris table w.r.t. exact antenna positions.
+
+        Parameters
+        ----------
+        time : :py:class:`~astropy.time.Time`
+            Epochs at which to compare positions. Must lie within the ephemeris table.
+
+        Returns
+        -------
+        dev : float
+            Maximum distance [m] between interpolated and exact antenna positions.
+        """
+        if self._ephemeris is None:
+            raise ValueError("Ephemeris table mode is disabled.")
+        time = time.reshape(-1)
+        if not self._ephemeris.covers(time):
+            raise ValueError("Parameter[time] lies outside the ephemeris table.")
+
+        layout = self._layout.loc[:, ["X", "Y", "Z"]].values
+        dev = linalg.norm(self._ephemeris(time) - _itrs2icrs(layout, time), axis=-1)
+        return float(np.max(dev))
+
     @chk.check(dict(obs_start=chk.is_instance(time.Time), obs_end=chk.is_instance(time.Time)))
     def icrs2bfsf_rot(self, obs_start, obs_end):
         """
@@ -427,8 +736,7 @@ class EarthBoundInstrumentGeometryBlock(InstrumentGeometryBlock):
         sampling_times = obs_start + ((obs_end - obs_start) / (N_interval - 1)) * np.arange(
             N_interval
         )
-        icrs_layouts = [self.__call__(t).data for t in sampling_times]
-        icrs_layouts = np.stack(icrs_layouts, axis=1)  # (N_antenna, N_time, 3)
+        icrs_layouts = np.swapaxes(self.__call__(sampling_times), 0, 1)  # (N_antenna, N_time, 3)
 
         # For each antenna `i`, find a normal vector `n_{i}` to the rotation plane.
         N_antenna = len(icrs_layouts)
@@ -23,6 +23,7 @@ import scipy.sparse as sparse
 import pypeline.phased_array.beamforming as beamforming
 import pypeline.phased_array.instrument as instrument
 import pypeline.phased_array.data_gen.statistics as vis
+import pypeline.util.prefetch as prefetch
 
 
 @chk.check(
@@ -112,6 +113,9 @@ class MeasurementSet:
         self._field_center = None
         self._channels = None
         self._time = None
+        self._time_row = None
+        self._main_table = None
+        self._beam_slot = None
         self._instrument = None
         self._beamformer = None
 
@@ -185,20 +189,88 @@ class MeasurementSet:
             # Following the MS file specification from https://casa.nrao.edu/casadocs/casa-5.1.0/reference-material/measurement-set,
             # the MAIN table contains TIME which gives the integration midpoints.
             # It is generally given in UTC scale (in seconds) with epoch set at 0 MJD (Modified Julian Date).
-            # Only the TIME column of the MAIN table is required, so we could use the TaQL query below:
-            #    select unique MJD(TIME) as MJD_TIME from {self._msf} orderby TIME
-            #
-            # Unfortunately this query consumes a lot of memory due to the column selection process.
-            # Therefore, we will instead ask for all columns and only access the one of interest.
-            query = f"select * from {self._msf}"
-            table = ct.taql(query)
-
-            t = time.Time(np.unique(table.calc("MJD(TIME)")), format="mjd", scale="utc")
+            # Only the TIME column is read: rows of each integration are contiguous once the table
+            # is sorted by TIME, which gives the row range of each TIME_ID.
+            table = self._table()
+            t_col = table.getcol("TIME")
+            t, t_row = np.unique(t_col, return_index=True)
+
+            self._time_row = np.r_[t_row, len(t_col)]
+            t = time.Time(t / 86400, format="mjd", scale="utc")
             t_id = range(len(t))
             self._time = tb.QTable(dict(TIME_ID=t_id, TIME=t))
 
         return self._time
 
+    def _table(self):
+        """
+        Returns
+        -------
+        :py:class:`~casacore.tables.table`
+            MAIN table, sorted by TIME.
+        """
+        if self._main_table is None:
+            table = ct.table(self._msf, readonly=True, ack=False)
+            t_col = table.getcol("TIME")
+            if np.any(np.diff(t_col) < 0):
+                table = table.sort("TIME")
+            self._main_table = table
+
+        return self._main_table
+
+    def _channel_id(self, channel_id):
+        """
+        Parameters
+        ----------
+        channel_id : array-like(int) or slice
+            Several CHANNEL_IDs from :py:attr:`~pypeline.phased_array.measurement_set.MeasurementSet.channels`.
+
+        Returns
+        -------
+        channel_id : :py:class:`~numpy.ndarray`
+            (N_channel,) selected CHANNEL_IDs.
+        """
+        return np.array(self.channels["CHANNEL_ID"][channel_id], dtype=int).reshape(-1)
+
+    def _channel_row(self, channel_id):
+        """
+        Parameters
+        ----------
+        channel_id : :py:class:`~numpy.ndarray`
+            (N_channel,) CHANNEL_IDs returned by
+            :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet._channel_id`.
+
+        Returns
+        -------
+        row : :py:class:`~numpy.ndarray`
+            (N_channel,) rows of `channel_id` in
+            :py:attr:`~pypeline.phased_array.measurement_set.MeasurementSet.channels`.
+        """
+        return channel_id  # CHANNEL_IDs are row indices of the SPECTRAL_WINDOW table.
+
+    def _beam_lookup(self):
+        """
+        Returns
+        -------
+        beam_id : :py:class:`~numpy.ndarray`
+            (N_beam,) sorted BEAM_IDs of visibility matrices.
+        beam_slot : :py:class:`~numpy.ndarray`
+            (max(ANTENNA_ID) + 1,) row/column of each MAIN::ANTENNA[12] in visibility matrices, or
+            -1 if the antenna is not part of the instrument.
+        """
+        if self._beam_slot is None:
+            beam_id = np.unique(self.instrument._layout.index.get_level_values("STATION_ID"))
+
+            table = self._table()
+            N_slot = max(
+                table.getcol("ANTENNA1").max(), table.getcol("ANTENNA2").max(), beam_id.max()
+            )
+            beam_slot = np.full(N_slot + 1, -1, dtype=int)
+            beam_slot[beam_id] = np.arange(len(beam_id))
+            self._beam_slot = (beam_id, beam_slot)
+
+        return self._beam_slot
+
     @property
     def instrument(self):
         """
@@ -227,9 +299,14 @@ class MeasurementSet:
             channel_id=chk.accept_any(chk.has_integers, chk.is_instance(slice)),
             time_id=chk.accept_any(chk.is_integer, chk.is_instance(slice)),
             column=chk.is_instance(str),
+            prefetch_depth=chk.is_integer,
+            prefetch_max_bytes=chk.allow_None(chk.is_integer),
+            stack=chk.is_boolean,
         )
     )
-    def visibilities(self, channel_id, time_id, column):
+    def visibilities(
+        self, channel_id, time_id, column, prefetch_depth=0, prefetch_max_bytes=None, stack=False
+    ):
         """
         Extract visibility matrices.
 
@@ -243,6 +320,13 @@ class MeasurementSet:
             Column name from MAIN table where visibility data resides.
 
             (This is required since several visibility-holding columns can co-exist.)
+        prefetch_depth : int
+            Number of time samples to read ahead on a worker thread while the caller processes the
+            current one. (Default = 0, i.e. synchronous reads.)
+        prefetch_max_bytes : int
+            Maximum size [bytes] of prefetched visibility matrices. (Default = no limit)
+        stack : bool
+            If :py:obj:`True`, return all channels of a time sample at once. (Default = :py:obj:`False`)
 
         Returns
         -------
@@ -253,109 +337,161 @@ class MeasurementSet:
             * time (:py:class:`~astropy.time.Time`): moment the visibility was formed;
             * freq (:py:class:`~astropy.units.Quantity`): center frequency of the visibility;
             * S (:py:class:`~pypeline.phased_array.data_gen.statistics.VisibilityMatrix`)
+
+            If `stack=True`, one triplet is returned per time sample instead, with:
+
+            * freq (:py:class:`~astropy.units.Quantity`): (N_channel,) center frequencies;
+            * S (:py:class:`~numpy.ndarray`): (N_channel, N_beam, N_beam) visibility matrices.
+              Rows/columns are ordered like the beams of
+              :py:attr:`~pypeline.phased_array.measurement_set.MeasurementSet.beamformer`.
+
+            If `prefetch_depth > 0`, a :py:class:`~pypeline.util.prefetch.Prefetcher` is returned
+            instead. Its `wait_time` attribute tells whether the loop is I/O- or compute-bound.
+            Use it as a context manager to stop reading the MS right away if the loop exits early.
         """
-        if column not in ct.taql(f"select * from {self._msf}").colnames():
-            raise ValueError(f"column={column} does not exist in {self._msf}::MAIN.")
+        if prefetch_depth < 0:
+            raise ValueError("Parameter[prefetch_depth] must be non-negative.")
 
-        channel_id = self.channels["CHANNEL_ID"][channel_id]
+        # Selections, sub-tables and buffered attributes are resolved here, on the caller's thread:
+        # prefetching workers only decode integrations.
+        channel_id = self._channel_id(channel_id)
         if chk.is_integer(time_id):
             time_id = slice(time_id, time_id + 1, 1)
-        N_time = len(self.time)
-        time_start, time_stop, time_step = time_id.indices(N_time)
-
-        # Only a subset of the MAIN table's columns are needed to extract visibility information.
-        # As such, it makes sense to construct a TaQL query that only extracts the columns of
-        # interest as shown below:
-        #    select ANTENNA1, ANTENNA2, MJD(TIME) as TIME, {column}, FLAG from {self._msf} where TIME in
-        #    (select unique TIME from {self._msf} limit {time_start}:{time_stop}:{time_step})
-        # Unfortunately this query consumes a lot of memory due to the column selection process.
-        # Therefore, we will instead ask for all columns and only access those of interest.
-        query = (
-            f"select * from {self._msf} where TIME in "
-            f"(select unique TIME from {self._msf} limit {time_start}:{time_stop}:{time_step})"
-        )
-        table = ct.taql(query)
+        time_id = range(*time_id.indices(len(self.time)))
 
-        for sub_table in table.iter("TIME", sort=True):
-            beam_id_0 = sub_table.getcol("ANTENNA1")  # (N_entry,)
-            beam_id_1 = sub_table.getcol("ANTENNA2")  # (N_entry,)
-            data_flag = sub_table.getcol("FLAG")  # (N_entry, N_channel, 4)
-            data = sub_table.getcol(column)  # (N_entry, N_channel, 4)
+        stream = self._visibilities(channel_id, time_id, column, stack)
+        if prefetch_depth == 0:
+            return stream
 
-            # We only want XX and YY correlations
-            data = np.average(data[:, :, [0, 3]], axis=2)[:, channel_id]
-            data_flag = np.any(data_flag[:, :, [0, 3]], axis=2)[:, channel_id]
+        if stack:
+            depth, sizeof = prefetch_depth, lambda item: item[2].nbytes
+        else:
+            depth, sizeof = prefetch_depth * len(channel_id), lambda item: item[2].data.nbytes
+        return prefetch.Prefetcher(stream, depth=depth, max_bytes=prefetch_max_bytes, sizeof=sizeof)
 
-            # Set broken visibilities to 0
-            data[data_flag] = 0
+    def _visibilities(self, channel_id, time_id, column, stack=False):
+        """
+        Synchronous implementation of
+        :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet.visibilities`.
 
-            # DataFrame description of visibility data.
-            # Each column represents a different channel.
-            S_full_idx = pd.MultiIndex.from_arrays((beam_id_0, beam_id_1), names=("B_0", "B_1"))
-            S_full = pd.DataFrame(data=data, columns=channel_id, index=S_full_idx)
+        Parameters
+        ----------
+        channel_id : :py:class:`~numpy.ndarray`
+            (N_channel,) CHANNEL_IDs.
+        time_id : iterable(int)
+            TIME_IDs.
+        column : str
+            Column name from MAIN table where visibility data resides.
+        stack : bool
+            If :py:obj:`True`, return all channels of a time sample at once.
 
-            # Drop rows of `S_full` corresponding to unwanted beams.
-            beam_id = np.unique(self.instrument._layout.index.get_level_values("STATION_ID"))
-            N_beam = len(beam_id)
-            i, j = np.triu_indices(N_beam, k=0)
-            wanted_index = pd.MultiIndex.from_arrays((beam_id[i], beam_id[j]), names=("B_0", "B_1"))
-            index_to_drop = S_full_idx.difference(wanted_index)
-            S_trunc = S_full.drop(index=index_to_drop)
-
-            # Depending on the dataset, some (ANTENNA1, ANTENNA2) pairs that have correlation=0 are
-            # omitted in the table.
-            # This is problematic as the previous DataFrame construction could be potentially
-            # missing entire antenna ranges.
-            # To fix this issue, we augment the dataframe to always make sure `S_trunc` matches the
-            # desired shape.
-            index_diff = wanted_index.difference(S_trunc.index)
-            N_diff = len(index_diff)
-
-            S_fill_in = pd.DataFrame(
-                data=np.zeros((N_diff, len(channel_id)), dtype=data.dtype),
-                columns=channel_id,
-                index=index_diff,
-            )
-            S = pd.concat([S_trunc, S_fill_in], axis=0, ignore_index=False).sort_index(
-                level=["B_0", "B_1"]
-            )
+        Returns
+        -------
+        iterable
+            Generator object returning (time, freq, S) triplets.
 
-            # Break S into columns and stream out
-            t = time.Time(sub_table.calc("MJD(TIME)")[0], format="mjd", scale="utc")
-            f = self.channels["FREQUENCY"]
-            beam_idx = pd.Index(beam_id, name="BEAM_ID")
-            for ch_id in channel_id:
-                v = _series2array(S[ch_id].rename("S", inplace=True))
-                visibility = vis.VisibilityMatrix(v, beam_idx)
-                yield t, f[ch_id], visibility
-
-
-def _series2array(visibility: pd.Series) -> np.ndarray:
-    b_idx_0 = visibility.index.get_level_values("B_0").to_series()
-    b_idx_1 = visibility.index.get_level_values("B_1").to_series()
-
-    row_map = (
-        pd.concat(objs=(b_idx_0, b_idx_1), ignore_index=True)
-        .drop_duplicates()
-        .to_frame(name="BEAM_ID")
-        .assign(ROW_ID=lambda df: np.arange(len(df)))
-    )
-    col_map = row_map.rename(columns={"ROW_ID": "COL_ID"})
+            Everything but the decoding of integrations is done before this function returns.
+        """
+        beam_id, _ = self._beam_lookup()
+        beam_idx = pd.Index(beam_id, name="BEAM_ID")
+        integrations = self._integrations(channel_id, time_id, column)
+        t = self.time["TIME"]
+        f = self.channels["FREQUENCY"][self._channel_row(channel_id)]
 
-    data = (
-        visibility.reset_index()
-        .merge(row_map, left_on="B_0", right_on="BEAM_ID")
-        .merge(col_map, left_on="B_1", right_on="BEAM_ID")
-        .loc[:, ["ROW_ID", "COL_ID", "S"]]
-    )
+        def stream():
+            for t_id, S, _ in integrations:
+                if stack:
+                    yield t[t_id], f, S.copy()
+                    continue
+
+                for i in range(len(channel_id)):
+                    visibility = vis.VisibilityMatrix(S[i].copy(), beam_idx)
+                    yield t[t_id], f[i], visibility
+
+        return stream()
+
+    def _integrations(self, channel_id, time_id, column):
+        """
+        Decode visibility matrices of several channels, one integration at a time.
+
+        Parameters
+        ----------
+        channel_id : :py:class:`~numpy.ndarray`
+            (N_channel,) CHANNEL_IDs.
+        time_id : iterable(int)
+            TIME_IDs.
+        column : str
+            Column name from MAIN table where visibility data resides.
+
+        Returns
+        -------
+        iterable
+
+            Generator object returning (t_id, S, F) triplets with:
+
+            * t_id (int): TIME_ID;
+            * S (:py:class:`~numpy.ndarray`): (N_channel, N_beam, N_beam) visibility matrices;
+            * F (:py:class:`~numpy.ndarray`): (N_channel, N_beam, N_beam) flags, :py:obj:`True` where
+              visibilities are broken or missing from the MS.
+
+            (Note: `S` and `F` are overwritten at each iteration.)
+
+            The MAIN table and buffered attributes are accessed before this function returns: the
+            generator only reads rows of the MAIN table.
+        """
+        table = self._table()
+        if column not in table.colnames():
+            raise ValueError(f"column={column} does not exist in {self._msf}::MAIN.")
+        self.time  # buffers row ranges of each TIME_ID
+
+        beam_id, beam_slot = self._beam_lookup()
+        N_beam = len(beam_id)
+
+        # Only ANTENNA1, ANTENNA2, FLAG and `column` are read, one integration (i.e. contiguous row
+        # range) at a time. Of the (N_channel, 4) polarization cells, only channels in
+        # [ch_min, ch_max] and XX/YY correlations are fetched.
+        ch_min, ch_max = channel_id.min(), channel_id.max()
+        blc, trc, inc = [ch_min, 0], [ch_max, 3], [1, 3]
+        ch_idx = channel_id - ch_min
+
+        S = np.zeros((len(channel_id), N_beam, N_beam), dtype=complex)
+        F = np.ones((len(channel_id), N_beam, N_beam), dtype=bool)
+        diag = np.arange(N_beam)
+        time_row = self._time_row
+
+        def decode():
+            for t_id in time_id:
+                row_start = time_row[t_id]
+                N_row = time_row[t_id + 1] - row_start
+                beam_0 = beam_slot[table.getcol("ANTENNA1", startrow=row_start, nrow=N_row)]
+                beam_1 = beam_slot[table.getcol("ANTENNA2", startrow=row_start, nrow=N_row)]
+                data = table.getcolslice(column, blc, trc, inc, startrow=row_start, nrow=N_row)
+                data_flag = table.getcolslice("FLAG", blc, trc, inc, startrow=row_start, nrow=N_row)
+
+                # We only want XX and YY correlations
+                data = np.average(data, axis=2)[:, ch_idx]  # (N_row, N_channel)
+                data_flag = np.any(data_flag, axis=2)[:, ch_idx]
+
+                # Set broken visibilities to 0
+                data[data_flag] = 0
 
-    N_beam = len(row_map)
-    S = np.zeros(shape=(N_beam, N_beam), dtype=complex)
-    S[data.ROW_ID.values, data.COL_ID.values] = data.S.values
-    S_diag = np.diag(S)
-    S = S + S.conj().T
-    S[np.diag_indices_from(S)] = S_diag
-    return S
+                # Keep (B_0 <= B_1) entries of wanted beams only. Missing pairs remain 0.
+                keep = (beam_0 >= 0) & (beam_1 >= 0) & (beam_0 <= beam_1)
+                beam_0, beam_1 = beam_0[keep], beam_1[keep]
+
+                S.fill(0)
+                S[:, beam_0, beam_1] = data[keep].T
+                S_diag = S[:, diag, diag]
+                np.add(S, S.conj().transpose(0, 2, 1), out=S)
+                S[:, diag, diag] = S_diag
+
+                F.fill(True)
+                F[:, beam_0, beam_1] = data_flag[keep].T
+                np.logical_and(F, F.transpose(0, 2, 1), out=F)
+
+                yield t_id, S, F
+
+        return decode()
 
 
 class LofarMeasurementSet(MeasurementSet):
@@ -548,3 +684,283 @@ class MwaMeasurementSet(MeasurementSet):
             self._beamformer = beamforming.MatchedBeamformerBlock(beam_config)
 
         return self._beamformer
+
+
+@chk.check(
+    dict(
+        ms=chk.is_instance(MeasurementSet),
+        dir_name=chk.is_instance(str),
+        column=chk.is_instance(str),
+        channel_id=chk.accept_any(chk.has_integers, chk.is_instance(slice)),
+        time_id=chk.accept_any(chk.is_integer, chk.is_instance(slice)),
+    )
+)
+def export_visibilities(ms, dir_name, column, channel_id=slice(None), time_id=slice(None)):
+    """
+    Decode visibilities from an MS file into a directory of NumPy arrays.
+
+    The directory can then be opened with
+    :py:class:`~pypeline.phased_array.measurement_set.CachedMeasurementSet`, which serves the same
+    (time, freq, S) triplets without going through casacore.
+    Several columns can be exported to the same directory, provided the same channels/times are
+    selected.
+
+    Directory content:
+
+    * `{column}.npy`: (N_time, N_channel, N_beam, N_beam) visibility matrices;
+    * `{column}.flag.npy`: (N_time, N_channel, N_beam, N_beam) flags (broken/missing visibilities);
+    * `time.npy`: (N_time,) integration midpoints [MJD, UTC];
+    * `channel_id.npy`, `frequency.npy`: (N_channel,) CHANNEL_IDs and center frequencies [Hz];
+    * `beam_id.npy`: (N_beam,) BEAM_IDs;
+    * `xyz.npy`, `ant_idx.npy`: (N_antenna, 3) ITRS instrument geometry and its (STATION_ID,
+      ANTENNA_ID) index;
+    * `field_center.npy`: (RA, DEC) [rad] ICRS field center.
+
+    Parameters
+    ----------
+    ms : :py:class:`~pypeline.phased_array.measurement_set.MeasurementSet`
+        MS file reader.
+    dir_name : str
+        Directory to write to. It is created if it does not exist.
+    column : str
+        Column name from MAIN table where visibility data resides.
+    channel_id : array-like(int) or slice
+        Several CHANNEL_IDs from :py:attr:`~pypeline.phased_array.measurement_set.MeasurementSet.channels`. (Default = all)
+    time_id : int or slice
+        Several TIME_IDs from :py:attr:`~pypeline.phased_array.measurement_set.MeasurementSet.time`. (Default = all)
+    """
+    path = pathlib.Path(dir_name).absolute()
+    path.mkdir(parents=True, exist_ok=True)
+
+    channel_id = ms._channel_id(channel_id)
+    if chk.is_integer(time_id):
+        time_id = slice(time_id, time_id + 1, 1)
+    time_id = range(*time_id.indices(len(ms.time)))
+
+    layout = ms.instrument._layout
+    beam_id, _ = ms._beam_lookup()
+    meta = dict(
+        time=ms.time["TIME"][list(time_id)].mjd,
+        channel_id=channel_id,
+        frequency=ms.channels["FREQUENCY"][ms._channel_row(channel_id)].to_value(u.Hz),
+        beam_id=beam_id,
+        xyz=layout.loc[:, ["X", "Y", "Z"]].values,
+        ant_idx=np.stack([layout.index.get_level_values(_) for _ in layout.index.names], axis=1),
+        field_center=np.r_[ms.field_center.ra.to_value(u.rad), ms.field_center.dec.to_value(u.rad)],
+    )
+    for name, value in meta.items():
+        f_name = path / f"{name}.npy"
+        if f_name.exists() and not np.array_equal(np.load(f_name), value):
+            raise ValueError(f"{dir_name} holds data with a different {name} selection.")
+
+    N_time, N_channel, N_beam = len(time_id), len(channel_id), len(beam_id)
+    shape = (N_time, N_channel, N_beam, N_beam)
+    S = np.lib.format.open_memmap(str(path / f"{column}.npy"), "w+", complex, shape)
+    F = np.lib.format.open_memmap(str(path / f"{column}.flag.npy"), "w+", bool, shape)
+    for i, (_, S_t, F_t) in enumerate(ms._integrations(channel_id, time_id, column)):
+        S[i], F[i] = S_t, F_t
+    S.flush()
+    F.flush()
+
+    for name, value in meta.items():
+        np.save(path / f"{name}.npy", value)
+
+
+class CachedMeasurementSet(MeasurementSet):
+    """
+    Reader for visibilities exported with
+    :py:func:`~pypeline.phased_array.measurement_set.export_visibilities`.
+
+    Visibility matrices are memory-mapped: each one returned by
+    :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet.visibilities` is a read-only view
+    into the file.
+
+    Channels are selected by CHANNEL_ID, as in the source MS: requesting channels that were not
+    exported raises :py:class:`ValueError`.
+    """
+
+    @chk.check("dir_name", chk.is_instance(str))
+    def __init__(self, dir_name):
+        """
+        Parameters
+        ----------
+        dir_name : str
+            Directory written by :py:func:`~pypeline.phased_array.measurement_set.export_visibilities`.
+        """
+        super().__init__(dir_name)
+        path = pathlib.Path(self._msf)
+
+        if not (path / "time.npy").exists():
+            raise ValueError(f"{dir_name} does not contain exported visibilities.")
+        self._meta = {
+            name: np.load(path / f"{name}.npy")
+            for name in (
+                "time",
+                "channel_id",
+                "frequency",
+                "beam_id",
+                "xyz",
+                "ant_idx",
+                "field_center",
+            )
+        }
+        self._data = dict()
+
+    @property
+    def field_center(self):
+        """
+        Returns
+        -------
+        :py:class:`~astropy.coordinates.SkyCoord`
+            Observed field's center.
+        """
+        if self._field_center is None:
+            lon, lat = self._meta["field_center"]
+            self._field_center = coord.SkyCoord(ra=lon * u.rad, dec=lat * u.rad, frame="icrs")
+
+        return self._field_center
+
+    @property
+    def channels(self):
+        """
+        Frequency channels available.
+
+        Returns
+        -------
+        :py:class:`~astropy.table.QTable`
+            (N_channel, 2) table with columns
+
+            * CHANNEL_ID : int
+            * FREQUENCY : :py:class:`~astropy.units.Quantity`
+        """
+        if self._channels is None:
+            f = self._meta["frequency"] * u.Hz
+            f_id = self._meta["channel_id"]
+            self._channels = tb.QTable(dict(CHANNEL_ID=f_id, FREQUENCY=f))
+
+        return self._channels
+
+    @property
+    def time(self):
+        """
+        Visibility acquisition times.
+
+        Returns
+        -------
+        :py:class:`~astropy.table.QTable`
+            (N_time, 2) table with columns
+
+            * TIME_ID : int
+            * TIME : :py:class:`~astropy.time.Time`
+        """
+        if self._time is None:
+            t = time.Time(self._meta["time"], format="mjd", scale="utc")
+            t_id = range(len(t))
+            self._time = tb.QTable(dict(TIME_ID=t_id, TIME=t))
+
+        return self._time
+
+    @property
+    def instrument(self):
+        """
+        Returns
+        -------
+        :py:class:`~pypeline.phased_array.instrument.EarthBoundInstrumentGeometryBlock`
+            Instrument position computer.
+        """
+        if self._instrument is None:
+            ant_idx = pd.MultiIndex.from_arrays(
+                self._meta["ant_idx"].T, names=("STATION_ID", "ANTENNA_ID")
+            )
+            XYZ = instrument.InstrumentGeometry(xyz=self._meta["xyz"], ant_idx=ant_idx)
+            self._instrument = instrument.EarthBoundInstrumentGeometryBlock(XYZ)
+
+        return self._instrument
+
+    @property
+    def beamformer(self):
+        """
+        Returns
+        -------
+        :py:class:`~pypeline.phased_array.beamforming.MatchedBeamformerBlock`
+            Beamweight computer, with a single beam per station.
+        """
+        if self._beamformer is None:
+            direction = self.field_center
+            beam_config = [(_, _, direction) for _ in self._meta["beam_id"]]
+            self._beamformer = beamforming.MatchedBeamformerBlock(beam_config)
+
+        return self._beamformer
+
+    @chk.check("column", chk.is_instance(str))
+    def flags(self, column):
+        """
+        Parameters
+        ----------
+        column : str
+            Exported column name.
+
+        Returns
+        -------
+        F : :py:class:`~numpy.ndarray`
+            (N_time, N_channel, N_beam, N_beam) read-only memory-mapped flags, :py:obj:`True` where
+            visibilities were broken or missing from the MS.
+        """
+        return self._memmap(f"{column}.flag")
+
+    def _channel_id(self, channel_id):
+        """
+        Parameters
+        ----------
+        channel_id : array-like(int) or slice
+            Several exported CHANNEL_IDs.
+
+            Slices select exported CHANNEL_IDs in the given range, in CHANNEL_ID order.
+
+        Returns
+        -------
+        channel_id : :py:class:`~numpy.ndarray`
+            (N_channel,) selected CHANNEL_IDs.
+        """
+        exported = self._meta["channel_id"]
+        if isinstance(channel_id, slice):
+            ch_id = np.arange(exported.max() + 1)[channel_id]
+            return ch_id[np.isin(ch_id, exported)]
+
+        ch_id = np.array(channel_id, dtype=int).reshape(-1)
+        missing = np.setdiff1d(ch_id, exported)
+        if len(missing) > 0:
+            raise ValueError(f"CHANNEL_IDs {missing.tolist()} were not exported to {self._msf}.")
+        return ch_id
+
+    def _channel_row(self, channel_id):
+        row = {ch_id: i for (i, ch_id) in enumerate(self._meta["channel_id"])}
+        return np.array([row[_] for _ in channel_id], dtype=int)
+
+    def _memmap(self, name):
+        if name not in self._data:
+            f_name = pathlib.Path(self._msf) / f"{name}.npy"
+            if not f_name.exists():
+                raise ValueError(f"{name} was not exported to {self._msf}.")
+            self._data[name] = np.load(f_name, mmap_mode="r")
+
+        return self._data[name]
+
+    def _visibilities(self, channel_id, time_id, column, stack=False):
+        S = self._memmap(column)
+        ch_idx = self._channel_row(channel_id)
+        beam_idx = pd.Index(self._meta["beam_id"], name="BEAM_ID")
+        t = self.time["TIME"]
+        f = self.channels["FREQUENCY"]
+
+        def stream():
+            for t_id in time_id:
+                if stack:
+                    yield t[t_id], f[ch_idx], S[t_id, ch_idx]
+                    continue
+
+                for ch in ch_idx:
+                    visibility = vis.VisibilityMatrix(S[t_id, ch], beam_idx)
+                    yield t[t_id], f[ch], visibility
+
+        return stream()
@@ -0,0 +1,63 @@
+# #############################################################################
+# test_beamforming.py
+# ===================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import astropy.coordinates as coord
+import astropy.units as u
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sparse
+
+import pypeline.phased_array.beamforming as beamforming
+import pypeline.phased_array.instrument as instrument
+
+
+class TestMatchedBeamformerBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.beamforming.MatchedBeamformerBlock`.
+    """
+
+    @pytest.fixture
+    def XYZ(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station = 3, 4
+        ant_idx = pd.MultiIndex.from_product(
+            [range(N_station), range(N_antenna_per_station)], names=["STATION_ID", "ANTENNA_ID"]
+        )
+        return instrument.InstrumentGeometry(20 * rng.randn(len(ant_idx), 3), ant_idx)
+
+    @pytest.mark.parametrize(
+        "beam_config, station_grouped",
+        [
+            ([(0, 0), (1, 1), (2, 2)], True),
+            ([(0, 0), (0, 1), (1, 1), (2, 2)], False),  # station 0 feeds 2 beams
+        ],
+    )
+    def test_matches_dense_weights(self, XYZ, beam_config, station_grouped):
+        wl = 2.0
+        direction = {
+            0: coord.SkyCoord(10 * u.deg, 40 * u.deg),
+            1: coord.SkyCoord(12 * u.deg, 41 * u.deg),
+            2: coord.SkyCoord(11 * u.deg, 39 * u.deg),
+        }
+        mb = beamforming.MatchedBeamformerBlock([(s, b, direction[b]) for (s, b) in beam_config])
+        W = mb(XYZ, wl)
+
+        station_id = XYZ.index[0].get_level_values("STATION_ID")
+        xyz = (XYZ.data - XYZ.data.mean(axis=0)) / wl
+        W_ref = np.zeros((len(xyz), len(direction)), dtype=complex)
+        for s, b in beam_config:
+            f_dir = direction[b].transform_to("icrs").cartesian.xyz.value
+            mask = station_id == s
+            W_ref[mask, b] = np.exp(-1j * 2 * np.pi * (xyz[mask] @ f_dir))
+
+        # Station-grouped weights are kept sparse irrespective of the sparsity ratio.
+        assert sparse.isspmatrix_csr(W.data) == station_grouped
+        W_dense = W.data.toarray() if station_grouped else W.data
+        assert np.allclose(W_dense, W_ref)
+
+        X = np.random.RandomState(1).randn(len(xyz), 5)
+        assert np.allclose(W.data.T @ X, W_ref.T @ X)
@@ -0,0 +1,58 @@
+# #############################################################################
+# test_cache.py
+# =============
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import os
+
+import numpy as np
+
+from pypeline.util.cache import DiskCache, digest
+
+
+def test_digest():
+    x = np.arange(6.0)
+    assert digest(x, 2.0) == digest(x.copy(), 2.0)
+    assert digest(x, 2.0) != digest(x.reshape(2, 3), 2.0)
+    assert digest(x, 2.0) != digest(x.astype(np.float32), 2.0)
+    assert digest(x, 2.0) != digest(x, 2.5)
+
+
+class TestDiskCache:
+    """
+    Test :py:class:`~pypeline.util.cache.DiskCache`.
+    """
+
+    def test_get_put(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=10**6)
+        x = np.arange(12.0).reshape(3, 4)
+        assert cache.get("x") is None
+        assert np.array_equal(cache.put("x", x), x)
+        assert np.array_equal(DiskCache(tmp_path, max_bytes=10**6).get("x"), x)
+
+    def test_allocate_commit(self, tmp_path):
+        cache = DiskCache(tmp_path, max_bytes=10**6)
+        x = cache.allocate("x", (3, 4), np.complex64)
+        x[:2], x[2:] = 1, 2j
+        assert cache.get("x") is None  # not committed yet
+
+        x = cache.commit("x", x)
+        assert np.array_equal(cache.get("x"), x) and (x.dtype == np.complex64)
+        assert cache.allocate("y", (10**6,), np.float64) is None
+
+    def test_lru_eviction(self, tmp_path):
+        x = np.zeros(100)  # 800 bytes each: 3 entries fit in the budget with .npy headers.
+        cache = DiskCache(tmp_path, max_bytes=3 * 1000)
+        for i, key in enumerate("abc"):
+            cache.put(key, x)
+            os.utime(tmp_path / f"{key}.npy", (i, i))
+        cache.get("a")  # `b` is now least-recently used
+
+        cache.put("d", x)
+        assert sorted(f.stem for f in tmp_path.glob("*.npy")) == ["a", "c", "d"]
+
+        # entries larger than the budget are returned as-is.
+        y = np.zeros(1000)
+        assert cache.put("y", y) is y
+        assert cache.get("y") is None
@@ -0,0 +1,43 @@
+# #############################################################################
+# test_checkpoint.py
+# ==================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import numpy as np
+
+from pypeline.util.checkpoint import Checkpoint
+
+
+class TestCheckpoint:
+    """
+    Test :py:class:`~pypeline.util.checkpoint.Checkpoint`.
+    """
+
+    def test_empty(self, tmp_path):
+        cursor, arrays = Checkpoint(tmp_path).load()
+        assert (cursor == 0) and (arrays == dict())
+
+    def test_save_load(self, tmp_path):
+        x, k = np.zeros((3, 4)), np.arange(5.0)
+        ckpt = Checkpoint(tmp_path)
+        ckpt.save(1, dict(x=x, k=k, none=None), volatile=["x"])
+        x += 1  # volatile arrays are copied before save() returns.
+        ckpt.save(2, dict(x=x, k=k), volatile=["x"], block=True)
+
+        cursor, arrays = Checkpoint(tmp_path).load()
+        assert cursor == 2
+        assert np.array_equal(arrays["x"], x) and np.array_equal(arrays["k"], k)
+        assert sorted(f.name for f in tmp_path.glob("*.npy")) == ["k.0.npy", "x.1.npy"]
+
+    def test_interrupted_write_is_ignored(self, tmp_path):
+        ckpt = Checkpoint(tmp_path)
+        ckpt.save(1, dict(x=np.ones(3)), block=True)
+        np.save(tmp_path / "x.7.npy", np.zeros(3))  # partial write of a later checkpoint.
+
+        cursor, arrays = Checkpoint(tmp_path).load()
+        assert (cursor == 1) and np.array_equal(arrays["x"], np.ones(3))
+
+        ckpt = Checkpoint(tmp_path)
+        ckpt.save(2, dict(x=np.full(3, 2.0)), block=True)
+        assert sorted(f.name for f in tmp_path.glob("*.npy")) == ["x.1.npy"]
@@ -0,0 +1,75 @@
+# #############################################################################
+# test_data_processor.py
+# ======================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pypeline.phased_array.bluebild.data_processor as data_processor
+import pypeline.phased_array.bluebild.gram as gram
+import pypeline.phased_array.data_gen.statistics as vis
+
+
+class TestIntensityFieldDataProcessorBlock:
+    """
+    Test
+    :py:class:`~pypeline.phased_array.bluebild.data_processor.IntensityFieldDataProcessorBlock`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        B, N_beam = 4, 7
+
+        A = rng.randn(B, N_beam, N_beam) + 1j * rng.randn(B, N_beam, N_beam)
+        S = A @ A.conj().transpose(0, 2, 1)
+        S[1, 2, :] = S[1, :, 2] = 0  # broken beam
+        S[2, [0, 5], :] = S[2, :, [0, 5]] = 0
+        S[3] = 0  # unusable
+
+        A = rng.randn(B, N_beam, N_beam) + 1j * rng.randn(B, N_beam, N_beam)
+        G = A @ A.conj().transpose(0, 2, 1) + N_beam * np.eye(N_beam)
+        return S, G
+
+    @pytest.mark.parametrize("N_eig", [2, 5, 9])
+    def test_stack_matches_per_snapshot(self, data, N_eig):
+        S, G = data
+        I_dp = data_processor.IntensityFieldDataProcessorBlock(N_eig, cluster_centroids=[0, 1, 5])
+        D, V, cluster_idx = I_dp(S, G)
+
+        N_beam = S.shape[1]
+        beam_idx = pd.Index(range(N_beam), name="BEAM_ID")
+        for b in range(len(S)):
+            S_b = vis.VisibilityMatrix(S[b], beam_idx)
+            G_b = gram.GramMatrix(G[b], beam_idx)
+            D_b, V_b, c_b = I_dp(S_b, G_b)
+            assert np.allclose(D[b], D_b)
+            assert np.array_equal(cluster_idx[b], c_b)
+            # Eigenvectors are unique up to a phase.
+            assert np.allclose((V[b] * D[b]) @ V[b].conj().T, (V_b * D_b) @ V_b.conj().T)
+            assert np.allclose(np.abs(V[b].conj().T @ G[b] @ V_b), np.diag(D_b > 0))
+
+    @pytest.mark.parametrize("solver", ["subset", "lobpcg"])
+    def test_partial_solver_matches_exact(self, solver):
+        rng = np.random.RandomState(1)
+        N_time, N_beam, N_eig = 3, 40, 4
+        beam_idx = pd.Index(range(N_beam), name="BEAM_ID")
+
+        A = rng.randn(N_beam, N_beam) + 1j * rng.randn(N_beam, N_beam)
+        G = gram.GramMatrix(A @ A.conj().T + N_beam * np.eye(N_beam), beam_idx)
+        sky = rng.randn(N_beam, N_eig) + 1j * rng.randn(N_beam, N_eig)
+
+        exact = data_processor.IntensityFieldDataProcessorBlock(N_eig, [0, 1])
+        partial = data_processor.IntensityFieldDataProcessorBlock(N_eig, [0, 1], solver, tol=1e-9)
+        for t in range(N_time):  # slowly-varying sky: LOBPCG is warm-started
+            A = sky + 0.05 * t * rng.randn(N_beam, N_eig)
+            S = (A * [40, 20, 10, 5]) @ A.conj().T + 0.1 * np.eye(N_beam)
+            S = vis.VisibilityMatrix(S, beam_idx)
+
+            D, V, _ = exact(S, G)
+            D_p, V_p, _ = partial(S, G)
+            assert np.allclose(D_p, D, rtol=1e-6)
+            assert np.allclose(np.abs(V_p.conj().T @ G.data @ V), np.eye(N_eig), atol=1e-4)
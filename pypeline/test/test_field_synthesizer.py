@@ -0,0 +1,308 @@
+# #############################################################################
+# test_field_synthesizer.py
+# =========================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import numpy as np
+import pytest
+import scipy.sparse as sparse
+
+import pypeline.phased_array.bluebild.field_synthesizer.fourier_domain as fsd
+import pypeline.phased_array.bluebild.field_synthesizer.spatial_domain as ssd
+import pypeline.phased_array.instrument as instrument
+
+
+def _reference_stat(wl, grid, V, XYZ, W):
+    XYZ = XYZ - XYZ.mean(axis=0)
+    P = np.exp((1j * 2 * np.pi / wl) * np.tensordot(XYZ, grid, axes=1))
+    E = np.tensordot(V.T, np.tensordot(W.T, P, axes=1), axes=1)
+    return np.abs(E) ** 2
+
+
+class TestSpatialFieldSynthesizerBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.field_synthesizer.spatial_domain.SpatialFieldSynthesizerBlock`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station, N_eig = 6, 4, 3
+        N_antenna = N_station * N_antenna_per_station
+        N_height, N_width = 11, 13
+
+        wl = 2.0
+        XYZ = 50 * rng.randn(N_antenna, 3)
+        row = np.arange(N_antenna)
+        col = row // N_antenna_per_station
+        w = np.exp(1j * 2 * np.pi * rng.rand(N_antenna))
+        W = sparse.csr_matrix((w, (row, col)), shape=(N_antenna, N_station))
+        V = rng.randn(N_station, N_eig) + 1j * rng.randn(N_station, N_eig)
+
+        grid = np.stack(
+            [0.02 * rng.randn(N_height, N_width), 0.02 * rng.randn(N_height, N_width)]
+            + [np.ones((N_height, N_width))],
+            axis=0,
+        )
+        grid /= np.linalg.norm(grid, axis=0)
+        return wl, grid, V, XYZ, W
+
+    def test_fail_unknown_backend(self, data):
+        wl, grid, *_ = data
+        with pytest.raises(ValueError):
+            ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="tpu")
+
+    @pytest.mark.parametrize("sparse_W", [True, False])
+    def test_cpu_backend_matches_reference(self, data, sparse_W, monkeypatch):
+        """
+        Tiled CPU evaluation matches a direct evaluation on the full grid.
+        """
+        wl, grid, V, XYZ, W = data
+        W = W if sparse_W else W.toarray()
+        monkeypatch.setattr(ssd, "_tile_size", lambda *args: 17)  # force partial tiles
+
+        synth = ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="cpu")
+        stat = synth(V, XYZ, W)
+
+        W_dense = W.toarray() if sparse_W else W
+        assert stat.shape == (V.shape[1],) + grid.shape[1:]
+        assert np.allclose(stat, _reference_stat(wl, grid, V, XYZ, W_dense))
+
+    @pytest.mark.parametrize("contraction", ["PW", "VW"])
+    def test_contraction_plans_agree(self, data, contraction):
+        """
+        Both contraction orders give the same statistics.
+        """
+        wl, grid, V, XYZ, W = data
+        synth = ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="cpu", contraction=contraction)
+        assert np.allclose(synth(V, XYZ, W), _reference_stat(wl, grid, V, XYZ, W.toarray()))
+
+    def test_contraction_plan_prefers_cheapest(self):
+        # dense (N_antenna, N_beam) = (200, 24), N_eig = 4: folding V into W is cheaper.
+        assert ssd._contraction_plan(200, 24, 4, nnz=200 * 24) == "VW"
+        # one beamweight per antenna: applying W first is cheaper.
+        assert ssd._contraction_plan(200, 24, 4, nnz=200) == "PW"
+
+    def test_threaded_matches_serial(self, data, monkeypatch):
+        """
+        Tile-parallel evaluation gives the same statistics as serial evaluation.
+        """
+        wl, grid, V, XYZ, W = data
+        monkeypatch.setattr(ssd, "_tile_size", lambda *args: 10)
+
+        serial = ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="cpu", N_thread=1)
+        threaded = ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="cpu", N_thread=4)
+        assert np.allclose(serial(V, XYZ, W), threaded(V, XYZ, W))
+
+    @pytest.mark.parametrize("N_batch", [None, 2])
+    def test_accumulate_batch_matches_snapshots(self, data, monkeypatch, N_batch):
+        """
+        Batched accumulation matches per-snapshot synthesis followed by a linear combination.
+        """
+        wl, grid, V, XYZ, W = data
+        monkeypatch.setattr(ssd, "_tile_size", lambda *args: 23)
+        if N_batch is not None:  # split snapshots in uneven chunks
+            monkeypatch.setattr(ssd, "_batch_size", lambda *args: N_batch)
+        rng = np.random.RandomState(1)
+
+        N_time, N_eig = 3, V.shape[1]
+        V_all = [V * (t + 1) for t in range(N_time)]
+        XYZ_all = [XYZ + rng.randn(*XYZ.shape) for t in range(N_time)]
+        W_all = [W] * N_time
+        C = rng.rand(2, N_time * N_eig)
+
+        synth = ssd.SpatialFieldSynthesizerBlock(wl, grid, backend="cpu")
+        stat = synth.accumulate_batch(V_all, XYZ_all, W_all, C)
+
+        stat_ref = sum(
+            np.tensordot(C[:, t * N_eig : (t + 1) * N_eig], synth(V_all[t], XYZ_all[t], W), axes=1)
+            for t in range(N_time)
+        )
+        assert np.allclose(stat, stat_ref)
+
+    def test_batch_size_bounds_working_set(self):
+        cache_size, N_tile_min = ssd._cache_budget()
+        N_batch = ssd._batch_size(500, 8, 12, 10**6, itemsize=8)
+        assert 1 <= N_batch < 10**6
+        # A tile of N_tile_min pixels over the stacked snapshots fits in cache.
+        assert 8 * N_tile_min * (3 * N_batch * 500 + 2 * 8 + 3 * N_batch * 12) <= cache_size
+        assert ssd._batch_size(500, 8, 12, 3, itemsize=8) <= 3
+
+
+def _reference_kernel(synth, XYZ):
+    # Single-shot kernel: all antennas exponentiated, windowed and FFS-transformed at once.
+    N_samples = fsd.fftpack.next_fast_len(synth._NFS)
+    lon_smpl = fsd.pyffs.ffs_sample(synth._T, synth._NFS, synth._Tc, N_samples)
+    lon_smpl = lon_smpl[0] if isinstance(lon_smpl, tuple) else lon_smpl
+    pix_smpl = fsd.transform.pol2cart(1, synth._grid_colat, lon_smpl.reshape(1, -1))
+    XYZ_c = XYZ - XYZ.mean(axis=0)
+    window = fsd.func.Tukey(synth._T, synth._Tc, synth._alpha_window)
+    k_smpl = np.exp((1j * 2 * np.pi / synth._wl) * np.tensordot(XYZ_c, pix_smpl, axes=1))
+    k_smpl *= window(lon_smpl)
+    return fsd.pyffs.ffs(k_smpl, synth._T, synth._Tc, synth._NFS, axis=2)
+
+
+def _z_rot(theta):
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+
+class TestFourierFieldSynthesizerBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.field_synthesizer.fourier_domain.FourierFieldSynthesizerBlock`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station, N_eig = 6, 4, 3
+        N_antenna = N_station * N_antenna_per_station
+
+        XYZ = 50 * rng.randn(N_antenna, 3)
+        row = np.arange(N_antenna)
+        col = row // N_antenna_per_station
+        w = np.exp(1j * 2 * np.pi * rng.rand(N_antenna))
+        W = sparse.csr_matrix((w, (row, col)), shape=(N_antenna, N_station))
+        V = rng.randn(N_station, N_eig) + 1j * rng.randn(N_station, N_eig)
+
+        kwargs = dict(
+            wl=2.0,
+            grid_colat=np.linspace(0.1, 0.2, 8).reshape(-1, 1),
+            grid_lon=np.linspace(-0.05, 0.05, 9).reshape(1, -1),
+            N_FS=301,
+            T=np.deg2rad(9),
+            R=np.eye(3),
+        )
+        return kwargs, V, XYZ, W
+
+    @pytest.mark.parametrize("N_block", [1, 5, 1000])
+    def test_blocked_kernel_matches_single_shot(self, data, N_block, monkeypatch):
+        kwargs, _, XYZ, _ = data
+        monkeypatch.setattr(fsd, "_kernel_block_size", lambda *args: N_block)
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs)
+        assert np.allclose(synth._build_kernel(XYZ), _reference_kernel(synth, XYZ))
+
+    @pytest.mark.parametrize("N_thread", [2, 3])
+    def test_threaded_kernel_matches_single_shot(self, data, N_thread, monkeypatch):
+        kwargs, _, XYZ, _ = data
+        monkeypatch.setattr(fsd, "_kernel_block_size", lambda *args: 5)
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs, N_thread=N_thread)
+        assert np.allclose(synth._build_kernel(XYZ), _reference_kernel(synth, XYZ))
+
+    def test_kernel_block_size(self, monkeypatch):
+        section = fsd.pypeline.config["phased_array.bluebild.field_synthesizer"]
+        monkeypatch.setitem(section, "kernel_block_bytes", "1")
+        assert fsd._kernel_block_size(10, 100, np.complex128) == 1
+
+        N_byte = 10 * 100 * (8 + 3 * 16)  # per-antenna working set
+        monkeypatch.setitem(section, "kernel_block_bytes", str(8 * N_byte))
+        assert fsd._kernel_block_size(10, 100, np.complex128) == 8
+        assert fsd._kernel_block_size(10, 100, np.complex128, N_thread=4) == 2
+
+    def test_kernel_cache(self, data, tmp_path, monkeypatch):
+        """
+        Cached kernels are bit-identical to freshly built ones, and skip kernel generation.
+        """
+        kwargs, V, XYZ, W = data
+        FSk = fsd.FourierFieldSynthesizerBlock(**kwargs)._build_kernel(XYZ)
+
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs, kernel_cache=tmp_path)
+        FSk_miss = synth._build_kernel(XYZ)
+        assert isinstance(FSk_miss, np.memmap) and np.array_equal(FSk_miss, FSk)
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("kernel regenerated despite cache hit.")
+
+        monkeypatch.setattr(fsd, "_kernel_block", fail)
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs, kernel_cache=tmp_path)
+        FSk_hit = synth._build_kernel(XYZ)
+        assert np.array_equal(FSk_hit, FSk)
+        stat = synth(V, XYZ, W)
+        monkeypatch.undo()
+
+        assert np.array_equal(stat, fsd.FourierFieldSynthesizerBlock(**kwargs)(V, XYZ, W))
+
+        # other parameters/geometries miss the cache.
+        kwargs["wl"] = 3.0
+        fsd.FourierFieldSynthesizerBlock(**kwargs, kernel_cache=tmp_path)._build_kernel(XYZ)
+        fsd.FourierFieldSynthesizerBlock(**kwargs, kernel_cache=tmp_path)._build_kernel(XYZ + 1)
+        assert len(list(tmp_path.glob("*.npy"))) == 3
+
+    @pytest.fixture
+    def rotating_XYZ(self, data):
+        # Earth rotation: 0.5 deg per timestep, such that kernels are regenerated every few steps.
+        _, _, XYZ, _ = data
+        return np.stack([XYZ @ _z_rot(np.deg2rad(0.5 * t)).T for t in range(30)])
+
+    def test_scheduled_kernels_match_unscheduled(self, data, rotating_XYZ):
+        kwargs, V, _, W = data
+        ref = fsd.FourierFieldSynthesizerBlock(**kwargs)
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs)
+        epoch_idx = synth.schedule_kernels(rotating_XYZ)
+        assert len(epoch_idx) > 2
+
+        regen_idx = []
+        for t, XYZ in enumerate(rotating_XYZ):
+            FSk = ref._FSk
+            stat_ref = ref(V, XYZ, W)
+            if ref._FSk is not FSk:
+                regen_idx.append(t)
+
+            stat = synth(V, XYZ, W)
+            assert np.allclose(stat, stat_ref)
+            assert np.allclose(synth.synthesize(stat), ref.synthesize(stat_ref))
+        assert np.array_equal(regen_idx, epoch_idx)
+
+    def test_scheduled_kernels_skip_ahead(self, data, rotating_XYZ):
+        kwargs, V, _, W = data
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs)
+        epoch_idx = synth.schedule_kernels(rotating_XYZ)
+
+        synth(V, rotating_XYZ[0], W)
+        _, stale, cancel = synth._pending  # kernel of epoch 1
+
+        t = epoch_idx[2] + 1
+        stat = synth(V, rotating_XYZ[t], W)
+        assert cancel.is_set()  # stale kernel is aborted between antenna blocks.
+        assert stale.cancelled() or (stale.exception(timeout=10) is None)
+        assert (synth._epoch == 2) and (synth._pending[0] == 3)
+
+        ref = fsd.FourierFieldSynthesizerBlock(**kwargs)
+        ref(V, rotating_XYZ[epoch_idx[2]], W)
+        assert np.allclose(stat, ref(V, rotating_XYZ[t], W))
+
+    def test_cancelled_kernel(self, data, tmp_path, monkeypatch):
+        kwargs, _, XYZ, _ = data
+        monkeypatch.setattr(fsd, "_kernel_block_size", lambda *args: 5)
+        cancel = fsd.threading.Event()
+        cancel.set()
+
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs, kernel_cache=tmp_path)
+        assert synth._build_kernel(XYZ, cancel) is None
+        assert list(tmp_path.iterdir()) == []  # partial cache entry discarded.
+
+    @pytest.mark.parametrize("theta", np.deg2rad([-0.05, 0, 0.3, 2, 10]))
+    def test_shift_estimators_agree(self, data, theta):
+        """
+        Both phase-shift estimators recover the rotation angle of a real (LOFAR) layout.
+        """
+        kwargs, *_ = data
+        XYZk = instrument.LofarBlock(N_station=24)._layout.loc[:, ["X", "Y", "Z"]].values
+        XYZ = XYZk @ _z_rot(theta).T
+
+        for estimator in ["reference", "lstsq"]:
+            synth = fsd.FourierFieldSynthesizerBlock(**kwargs, shift_estimator=estimator)
+            assert np.isclose(synth._phase_shift(XYZ, XYZk=XYZk), theta, rtol=0, atol=1e-6)
+
+    def test_shift_reference_antennas_follow_layout(self, data):
+        kwargs, _, XYZ, _ = data
+        synth = fsd.FourierFieldSynthesizerBlock(**kwargs, shift_estimator="reference")
+        synth._phase_shift(XYZ, XYZk=XYZ)
+        idx = synth._shift_idx[1]
+
+        XYZ_other = XYZ[::-1].copy()  # same number of antennas, different layout.
+        synth._phase_shift(XYZ_other, XYZk=XYZ_other)
+        assert synth._shift_idx[0] is XYZ_other
+        assert np.array_equal(synth._shift_idx[1], len(XYZ) - 1 - idx)
@@ -0,0 +1,132 @@
+# #############################################################################
+# test_gram.py
+# ============
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.linalg as linalg
+import scipy.sparse as sparse
+
+import pypeline.phased_array.beamforming as beamforming
+import pypeline.phased_array.bluebild.gram as gram
+import pypeline.phased_array.instrument as instrument
+
+
+class TestProjectGram:
+    """
+    Test :py:func:`~pypeline.phased_array.bluebild.gram._project_gram`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station = 5, 7
+        N_antenna = N_station * N_antenna_per_station
+
+        XYZ = 20 * rng.randn(N_antenna, 3)
+        row = np.arange(N_antenna)
+        col = row // N_antenna_per_station
+        w = np.exp(1j * 2 * np.pi * rng.rand(N_antenna))
+        W = sparse.csr_matrix((w, (row, col)), shape=(N_antenna, N_station))
+        return XYZ, W, 3.0
+
+    @pytest.mark.parametrize("N_tile", [1, 8, 35, 100])
+    @pytest.mark.parametrize("sparse_W", [True, False])
+    def test_matches_dense_gram(self, data, N_tile, sparse_W):
+        XYZ, W, wl = data
+        W = W if sparse_W else W.toarray()
+
+        baseline = linalg.norm(XYZ[:, np.newaxis, :] - XYZ[np.newaxis, :, :], axis=-1)
+        G_1 = (4 * np.pi) * np.sinc((2 / wl) * baseline)
+        W_dense = W.toarray() if sparse_W else W
+        G_2 = W_dense.conj().T @ G_1 @ W_dense
+
+        assert np.allclose(gram._project_gram(XYZ, W, wl, N_tile), G_2)
+
+
+class TestGramBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.gram.GramBlock`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station = 4, 6
+        N_antenna = N_station * N_antenna_per_station
+
+        ant_idx = pd.MultiIndex.from_product(
+            [range(N_station), range(N_antenna_per_station)], names=["STATION_ID", "ANTENNA_ID"]
+        )
+        beam_idx = pd.Index(range(N_station), name="BEAM_ID")
+        XYZ = 20 * rng.randn(N_antenna, 3)
+
+        def weights():
+            w = np.exp(1j * 2 * np.pi * rng.rand(N_antenna))
+            row = np.arange(N_antenna)
+            W = sparse.csr_matrix((w, (row, row // N_antenna_per_station)))
+            return beamforming.BeamWeights(W, ant_idx, beam_idx)
+
+        return XYZ, ant_idx, weights
+
+    def test_cache_reused_under_rotation(self, data):
+        XYZ, ant_idx, weights = data
+        R = linalg.expm(np.cross(np.eye(3), [0.1, -0.3, 0.7]))  # rotation matrix
+        XYZ_1 = instrument.InstrumentGeometry(XYZ, ant_idx)
+        XYZ_2 = instrument.InstrumentGeometry(XYZ @ R.T + 5, ant_idx)
+
+        gr = gram.GramBlock(cache=True)
+        gr(XYZ_1, weights(), 3.0)
+        W = weights()
+        G = gr(XYZ_2, W, 3.0)
+        assert len(gr._cache) == 1
+        assert np.allclose(G.data, gram.GramBlock(cache=False)(XYZ_2, W, 3.0).data)
+
+        gr(XYZ_2, W, 2.0)  # new wavelength
+        gr(instrument.InstrumentGeometry(2 * XYZ, ant_idx), W, 3.0)  # new layout
+        assert len(gr._cache) == 3
+
+    def test_cache_missed_under_deformation(self, data):
+        XYZ, ant_idx, weights = data
+        wl = 3.0
+        XYZ_2 = XYZ.copy()
+        XYZ_2[0, 0] += 0.01 * wl  # single antenna moved by a fraction of a wavelength
+        XYZ_1 = instrument.InstrumentGeometry(XYZ, ant_idx)
+        XYZ_2 = instrument.InstrumentGeometry(XYZ_2, ant_idx)
+
+        gr = gram.GramBlock(cache=True)
+        gr(XYZ_1, weights(), wl)
+        W = weights()
+        G = gr(XYZ_2, W, wl)
+        assert len(gr._cache) == 2
+        assert np.allclose(G.data, gram.GramBlock()(XYZ_2, W, wl).data, rtol=0, atol=1e-12)
+
+    def test_cache_missed_for_same_centroid_distances(self, data):
+        XYZ, ant_idx, weights = data
+        N_half = len(XYZ) // 2
+        XYZ_1 = np.r_[XYZ[:N_half], -XYZ[:N_half]]  # centroid at 0
+        XYZ_2 = XYZ_1.copy()
+        XYZ_2[[0, N_half]] = XYZ_2[[N_half, 0]]  # same distances to centroid, other baselines
+        XYZ_1 = instrument.InstrumentGeometry(XYZ_1, ant_idx)
+        XYZ_2 = instrument.InstrumentGeometry(XYZ_2, ant_idx)
+
+        gr = gram.GramBlock(cache=True)
+        gr(XYZ_1, weights(), 3.0)
+        W = weights()
+        G = gr(XYZ_2, W, 3.0)
+        assert len(gr._cache) == 2
+        assert np.allclose(G.data, gram.GramBlock()(XYZ_2, W, 3.0).data, rtol=0, atol=1e-12)
+
+    @pytest.mark.parametrize("cache", [True, False])
+    def test_stack_matches_per_wavelength(self, data, cache):
+        XYZ, ant_idx, weights = data
+        XYZ = instrument.InstrumentGeometry(XYZ, ant_idx)
+        W, wl = weights(), np.r_[2.0, 3.0, 5.0]
+
+        G = gram.GramBlock(cache=cache)(XYZ, W, wl)
+        assert G.shape == (len(wl),) + (W.shape[1],) * 2
+        for k in range(len(wl)):
+            assert np.allclose(G[k], gram.GramBlock(cache=False)(XYZ, W, wl[k]).data)
@@ -0,0 +1,194 @@
+# #############################################################################
+# test_imager.py
+# ==============
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import numpy as np
+import pytest
+import scipy.sparse as sparse
+
+import pypeline.phased_array.bluebild.field_synthesizer.spatial_domain as ssd
+import pypeline.phased_array.bluebild.imager as bim
+import pypeline.phased_array.bluebild.imager.fourier_domain as ifd
+import pypeline.phased_array.bluebild.imager.spatial_domain as isd
+
+
+@pytest.mark.parametrize("axis", [0, 1, -1])
+@pytest.mark.parametrize("dtype", [np.float32, np.complex128])
+def test_cluster_layers(axis, dtype):
+    rng = np.random.RandomState(0)
+    x = rng.randn(4, 5, 6).astype(dtype)
+    idx = rng.randint(0, 3, size=x.shape[axis])
+
+    y = np.moveaxis(np.zeros_like(np.moveaxis(x, axis, 0)[:3]), 0, axis)
+    for k, n in enumerate(idx):
+        np.moveaxis(y, axis, 0)[n] += np.moveaxis(x, axis, 0)[k]
+    assert np.allclose(bim.cluster_layers(x, idx, N=3, axis=axis), y)
+
+    out = np.ones(y.shape, dtype=dtype)
+    assert bim.cluster_layers(x, idx, N=3, axis=axis, out=out) is out
+    assert np.allclose(out, y + 1)
+
+    w = rng.rand(len(idx))
+    x_w = x * np.reshape(w, [-1 if (ax == axis % x.ndim) else 1 for ax in range(x.ndim)])
+    assert np.allclose(
+        bim.cluster_layers(x, idx, N=3, axis=axis, weights=w),
+        bim.cluster_layers(x_w, idx, N=3, axis=axis),
+    )
+
+
+class TestSpatialIMFSBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.imager.spatial_domain.Spatial_IMFS_Block`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station, N_eig, N_level = 5, 3, 4, 2
+        N_antenna = N_station * N_antenna_per_station
+
+        grid = np.stack([0.02 * rng.randn(7, 9), 0.02 * rng.randn(7, 9), np.ones((7, 9))])
+        row = np.arange(N_antenna)
+        W = sparse.csr_matrix((np.ones(N_antenna), (row, row // N_antenna_per_station)))
+
+        snapshots = []
+        for _ in range(5):
+            D = rng.rand(N_eig)
+            V = rng.randn(N_station, N_eig) + 1j * rng.randn(N_station, N_eig)
+            XYZ = 20 * rng.randn(N_antenna, 3)
+            c_idx = rng.randint(0, N_level, size=N_eig)
+            snapshots.append((D, V, XYZ, W, c_idx))
+        return grid, N_level, snapshots
+
+    def test_resume_from_checkpoint(self, data, tmp_path):
+        grid, N_level, snapshots = data
+        I_ref = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+        for snapshot in snapshots:
+            I_ref(*snapshot)
+
+        I_mfs = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+        I_mfs.set_checkpoint(str(tmp_path), N_step=2)
+        for snapshot in snapshots[:3]:  # "crash" after the 3rd snapshot: last checkpoint at 2.
+            I_mfs(*snapshot)
+        I_mfs._checkpoint.wait()
+
+        I_mfs = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+        t_start = I_mfs.resume(str(tmp_path))
+        assert t_start == 2
+        for snapshot in snapshots[t_start:]:
+            I_mfs(*snapshot)
+        assert np.allclose(I_mfs._statistics, I_ref._statistics)
+
+    @pytest.mark.parametrize("return_snapshot", [True, False])
+    def test_batch_matches_snapshots(self, data, return_snapshot):
+        grid, N_level, snapshots = data
+        I_ref = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+        I_mfs = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+        I_mfs(*snapshots[0])
+
+        stat = I_mfs.process_batch(*zip(*snapshots[1:]), return_snapshot=return_snapshot)
+        I_ref(*snapshots[0])
+        stat_ref = sum(I_ref(*snapshot, return_snapshot=True) for snapshot in snapshots[1:])
+        if return_snapshot:
+            assert np.allclose(stat, stat_ref)
+        else:
+            assert stat is None
+        assert np.allclose(I_mfs._statistics, I_ref._statistics)
+        assert I_mfs._cursor == I_ref._cursor == len(snapshots)
+
+    @pytest.mark.parametrize("return_snapshot", [True, False])
+    def test_integrates_snapshots(self, return_snapshot, monkeypatch):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station, N_eig, N_level = 5, 3, 4, 2
+        N_antenna = N_station * N_antenna_per_station
+
+        grid = np.stack([0.02 * rng.randn(7, 9), 0.02 * rng.randn(7, 9), np.ones((7, 9))])
+        row = np.arange(N_antenna)
+        W = sparse.csr_matrix((np.ones(N_antenna), (row, row // N_antenna_per_station)))
+        monkeypatch.setattr(ssd, "_tile_size", lambda *args: 10)  # force partial tiles
+        I_mfs = isd.Spatial_IMFS_Block(2.0, grid, N_level, backend="cpu")
+
+        stat_sum = 0
+        for _ in range(3):
+            D = rng.rand(N_eig)
+            V = rng.randn(N_station, N_eig) + 1j * rng.randn(N_station, N_eig)
+            XYZ = 20 * rng.randn(N_antenna, 3)
+            c_idx = rng.randint(0, N_level, size=N_eig)
+
+            stat_std = I_mfs._synthesizer(V, XYZ, W)
+            stat = np.stack([stat_std, stat_std * D.reshape(-1, 1, 1)])
+            stat_ref = bim.cluster_layers(stat, c_idx, N=N_level, axis=1)
+            stat_sum += stat_ref
+            if return_snapshot:
+                assert np.allclose(I_mfs(D, V, XYZ, W, c_idx, return_snapshot=True), stat_ref)
+            else:
+                assert I_mfs(D, V, XYZ, W, c_idx) is None
+
+        assert np.allclose(I_mfs._statistics, stat_sum)
+
+
+class TestFourierIMFSBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.imager.fourier_domain.Fourier_IMFS_Block`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station, N_eig, N_level = 5, 3, 4, 2
+        N_antenna = N_station * N_antenna_per_station
+
+        row = np.arange(N_antenna)
+        W = sparse.csr_matrix((np.ones(N_antenna), (row, row // N_antenna_per_station)))
+        XYZ = 50 * rng.randn(N_antenna, 3)
+
+        snapshots = []
+        for t in range(12):  # Earth rotation: 0.5 deg per timestep.
+            c, s = np.cos(np.deg2rad(0.5 * t)), np.sin(np.deg2rad(0.5 * t))
+            XYZ_t = XYZ @ np.array([[c, s, 0], [-s, c, 0], [0, 0, 1]])
+            D = rng.rand(N_eig)
+            V = rng.randn(N_station, N_eig) + 1j * rng.randn(N_station, N_eig)
+            c_idx = rng.randint(0, N_level, size=N_eig)
+            snapshots.append((D, V, XYZ_t, W, c_idx))
+
+        kwargs = dict(
+            wl=2.0,
+            grid_colat=np.linspace(0.1, 0.2, 8).reshape(-1, 1),
+            grid_lon=np.linspace(-0.05, 0.05, 9).reshape(1, -1),
+            N_FS=301,
+            T=np.deg2rad(9),
+            R=np.eye(3),
+            N_level=N_level,
+        )
+        return kwargs, snapshots
+
+    @pytest.mark.parametrize("schedule", [False, True])
+    def test_resume_from_checkpoint(self, data, schedule, tmp_path):
+        kwargs, snapshots = data
+        XYZ_all = np.stack([snapshot[2] for snapshot in snapshots])
+
+        I_ref = ifd.Fourier_IMFS_Block(**kwargs)
+        for snapshot in snapshots:
+            I_ref(*snapshot)
+
+        I_mfs = ifd.Fourier_IMFS_Block(**kwargs)
+        if schedule:
+            I_mfs.schedule_kernels(XYZ_all)
+        I_mfs.set_checkpoint(str(tmp_path), N_step=4)
+        for snapshot in snapshots[:10]:  # "crash" after the 10th snapshot: last checkpoint at 8.
+            I_mfs(*snapshot)
+        I_mfs._checkpoint.wait()
+        epoch = I_mfs._synthesizer._epoch
+
+        I_mfs = ifd.Fourier_IMFS_Block(**kwargs)
+        t_start = I_mfs.resume(str(tmp_path))
+        assert t_start == 8
+        if schedule:
+            I_mfs.schedule_kernels(XYZ_all)
+            assert I_mfs._synthesizer._epoch == epoch  # schedule resumes at the restored kernel.
+            assert I_mfs._synthesizer._pending[0] == epoch + 1
+        for snapshot in snapshots[t_start:]:
+            I_mfs(*snapshot)
+        assert np.allclose(I_mfs._statistics, I_ref._statistics)
@@ -0,0 +1,46 @@
+# #############################################################################
+# test_instrument.py
+# ==================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import astropy.time as atime
+import astropy.units as u
+import numpy as np
+import pytest
+
+import pypeline.phased_array.instrument as instrument
+
+
+class TestEarthBoundInstrumentGeometryBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.instrument.EarthBoundInstrumentGeometryBlock`.
+    """
+
+    @pytest.fixture(scope="class")
+    def instr(self):
+        return instrument.LofarBlock(N_station=6)
+
+    @pytest.fixture(scope="class")
+    def times(self):
+        return atime.Time("J2000") + np.arange(4) * (45 * u.min)
+
+    def test_vectorized_matches_per_epoch(self, instr, times):
+        XYZ = instr(times)
+        assert XYZ.shape == (len(times),) + instr(times[0]).shape
+        for t, XYZ_t in zip(times, XYZ):
+            assert np.allclose(XYZ_t, instr(t).data, rtol=0, atol=1e-6)
+
+    def test_linearize_accuracy(self, instr, times):
+        XYZ = instr(times)
+        XYZ_lin = instr(times, linearize=True)
+        assert np.max(np.abs(XYZ_lin - XYZ)) < 0.05  # [m]
+
+    def test_ephemeris_within_tolerance(self, times):
+        instr = instrument.LofarBlock(N_station=6)
+        instr.set_ephemeris(times[0], times[-1], tol=0.5)
+        assert instr.validate_ephemeris(times[:-1] + 10 * u.min) <= 0.5
+
+        XYZ = instr(times)
+        instr.set_ephemeris(None, None)
+        assert np.allclose(XYZ, instr(times), rtol=0, atol=1e-6)  # exact at knots
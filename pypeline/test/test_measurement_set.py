@@ -0,0 +1,229 @@
+# #############################################################################
+# test_measurement_set.py
+# =======================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import threading
+
+import astropy.coordinates as coord
+import astropy.table as tb
+import astropy.units as u
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("casacore.tables")
+
+import pypeline.phased_array.instrument as instrument
+import pypeline.phased_array.measurement_set as measurement_set
+
+
+class _FakeTable:
+    """
+    In-memory MAIN table with the `getcol`/`getcolslice` semantics of
+    :py:class:`~casacore.tables.table`.
+    """
+
+    def __init__(self, columns):
+        self._columns = columns
+
+    def colnames(self):
+        return list(self._columns)
+
+    def sort(self, name):
+        idx = np.argsort(self._columns[name], kind="stable")
+        return _FakeTable({k: v[idx] for (k, v) in self._columns.items()})
+
+    def getcol(self, name, startrow=0, nrow=-1):
+        stop = None if (nrow < 0) else startrow + nrow
+        return self._columns[name][startrow:stop].copy()
+
+    def getcolslice(self, name, blc, trc, inc=(), startrow=0, nrow=-1):
+        # Cell corners are inclusive.
+        inc = list(inc) if (len(inc) > 0) else [1] * len(blc)
+        cell = tuple(slice(b, t + 1, i) for (b, t, i) in zip(blc, trc, inc))
+        return self.getcol(name, startrow, nrow)[(slice(None),) + cell]
+
+
+class _FakeMeasurementSet(measurement_set.MeasurementSet):
+    def __init__(self, dir_name, frequency, XYZ):
+        super().__init__(dir_name)
+        self._channels = tb.QTable(dict(CHANNEL_ID=range(len(frequency)), FREQUENCY=frequency))
+        self._field_center = coord.SkyCoord(ra=0.5 * u.rad, dec=1.0 * u.rad, frame="icrs")
+        self._instrument = instrument.EarthBoundInstrumentGeometryBlock(XYZ)
+
+    @property
+    def instrument(self):
+        return self._instrument
+
+
+def _reference_visibilities(columns, column, beam_id, channel_id):
+    """
+    Per-integration visibility matrices, decoded row by row from full cells.
+
+    Returns
+    -------
+    iterable
+        (t, S) pairs with t [s] the integration midpoint and S (N_channel, N_beam, N_beam)
+        visibility matrices.
+    """
+    slot = {b: i for (i, b) in enumerate(beam_id)}
+    N_beam = len(beam_id)
+    for t in np.unique(columns["TIME"]):
+        rows = columns["TIME"] == t
+        data = np.average(columns[column][rows][:, :, [0, 3]], axis=2)[:, channel_id]
+        flag = np.any(columns["FLAG"][rows][:, :, [0, 3]], axis=2)[:, channel_id]
+        data[flag] = 0
+
+        S = np.zeros((len(channel_id), N_beam, N_beam), dtype=complex)
+        for b_0, b_1, d in zip(columns["ANTENNA1"][rows], columns["ANTENNA2"][rows], data):
+            if (b_0 in slot) and (b_1 in slot) and (b_0 <= b_1):
+                S[:, slot[b_0], slot[b_1]] = d
+        S_diag = np.diagonal(S, axis1=1, axis2=2).copy()
+        S += S.conj().transpose(0, 2, 1)
+        S[:, np.arange(N_beam), np.arange(N_beam)] = S_diag
+        yield t, S
+
+
+@pytest.fixture
+def columns():
+    rng = np.random.default_rng(0)
+    N_channel, N_station = 6, 6
+
+    rows = []
+    for t in 4.9e9 + np.r_[0.0, 10.0, 20.0]:
+        for b_0 in range(N_station):
+            for b_1 in range(N_station):
+                # Rows are stored in both orders for some pairs, and missing for others.
+                if ((b_0 <= b_1) or ((b_0 + b_1) % 3 == 0)) and (rng.uniform() < 0.9):
+                    rows.append((t, b_0, b_1))
+    rows = [rows[_] for _ in rng.permutation(len(rows))]  # MAIN table not sorted by TIME
+    N_row = len(rows)
+
+    t, b_0, b_1 = map(np.array, zip(*rows))
+    shape = (N_row, N_channel, 4)
+    data = rng.standard_normal(shape) + 1j * rng.standard_normal(shape)
+    data[b_0 == b_1] = data[b_0 == b_1].real  # auto-correlations
+    return dict(TIME=t, ANTENNA1=b_0, ANTENNA2=b_1, DATA=data, FLAG=rng.uniform(size=shape) < 0.1)
+
+
+@pytest.fixture
+def ms(columns, tmp_path, monkeypatch):
+    monkeypatch.setattr(measurement_set.ct, "table", lambda *_, **__: _FakeTable(columns))
+
+    # Stations 0 and 3 are not part of the instrument.
+    ant_idx = pd.MultiIndex.from_product([[1, 2, 4, 5], [0, 1]], names=("STATION_ID", "ANTENNA_ID"))
+    xyz = np.random.default_rng(1).standard_normal((len(ant_idx), 3))
+    XYZ = instrument.InstrumentGeometry(xyz=xyz, ant_idx=ant_idx)
+
+    frequency = (1.4e8 + 1e5 * np.arange(6)) * u.Hz
+    return _FakeMeasurementSet(str(tmp_path), frequency, XYZ)
+
+
+class TestMeasurementSet:
+    """
+    Test :py:meth:`~pypeline.phased_array.measurement_set.MeasurementSet.visibilities`.
+    """
+
+    @pytest.mark.parametrize("channel_id", [[3], [4, 1], slice(0, 6, 2)])
+    @pytest.mark.parametrize("stack", [False, True])
+    def test_matches_row_reader(self, ms, columns, channel_id, stack):
+        beam_id = np.r_[1, 2, 4, 5]
+        ch_id = np.arange(6)[channel_id].reshape(-1)
+        f = ms.channels["FREQUENCY"]
+        expected = list(_reference_visibilities(columns, "DATA", beam_id, ch_id))
+
+        stream = ms.visibilities(channel_id, slice(None), "DATA", stack=stack)
+        if not stack:  # regroup channels of each integration
+            triplets = list(stream)
+            stream = []
+            for i in range(0, len(triplets), len(ch_id)):
+                t, freq, S = zip(*triplets[i : i + len(ch_id)])
+                stream.append((t[0], u.Quantity(freq), np.stack([_.data for _ in S])))
+
+        stream = list(stream)
+        assert len(stream) == len(expected)
+        for (t, freq, S), (t_exp, S_exp) in zip(stream, expected):
+            assert np.isclose(t.mjd * 86400, t_exp, rtol=0, atol=1e-3)
+            assert np.array_equal(freq, f[ch_id])
+            assert np.allclose(S, S_exp)
+
+    def test_time_subset(self, ms, columns):
+        beam_id = np.r_[1, 2, 4, 5]
+        _, S_exp = list(_reference_visibilities(columns, "DATA", beam_id, [2]))[1]
+
+        ((_, _, S),) = ms.visibilities([2], 1, "DATA")
+        assert np.array_equal(S.index[0], beam_id)
+        assert np.allclose(S.data, S_exp[0])
+
+    def test_prefetch_resolves_on_caller_thread(self, ms, monkeypatch):
+        thread_id = set()
+        for name in ["_table", "_beam_lookup", "_channel_id"]:
+            f = getattr(measurement_set.MeasurementSet, name)
+
+            def traced(self, *args, _f=f):
+                thread_id.add(threading.get_ident())
+                return _f(self, *args)
+
+            monkeypatch.setattr(measurement_set.MeasurementSet, name, traced)
+
+        expected = list(ms.visibilities([1, 4], slice(None), "DATA"))
+        with ms.visibilities([1, 4], slice(None), "DATA", prefetch_depth=1) as stream:
+            for (t, f, S), (t_exp, f_exp, S_exp) in zip(stream, expected):
+                assert (t == t_exp) and (f == f_exp)
+                assert np.array_equal(S.data, S_exp.data)
+        assert thread_id == {threading.get_ident()}
+
+        with pytest.raises(ValueError):  # raised by the caller, not when iterating.
+            ms.visibilities([1], slice(None), "MODEL_DATA", prefetch_depth=1)
+
+
+class TestCachedMeasurementSet:
+    """
+    Test :py:class:`~pypeline.phased_array.measurement_set.CachedMeasurementSet`.
+    """
+
+    def test_round_trip(self, ms, tmp_path):
+        dir_name = str(tmp_path / "export")
+        measurement_set.export_visibilities(ms, dir_name, "DATA", channel_id=[1, 4])
+        cached = measurement_set.CachedMeasurementSet(dir_name)
+
+        assert np.array_equal(cached.channels["CHANNEL_ID"], [1, 4])
+        assert cached.field_center.separation(ms.field_center).to_value(u.rad) < 1e-12
+        assert cached.instrument._layout.equals(ms.instrument._layout)
+
+        expected = ms.visibilities([1, 4], slice(None), "DATA")
+        for (t, f, S), (t_exp, f_exp, S_exp) in zip(
+            cached.visibilities(slice(None), slice(None), "DATA"), expected
+        ):
+            assert np.isclose((t - t_exp).sec, 0, rtol=0, atol=1e-3)
+            assert f == f_exp
+            assert S.index[0].equals(S_exp.index[0])
+            assert np.array_equal(S.data, S_exp.data)
+
+        # Channels are selected by CHANNEL_ID, not by row of the exported channel table.
+        for ch_id, ch_id_exp in [([4], [4]), ([4, 1], [4, 1]), (slice(0, 3), [1])]:
+            stream = cached.visibilities(ch_id, 1, "DATA")
+            for (_, f, S), (_, f_exp, S_exp) in zip(stream, ms.visibilities(ch_id_exp, 1, "DATA")):
+                assert f == f_exp
+                assert np.array_equal(S.data, S_exp.data)
+            assert len(list(cached.visibilities(ch_id, 1, "DATA"))) == len(ch_id_exp)
+        with pytest.raises(ValueError):  # channel not exported
+            next(cached.visibilities([0], slice(None), "DATA"))
+
+        with pytest.raises(ValueError):  # column not exported
+            next(cached.visibilities(slice(None), slice(None), "MODEL_DATA"))
+        with pytest.raises(ValueError):  # selection not compatible with previous export
+            measurement_set.export_visibilities(ms, dir_name, "DATA", channel_id=[1])
+
+    def test_invalid_directory(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            measurement_set.CachedMeasurementSet(str(tmp_path / "missing"))
+
+        (tmp_path / "file").touch()
+        with pytest.raises(NotADirectoryError):
+            measurement_set.CachedMeasurementSet(str(tmp_path / "file"))
+
+        with pytest.raises(ValueError):  # not written by export_visibilities()
+            measurement_set.CachedMeasurementSet(str(tmp_path))
@@ -0,0 +1,89 @@
+# #############################################################################
+# test_parameter_estimator.py
+# ===========================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pypeline.phased_array.bluebild.gram as gram
+import pypeline.phased_array.bluebild.parameter_estimator as parameter_estimator
+import pypeline.phased_array.data_gen.statistics as vis
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kmeans_1d_is_optimal(seed):
+    rng = np.random.RandomState(seed)
+    x = np.sort(np.r_[rng.randn(6), 5 + rng.randn(3), np.round(rng.randn(3))])
+    k = 3
+
+    def cost(centroid):
+        return np.sum(np.min((x[:, np.newaxis] - centroid) ** 2, axis=1))
+
+    # Optimal 1D clusters are contiguous: try all split points.
+    cost_best = min(
+        cost([np.mean(x[a:b]) for (a, b) in zip((0,) + split, split + (len(x),))])
+        for split in itertools.combinations(range(1, len(x)), k - 1)
+    )
+
+    centroid = parameter_estimator._kmeans_1d(rng.permutation(x), k)
+    assert np.all(np.diff(centroid) > 0)
+    assert np.isclose(cost(centroid), cost_best)
+
+
+class TestIntensityFieldParameterEstimator:
+    """
+    Test :py:class:`~pypeline.phased_array.bluebild.parameter_estimator.IntensityFieldParameterEstimator`.
+    """
+
+    @pytest.fixture
+    def data(self):
+        rng = np.random.RandomState(0)
+        N_data, N_beam = 12, 9
+        beam_idx = pd.Index(range(N_beam), name="BEAM_ID")
+
+        SG = []
+        for _ in range(N_data):
+            A = rng.randn(N_beam, 4) + 1j * rng.randn(N_beam, 4)
+            S = (A * [100, 30, 10, 1]) @ A.conj().T
+            B = rng.randn(N_beam, N_beam) + 1j * rng.randn(N_beam, N_beam)
+            G = B @ B.conj().T + N_beam * np.eye(N_beam)
+            SG.append((vis.VisibilityMatrix(S, beam_idx), gram.GramMatrix(G, beam_idx)))
+        return SG
+
+    @pytest.mark.parametrize("N_thread", [1, 3])
+    def test_online_matches_offline(self, data, N_thread):
+        offline = parameter_estimator.IntensityFieldParameterEstimator(4, 0.99)
+        online = parameter_estimator.IntensityFieldParameterEstimator(
+            4, 0.99, online=True, N_thread=N_thread
+        )
+        for S, G in data:
+            offline.collect(S, G)
+            online.collect(S, G)
+
+        D = np.concatenate(
+            [parameter_estimator._intensity_spectrum(S.data, G.data, 0.99) for (S, G) in data]
+        )
+        N_eig, centroid = offline.infer_parameters()
+        N_eig_online, centroid_online = online.infer_parameters()
+        assert N_eig_online == N_eig
+        assert np.allclose(centroid_online, centroid)
+        assert len(online._visibilities) == 0
+        assert offline._reservoir is None
+        assert np.allclose(online._reservoir[: len(D)], D)
+
+    def test_reservoir_is_bounded(self, data):
+        est = parameter_estimator.IntensityFieldParameterEstimator(2, 1, online=True)
+        est._reservoir = np.zeros(10)
+        for S, G in data:
+            est.collect(S, G)
+
+        assert est._N_level_total > len(est._reservoir)
+        assert np.all(est._reservoir > 0)
+        N_eig, centroid = est.infer_parameters()
+        assert N_eig == max(int(np.ceil(est._N_level_total / len(data))), 2)
+        assert len(centroid) == 2
@@ -0,0 +1,64 @@
+# #############################################################################
+# test_prefetch.py
+# ================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import gc
+import itertools
+
+import pytest
+
+from pypeline.util.prefetch import Prefetcher
+
+
+class TestPrefetcher:
+    """
+    Test :py:class:`~pypeline.util.prefetch.Prefetcher`.
+    """
+
+    @pytest.mark.parametrize("depth, max_bytes", [(1, None), (3, None), (8, 2)])
+    def test_preserves_order(self, depth, max_bytes):
+        it = Prefetcher(range(20), depth, max_bytes, sizeof=lambda _: 1)
+        assert list(it) == list(range(20))
+        assert it._nbytes == 0
+
+    def test_forwards_exception(self):
+        def stream():
+            yield 0
+            raise IOError("broken MS")
+
+        it = Prefetcher(stream(), depth=2)
+        assert next(it) == 0
+        with pytest.raises(IOError):
+            next(it)
+        with pytest.raises(StopIteration):
+            next(it)
+
+    def test_close_on_early_exit(self):
+        closed = []
+
+        def stream():
+            try:
+                yield from itertools.count()
+            finally:
+                closed.append(True)
+
+        with Prefetcher(stream(), depth=2) as it:
+            for x in it:
+                if x == 3:
+                    break
+        assert not it._worker.is_alive()
+        assert closed == [True]
+
+    def test_release_on_garbage_collection(self):
+        it = Prefetcher(itertools.count(), depth=2)
+        for x in it:
+            if x == 3:
+                break
+
+        worker = it._worker
+        del it
+        gc.collect()
+        worker.join(timeout=10)
+        assert not worker.is_alive()
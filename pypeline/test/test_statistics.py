@@ -0,0 +1,56 @@
+# #############################################################################
+# test_statistics.py
+# ==================
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+import astropy.coordinates as coord
+import astropy.units as u
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sparse
+
+import pypeline.phased_array.beamforming as beamforming
+import pypeline.phased_array.data_gen.source as source
+import pypeline.phased_array.data_gen.statistics as statistics
+import pypeline.phased_array.instrument as instrument
+
+
+class TestVisibilityGeneratorBlock:
+    """
+    Test :py:class:`~pypeline.phased_array.data_gen.statistics.VisibilityGeneratorBlock`.
+    """
+
+    @pytest.mark.parametrize("SNR", [np.inf, 10])
+    def test_sparse_matches_dense(self, SNR):
+        rng = np.random.RandomState(0)
+        N_station, N_antenna_per_station = 4, 5
+        N_antenna = N_station * N_antenna_per_station
+        ant_idx = pd.MultiIndex.from_product(
+            [range(N_station), range(N_antenna_per_station)], names=["STATION_ID", "ANTENNA_ID"]
+        )
+        beam_idx = pd.Index(range(N_station), name="BEAM_ID")
+        XYZ = instrument.InstrumentGeometry(20 * rng.randn(N_antenna, 3), ant_idx)
+
+        row = np.arange(N_antenna)
+        w = np.exp(1j * 2 * np.pi * rng.rand(N_antenna))
+        W = sparse.csr_matrix((w, (row, row // N_antenna_per_station)))
+        W_sparse = beamforming.BeamWeights(W, ant_idx, beam_idx)
+        W_dense = beamforming.BeamWeights(W.toarray(), ant_idx, beam_idx)
+
+        sky_model = source.SkyEmission(
+            [
+                (coord.SkyCoord(10 * u.deg, 40 * u.deg), 2.0),
+                (coord.SkyCoord(11 * u.deg, 41 * u.deg), 1.0),
+            ]
+        )
+        S_gen = statistics.VisibilityGeneratorBlock(sky_model, T=1, fs=100, SNR=SNR)
+
+        np.random.seed(0)  # Wishart samples are drawn from the global RNG.
+        S_sparse = S_gen(XYZ, W_sparse, 2.0)
+        np.random.seed(0)
+        S_dense = S_gen(XYZ, W_dense, 2.0)
+
+        assert isinstance(S_sparse.data, np.ndarray) and not isinstance(S_sparse.data, np.matrix)
+        assert np.allclose(S_sparse.data, S_dense.data)
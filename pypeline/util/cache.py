@@ -0,0 +1,231 @@
+# #############################################################################
+# cache.py
+# ========
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+"""
+Persistent caches of arrays.
+"""
+
+import hashlib
+import os
+import pathlib
+import threading
+
+import imot_tools.util.argcheck as chk
+import numpy as np
+
+
+def digest(*args):
+    """
+    Content hash of arrays and scalars.
+
+    Parameters
+    ----------
+    *args
+        Objects to hash: array-like or (string-convertible) scalars.
+
+    Returns
+    -------
+    key : str
+        Hexadecimal SHA-256 digest. Arrays with equal values, dtype and shape hash identically.
+    """
+    h = hashlib.sha256()
+    for x in args:
+        x = np.ascontiguousarray(x)
+        h.update(f"{x.dtype.str}{x.shape}".encode())
+        if x.dtype.hasobject:
+            h.update(repr(x.tolist()).encode())
+        else:
+            h.update(x.tobytes())
+    return h.hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed directory of memory-mapped arrays with least-recently-used eviction.
+
+    Entries are `{key}.npy` files. Several processes can share a cache directory: entries are written
+    atomically, and access times are tracked through file modification times.
+
+    Examples
+    --------
+    .. testsetup::
+
+       import tempfile
+       import numpy as np
+       from pypeline.util.cache import DiskCache, digest
+
+    .. doctest::
+
+       >>> cache = DiskCache(tempfile.mkdtemp(), max_bytes=2 ** 20)
+       >>> key = digest(np.r_[1.0, 2.0], 'some parameter')
+       >>> cache.get(key) is None
+       True
+
+       >>> cache.put(key, np.arange(3))
+       memmap([0, 1, 2])
+    """
+
+    @chk.check(dict(dir_name=chk.is_instance(str, pathlib.Path), max_bytes=chk.is_integer))
+    def __init__(self, dir_name, max_bytes):
+        """
+        Parameters
+        ----------
+        dir_name : str or :py:class:`~pathlib.Path`
+            Directory holding the cache. It is created if it does not exist.
+        max_bytes : int
+            Disk budget [bytes] of the cache.
+
+            Least-recently used entries are deleted when adding an entry exceeds the budget.
+            Entries larger than `max_bytes` are not cached.
+        """
+        if max_bytes <= 0:
+            raise ValueError("Parameter[max_bytes] must be positive.")
+
+        self._path = pathlib.Path(dir_name).absolute()
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+
+    def _file(self, key):
+        return self._path / f"{key}.npy"
+
+    @chk.check("key", chk.is_instance(str))
+    def get(self, key):
+        """
+        Parameters
+        ----------
+        key : str
+            Entry identifier. (See :py:func:`~pypeline.util.cache.digest`.)
+
+        Returns
+        -------
+        x : :py:class:`~numpy.memmap`
+            Read-only memory-mapped entry, or :py:obj:`None` if absent.
+        """
+        f_name = self._file(key)
+        try:
+            x = np.load(f_name, mmap_mode="r")
+            os.utime(f_name)  # mark as most-recently used
+        except (FileNotFoundError, ValueError):  # missing, or evicted/replaced concurrently.
+            return None
+        return x
+
+    @chk.check("key", chk.is_instance(str))
+    def put(self, key, x):
+        """
+        Add an entry to the cache.
+
+        Parameters
+        ----------
+        key : str
+            Entry identifier. (See :py:func:`~pypeline.util.cache.digest`.)
+        x : :py:class:`~numpy.ndarray`
+            Array to cache.
+
+        Returns
+        -------
+        x : :py:class:`~numpy.memmap` or :py:class:`~numpy.ndarray`
+            Read-only memory-mapped entry, or `x` if it does not fit in the cache.
+        """
+        x = np.asarray(x)
+        y = self.allocate(key, x.shape, x.dtype)
+        if y is None:
+            return x
+
+        y[...] = x
+        return self.commit(key, y)
+
+    @chk.check(dict(key=chk.is_instance(str), shape=chk.has_integers))
+    def allocate(self, key, shape, dtype):
+        """
+        Create an entry to be filled in-place.
+
+        Use this instead of :py:meth:`~pypeline.util.cache.DiskCache.put` to generate entries larger
+        than memory. The entry is only visible to :py:meth:`~pypeline.util.cache.DiskCache.get` once
+        :py:meth:`~pypeline.util.cache.DiskCache.commit` is called.
+
+        Parameters
+        ----------
+        key : str
+            Entry identifier. (See :py:func:`~pypeline.util.cache.digest`.)
+        shape : tuple(int)
+            Dimensions of the entry.
+        dtype : :py:class:`~numpy.dtype`
+            Type of the entry.
+
+        Returns
+        -------
+        x : :py:class:`~numpy.memmap`
+            Writeable memory-mapped entry, or :py:obj:`None` if it does not fit in the cache.
+        """
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if nbytes > self._max_bytes:
+            return None
+
+        self._evict(self._max_bytes - nbytes)
+        f_tmp = self._path / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        return np.lib.format.open_memmap(str(f_tmp), "w+", dtype, tuple(shape))
+
+    @chk.check(dict(key=chk.is_instance(str), x=chk.is_instance(np.memmap)))
+    def commit(self, key, x):
+        """
+        Publish an entry created by :py:meth:`~pypeline.util.cache.DiskCache.allocate`.
+
+        Parameters
+        ----------
+        key : str
+            Entry identifier.
+        x : :py:class:`~numpy.memmap`
+            Entry returned by :py:meth:`~pypeline.util.cache.DiskCache.allocate`.
+
+            `x` must not be modified afterwards.
+
+        Returns
+        -------
+        x : :py:class:`~numpy.memmap`
+            Read-only memory-mapped entry.
+        """
+        x.flush()
+        os.replace(x.filename, self._file(key))
+        return np.load(self._file(key), mmap_mode="r")
+
+    @chk.check("x", chk.is_instance(np.memmap))
+    def discard(self, x):
+        """
+        Drop an entry created by :py:meth:`~pypeline.util.cache.DiskCache.allocate` without
+        publishing it.
+
+        Parameters
+        ----------
+        x : :py:class:`~numpy.memmap`
+            Entry returned by :py:meth:`~pypeline.util.cache.DiskCache.allocate`.
+        """
+        try:
+            os.remove(x.filename)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, max_bytes):
+        """
+        Delete least-recently used entries until the cache holds at most `max_bytes`.
+        """
+        entries = []
+        for f_name in self._path.glob("*.npy"):
+            try:
+                st = f_name.stat()
+            except FileNotFoundError:  # evicted concurrently
+                continue
+            entries.append((st.st_mtime, st.st_size, f_name))
+        entries.sort()
+
+        N_byte = sum(size for (_, size, _) in entries)
+        for _, size, f_name in entries:
+            if N_byte <= max_bytes:
+                break
+            try:
+                f_name.unlink()
+            except FileNotFoundError:
+                pass
+            N_byte -= size
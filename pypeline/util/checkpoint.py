@@ -0,0 +1,182 @@
+# #############################################################################
+# checkpoint.py
+# =============
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+"""
+Asynchronous on-disk checkpoints of array state.
+"""
+
+import concurrent.futures as futures
+import json
+import os
+import pathlib
+import re
+
+import imot_tools.util.argcheck as chk
+import numpy as np
+
+
+class Checkpoint:
+    """
+    Directory of memory-mapped arrays, written on a worker thread.
+
+    Each call to :py:meth:`~pypeline.util.checkpoint.Checkpoint.save` writes a consistent set of
+    named arrays together with a cursor (ex: number of processed timesteps).
+    Arrays are written to `{name}.{generation}.npy` files, after which `checkpoint.json` is
+    atomically replaced to point to them: a crash during a write leaves the previous checkpoint
+    intact.
+
+    Examples
+    --------
+    .. testsetup::
+
+       import tempfile
+       import numpy as np
+       from pypeline.util.checkpoint import Checkpoint
+
+    .. doctest::
+
+       >>> dir_name = tempfile.mkdtemp()
+       >>> ckpt = Checkpoint(dir_name)
+       >>> ckpt.save(5, dict(x=np.arange(3)), block=True)
+       >>> cursor, arrays = Checkpoint(dir_name).load()
+       >>> cursor, arrays['x']
+       (5, memmap([0, 1, 2]))
+    """
+
+    @chk.check("dir_name", chk.is_instance(str, pathlib.Path))
+    def __init__(self, dir_name):
+        """
+        Parameters
+        ----------
+        dir_name : str or :py:class:`~pathlib.Path`
+            Directory holding the checkpoint. It is created if it does not exist.
+        """
+        self._path = pathlib.Path(dir_name).absolute()
+        self._path.mkdir(parents=True, exist_ok=True)
+
+        self._executor = futures.ThreadPoolExecutor(max_workers=1)
+        self._future = None  # pending write
+        self._staging = dict()  # name -> buffer holding a copy of volatile arrays
+
+        # Last committed checkpoint.
+        self._generation = -1
+        self._files = dict()  # name -> file name
+        self._written = dict()  # name -> non-volatile array written to self._files[name]
+        meta = self._read_meta()
+        if meta is not None:
+            self._generation = meta["generation"]
+            self._files = meta["files"]
+
+    def _read_meta(self):
+        f_name = self._path / "checkpoint.json"
+        if not f_name.exists():
+            return None
+        with open(f_name, "r") as f:
+            return json.load(f)
+
+    def load(self):
+        """
+        Read the last committed checkpoint.
+
+        Returns
+        -------
+        cursor : int
+            Cursor stored alongside the arrays. (0 if no checkpoint exists.)
+        arrays : dict(str, :py:class:`~numpy.memmap`)
+            Read-only memory-mapped arrays. (Empty if no checkpoint exists.)
+        """
+        self.wait()
+        meta = self._read_meta()
+        if meta is None:
+            return 0, dict()
+
+        arrays = {
+            name: np.load(self._path / f_name, mmap_mode="r")
+            for (name, f_name) in meta["files"].items()
+        }
+        return meta["cursor"], arrays
+
+    @chk.check(dict(cursor=chk.is_integer, arrays=chk.is_instance(dict), block=chk.is_boolean))
+    def save(self, cursor, arrays, volatile=(), block=False):
+        """
+        Write arrays to disk on the worker thread.
+
+        Parameters
+        ----------
+        cursor : int
+            Position to store alongside the arrays.
+        arrays : dict(str, :py:class:`~numpy.ndarray`)
+            Arrays to save. :py:obj:`None` entries are skipped.
+        volatile : iterable(str)
+            Names of arrays modified in-place by the caller after this call: they are copied before
+            the call returns.
+
+            Other arrays must not be modified until the write completes, and are only written if they
+            are not the same object as in the previous checkpoint.
+        block : bool
+            If :py:obj:`True`, wait for the write to complete. (Default = :py:obj:`False`)
+
+        Notes
+        -----
+        At most one write is in flight: if the previous one is still running, this call waits for it
+        first. Exceptions raised by a write are re-raised by the next call to
+        :py:meth:`~pypeline.util.checkpoint.Checkpoint.save` or
+        :py:meth:`~pypeline.util.checkpoint.Checkpoint.wait`.
+        """
+        self.wait()
+
+        volatile = set(volatile)
+        arrays = {name: x for (name, x) in arrays.items() if x is not None}
+        for name in volatile & arrays.keys():
+            x = arrays[name]
+            buffer = self._staging.get(name)
+            if (buffer is None) or (buffer.shape != x.shape) or (buffer.dtype != x.dtype):
+                buffer = self._staging[name] = np.empty_like(x)
+            np.copyto(buffer, x)
+            arrays[name] = buffer
+
+        self._future = self._executor.submit(self._write, cursor, arrays, volatile)
+        if block:
+            self.wait()
+
+    def wait(self):
+        """
+        Wait for the pending write (if any) to complete.
+        """
+        if self._future is not None:
+            future, self._future = self._future, None
+            future.result()
+
+    def _write(self, cursor, arrays, volatile):
+        generation = self._generation + 1
+        files, written = dict(), dict()
+        for name, x in arrays.items():
+            if (name not in volatile) and (self._written.get(name) is x):
+                files[name] = self._files[name]  # unchanged since previous checkpoint
+            else:
+                files[name] = f"{name}.{generation}.npy"
+                y = np.lib.format.open_memmap(str(self._path / files[name]), "w+", x.dtype, x.shape)
+                y[...] = x
+                y.flush()
+                del y
+            if name not in volatile:
+                written[name] = x
+
+        meta = dict(cursor=int(cursor), generation=generation, files=files)
+        f_tmp = self._path / "checkpoint.json.tmp"
+        with open(f_tmp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f_tmp, self._path / "checkpoint.json")
+        self._generation, self._files, self._written = generation, files, written
+
+        # Drop arrays of previous (or interrupted) checkpoints.
+        pattern = re.compile(r"(?P<name>.+)\.\d+\.npy")
+        for f_name in self._path.iterdir():
+            match = pattern.fullmatch(f_name.name)
+            if match and (match["name"] in files) and (f_name.name not in files.values()):
+                f_name.unlink()
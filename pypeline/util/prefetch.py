@@ -0,0 +1,194 @@
+# #############################################################################
+# prefetch.py
+# ===========
+# Author : Sepand KASHANI [kashani.sepand@gmail.com]
+# #############################################################################
+
+"""
+Background evaluation of iterators.
+"""
+
+import collections
+import threading
+import time
+
+import imot_tools.util.argcheck as chk
+
+
+class Prefetcher:
+    """
+    Iterator evaluating another iterator ahead of time on a worker thread.
+
+    Items produced by the worker are buffered in a bounded queue, such that I/O-heavy producers (ex:
+    MS readers) overlap with compute-heavy consumers (ex: imaging loops).
+    The queue is bounded both in number of items and in memory.
+
+    Consumers that stop iterating early should call
+    :py:meth:`~pypeline.util.prefetch.Prefetcher.close` (or use the prefetcher as a context manager)
+    to release the worker thread and buffered items right away. Otherwise they are released when the
+    prefetcher is garbage-collected.
+
+    Examples
+    --------
+    .. testsetup::
+
+       from pypeline.util.prefetch import Prefetcher
+
+    .. doctest::
+
+       >>> it = Prefetcher(range(5), depth=2)
+       >>> list(it)
+       [0, 1, 2, 3, 4]
+
+       >>> sorted(it.wait_time.keys())
+       ['consumer', 'producer']
+
+    Wait-time counters tell which side of the queue is the bottleneck:
+
+    * `wait_time['consumer']` [s]: time spent by the consumer waiting on an empty queue
+      (I/O-bound);
+    * `wait_time['producer']` [s]: time spent by the worker waiting on a full queue
+      (compute-bound).
+    """
+
+    @chk.check(dict(depth=chk.is_integer, max_bytes=chk.allow_None(chk.is_integer)))
+    def __init__(self, iterable, depth, max_bytes=None, sizeof=None):
+        """
+        Parameters
+        ----------
+        iterable : iterable
+            Items to prefetch.
+        depth : int
+            Maximum number of items buffered ahead of the consumer.
+        max_bytes : int
+            Maximum size [bytes] of buffered items. (Default = no limit)
+
+            At least one item is always buffered, even if it exceeds `max_bytes`.
+        sizeof : callable
+            Function returning the size [bytes] of an item. (Default = 0 for all items.)
+        """
+        if depth < 1:
+            raise ValueError("Parameter[depth] must be positive.")
+        if (max_bytes is not None) and (max_bytes <= 0):
+            raise ValueError("Parameter[max_bytes] must be positive.")
+
+        self._state = _State(depth, max_bytes, sizeof)
+        self.wait_time = self._state.wait_time
+
+        # The worker only references the shared state: once the consumer drops the prefetcher,
+        # __del__() stops the worker instead of it waiting on a full queue forever.
+        self._worker = threading.Thread(
+            target=_produce, args=(self._state, iter(iterable)), daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def _nbytes(self):
+        return self._state.nbytes
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        state = self._state
+        with state.cv:
+            t_start = time.perf_counter()
+            while (len(state.queue) == 0) and not state.done:
+                state.cv.wait()
+            state.wait_time["consumer"] += time.perf_counter() - t_start
+
+            if len(state.queue) == 0:
+                raise StopIteration
+
+            item, nbytes, exception = state.queue.popleft()
+            state.nbytes -= nbytes
+            state.cv.notify_all()
+
+        if exception is not None:
+            raise exception
+        return item
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self, wait=True):
+        """
+        Stop the worker thread and drop buffered items.
+
+        Parameters
+        ----------
+        wait : bool
+            If :py:obj:`True`, wait for the worker to exit. (Default = :py:obj:`True`)
+
+            The worker exits once the item it is producing (if any) is ready.
+        """
+        state = self._state
+        with state.cv:
+            state.stop = True
+            state.queue.clear()
+            state.nbytes = 0
+            state.cv.notify_all()
+
+        if wait and (threading.current_thread() is not self._worker):
+            self._worker.join()
+
+    def __del__(self):
+        if hasattr(self, "_state"):  # __init__() may have failed.
+            self.close(wait=False)
+
+
+class _State:
+    """
+    Queue shared between a :py:class:`~pypeline.util.prefetch.Prefetcher` and its worker thread.
+    """
+
+    def __init__(self, depth, max_bytes, sizeof):
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.sizeof = (lambda _: 0) if (sizeof is None) else sizeof
+
+        self.queue = collections.deque()  # (item, nbytes, exception) triplets
+        self.nbytes = 0
+        self.done = False
+        self.stop = False
+        self.cv = threading.Condition()
+        self.wait_time = dict(consumer=0.0, producer=0.0)
+
+    def full(self):
+        if len(self.queue) == 0:
+            return False
+        if len(self.queue) >= self.depth:
+            return True
+        return (self.max_bytes is not None) and (self.nbytes >= self.max_bytes)
+
+
+def _produce(state, iterator):
+    """
+    Worker thread of :py:class:`~pypeline.util.prefetch.Prefetcher`.
+    """
+    try:
+        for item in iterator:
+            nbytes = state.sizeof(item)
+            with state.cv:
+                t_start = time.perf_counter()
+                while state.full() and not state.stop:
+                    state.cv.wait()
+                state.wait_time["producer"] += time.perf_counter() - t_start
+
+                if state.stop:
+                    return
+                state.queue.append((item, nbytes, None))
+                state.nbytes += nbytes
+                state.cv.notify_all()
+    except Exception as e:  # forwarded to the consumer
+        with state.cv:
+            state.queue.append((None, 0, e))
+    finally:
+        if hasattr(iterator, "close"):  # run clean-up code of generators (ex: open tables).
+            iterator.close()
+        with state.cv:
+            state.done = True
+            state.cv.notify_all()